@@ -1,3 +1,10 @@
 __version__ = "2.0.6"
 
-from .auto_doc import console_mkds_make_docfiles
+
+def __getattr__(name):
+    # the entry point is imported when it is used, so that importing the package (or its version) stays cheap
+    if name == "console_mkds_make_docfiles":
+        from .cli import console_mkds_make_docfiles
+
+        return console_mkds_make_docfiles
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,15 +7,30 @@ Created on Wed Mar 15 15:18:03 2023
 
 from dataclasses import dataclass
 import os
-import argparse
+import sys
+import functools
+import contextlib
+import time
 import logging
 import ast
-import subprocess
-from sys import stdout
-from datetime import datetime
-from typing import Any
+import hashlib
+from typing import Any, TYPE_CHECKING
 
-from .discover import find_python_files, find_files
+from .discover import find_python_files, find_files, discovery_sort_key, DiscoveryRules, read_discovery_config
+from .cache import ParseCache, hash_file
+from .constants import CACHE_DIRNAME
+from .prefilter import may_have_symbols
+from .emit import PageWriter, ThreadedPageWriter, atomic_write
+from .profiling import Profiler
+from .symbols import SymbolIndex, records_digest
+from .public_api import ModuleGraph, module_name
+from .preview import extract_preview, render_preview, PREVIEW_BANNER
+from .cli import console_mkds_make_docfiles  # noqa: F401 (kept importable from auto_doc)
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .render_cache import RenderCache
 
 _EXCLUDE_BALISES = {
     "exclude_module": "EXCLUDE_MODULE_FROM_MKDOCSTRINGS",
@@ -32,7 +47,7 @@ _FUNCTION_OPTIONS = """
       show_object_full_path : true
       show_category_heading : false
       separate_signature : true
-      heading_level : 1"""
+      heading_level : {heading_level}"""
 
 _CLASS_OPTIONS = """
     handler: python
@@ -45,17 +60,20 @@ _CLASS_OPTIONS = """
       show_if_no_docstring : true
       merge_init_into_class : true
       separate_signature : true
-      heading_level : 1"""
+      heading_level : {heading_level}"""
 
 LOGGER = logging.getLogger()
-handler = logging.StreamHandler(stdout)
-formatter = logging.Formatter(" %(levelname)-8s : %(message)s")
-handler.setFormatter(formatter)
-LOGGER.setLevel(logging.DEBUG)
-LOGGER.addHandler(handler)
 
 unix_join = os.path.join
 
+# below this number of files per worker, starting processes costs more than parsing in the current one
+_MIN_ITEMS_PER_JOB = 16
+
+_BLOCK_FIELD_NAMES = ("body", "orelse", "finalbody", "handlers", "cases")
+
+# statements that can export names, see PyfileParser.add_export
+_EXPORT_NODE_TYPES = (ast.ImportFrom, ast.Assign, ast.AnnAssign, ast.AugAssign)
+
 
 class PyfileParser(ast.NodeVisitor):
     """
@@ -67,13 +85,22 @@ class PyfileParser(ast.NodeVisitor):
             each of wich containing a list of the classes and functions in the module
             with the format : "module.fooclass" or "module.foofunction".
             ``content`` doesn't registers classes internal functions.
+            A third key, `symbols`, lists a record of every module, class, function and method
+            for the symbol index (see ``symbols.SYMBOL_FIELDS``), including the excluded ones.
+            For the public API mode (see ``public_api``), `all` holds the names of the module ``__all__``
+            (None if it has none, or if it is not a plain list of strings), and `imports` the
+            ``[module, level, name, asname]`` of each name imported by a ``from ... import ...`` at module level.
+            With ``previews``, `previews` holds what ``preview.render_preview`` needs to document each class
+            and function of `classes` and `functions`, keyed by name.
     """
 
-    def __init__(self, path):
+    def __init__(self, path, previews: bool = False):
         """
         Constructor method of the class.
         Args:
             path (str): The full path to a python file that has been parsed.
+            previews (bool): Also extracts the signatures and docstrings of the classes and functions,
+                for the preview renderer.
         Returns:
             mkds_pyfile_parser : An instance of this class.
         """
@@ -81,7 +108,12 @@ class PyfileParser(ast.NodeVisitor):
         self.path = path
         self.modulename = os.path.splitext(os.path.split(self.path)[1])[0]
         self.context = [self.modulename]
-        self.content = {"functions": [], "classes": []}
+        # kind and exclusion status of each level of the context, to tell methods from functions
+        self.scopes = [("module", False)]
+        self.content = {"functions": [], "classes": [], "symbols": [], "all": None, "imports": []}
+        self.previews = previews
+        if previews:
+            self.content["previews"] = {}
 
     def is_empty(self):
         """
@@ -104,6 +136,76 @@ class PyfileParser(ast.NodeVisitor):
             return True
         return False
 
+    def add_symbol(self, node, kind: str, excluded: bool):
+        """
+        Registers the record of a symbol in ``content["symbols"]``, with the docstring hash of ``node``.
+        Args:
+            node (ast.AST): The node of the module, class or function.
+            kind (str): ``module``, ``class``, ``function`` or ``method``.
+            excluded (bool): The symbol (or its parent) is excluded from the documentation.
+        """
+        docstring = ast.get_docstring(node, clean=False)
+        docstring_hash = None if docstring is None else hashlib.sha1(docstring.encode()).hexdigest()
+        if kind == "module":
+            qualname, lineno, end_lineno = self.modulename, 1, node.body[-1].end_lineno if node.body else 1
+        else:
+            qualname, lineno, end_lineno = ".".join(self.context[1:]), node.lineno, node.end_lineno
+        self.content["symbols"].append([qualname, kind, lineno, end_lineno, docstring_hash, excluded])
+
+    def enter_definition(self, node) -> bool:
+        """
+        Pushes a class or function on the context, and registers its symbol record.
+        Returns:
+            bool: True if the definition is excluded from the documentation.
+        """
+        parent_kind, parent_excluded = self.scopes[-1]
+        excluded = self.check_exclusion(node, "exclude_callable")
+        self.context.append(node.name)
+        if isinstance(node, ast.ClassDef):
+            kind = "class"
+        else:
+            kind = {"module": "function", "class": "method"}.get(parent_kind)
+        if kind != "class":
+            # like in content, classes are registered whatever their parents, but functions inherit their exclusion
+            excluded = excluded or parent_excluded
+        if kind is not None:
+            # nested functions are never documented, so they are not part of the index
+            self.add_symbol(node, kind, excluded)
+        if self.previews and parent_kind == "module" and not excluded:
+            self.content["previews"][node.name] = extract_preview(
+                node, lambda member: self.check_exclusion(member, "exclude_callable")
+            )
+        self.scopes.append((kind or "function", excluded))
+        return excluded
+
+    def leave_definition(self):
+        self.context.pop()
+        self.scopes.pop()
+
+    def add_export(self, node):
+        """
+        Registers the ``from ... import ...`` statements and the ``__all__`` assignments found at module level.
+        """
+        if len(self.context) != 1:
+            return
+        if isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                self.content["imports"].append([node.module, node.level, alias.name, alias.asname])
+            return
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        if not any(isinstance(target, ast.Name) and target.id == "__all__" for target in targets):
+            return
+        names = None
+        if isinstance(node.value, (ast.List, ast.Tuple)) and all(
+            isinstance(item, ast.Constant) and isinstance(item.value, str) for item in node.value.elts
+        ):
+            names = [item.value for item in node.value.elts]
+        if isinstance(node, ast.AugAssign):
+            # __all__ += [...] extends a static __all__, anything else can't be known without importing
+            self.content["all"] = None if names is None or self.content["all"] is None else self.content["all"] + names
+        else:
+            self.content["all"] = names
+
     def aggreg_context(self):
         aggregator = []
         for item in self.context:
@@ -114,35 +216,91 @@ class PyfileParser(ast.NodeVisitor):
         return agg
 
     def visit_FunctionDef(self, node) -> Any:
-        self.context.append(node.name)
-        if len(self.context) == 2 and not self.check_exclusion(node, "exclude_callable"):
+        excluded = self.enter_definition(node)
+        if len(self.context) == 2 and not excluded:
             # len(context) == 2 when we are inside module, and function.
             # If we are inside module, class, function we are == 3.
             # And we don't want to register class functions.
             self.content["functions"].append(self.aggreg_context())
         self.generic_visit(node)
-        self.context.pop()
+        self.leave_definition()
 
     # treat coroutines the same way
     visit_AsyncFunctionDef = visit_FunctionDef
 
     def visit_ClassDef(self, node):
-        self.context.append(node.name)
-        if not self.check_exclusion(node, "exclude_callable"):
+        if not self.enter_definition(node):
             self.content["classes"].append(self.aggreg_context())
         self.generic_visit(node)
-        self.context.pop()
+        self.leave_definition()
 
     def visit_Lambda(self, node):
         # lambdas are just functions, albeit with no statements, so no assignments.
         # As they have no name though, they won't be documented
         self.generic_visit(node)
 
+    def visit_ImportFrom(self, node):
+        self.add_export(node)
+
+    def visit_Assign(self, node):
+        self.add_export(node)
+        self.generic_visit(node)
+
+    # treat annotated and augmented assignments the same way
+    visit_AnnAssign = visit_AugAssign = visit_Assign
+
     def visit_Module(self, node):
-        if self.check_exclusion(node, "exclude_module"):
+        excluded = self.check_exclusion(node, "exclude_module")
+        self.add_symbol(node, "module", excluded)
+        if excluded:
             return None
         self.generic_visit(node)
 
+    def scan(self):
+        """
+        Fast alternative to ``visit``, filling ``content`` with exactly the same classes and functions.
+
+        Instead of visiting every node of the file, it only walks through the statements blocks
+        (module, classes and functions bodies, and the branches of compound statements like ``if`` or ``try``),
+        because classes and functions can only be defined there.
+        Expressions, where most of the nodes of a file are, are never entered.
+        Returns:
+            NoneType : Returns None. Use to be able to fill ``content`` with the classes and methods of the file.
+        Example:
+            ```python
+            parser = PyfileParser(filepath)
+            parser.scan()
+            print(parser.content)
+            ```
+        """
+        with open(self.path, "r") as pyf:
+            parsed_data = ast.parse(pyf.read())
+        excluded = self.check_exclusion(parsed_data, "exclude_module")
+        self.add_symbol(parsed_data, "module", excluded)
+        if excluded:
+            return None
+        self.scan_statements(parsed_data.body)
+
+    def scan_statements(self, statements: list):
+        for node in statements:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                excluded = self.enter_definition(node)
+                # same rule as visit_FunctionDef : only functions directly inside the module are registered
+                if len(self.context) == 2 and not excluded:
+                    self.content["functions"].append(self.aggreg_context())
+                self.scan_statements(node.body)
+                self.leave_definition()
+            elif isinstance(node, ast.ClassDef):
+                if not self.enter_definition(node):
+                    self.content["classes"].append(self.aggreg_context())
+                self.scan_statements(node.body)
+                self.leave_definition()
+            else:
+                if isinstance(node, _EXPORT_NODE_TYPES):
+                    self.add_export(node)
+                for field in _block_fields(type(node)):
+                    self.scan_statements(getattr(node, field))
+
     def visit(self, generic_arg=None):
         """
         Takes as argument the output of ast.parse().
@@ -179,6 +337,89 @@ class PyfileParser(ast.NodeVisitor):
             return super().visit(generic_arg)
 
 
+@functools.lru_cache(maxsize=None)
+def _block_fields(node_type: type) -> tuple:
+    # fields holding statements (or except handlers / match cases, that hold statements), in ast._fields order
+    # so that the walk registers symbols in the same order as ast.NodeVisitor.generic_visit
+    return tuple(field for field in node_type._fields if field in _BLOCK_FIELD_NAMES)
+
+
+def parse_python_file(path: str, previews: bool = False, prefilter: bool = True) -> dict | None:
+    """
+    Parses a python file and returns only its content, so that it can be sent back cheaply from a worker process.
+    Args:
+        path (str): The full path to the python file.
+        previews (bool): Also extracts what the preview renderer needs (see ``PyfileParser``).
+        prefilter (bool): Skips the files that have nothing to document (see ``prefilter.may_have_symbols``).
+            Their module record is lost, so the symbol index needs every file parsed.
+    Returns:
+        dict | None: The ``PyfileParser.content`` of the file,
+            or None if the prefilter found that it has nothing to document, without parsing it.
+    """
+    if prefilter and not may_have_symbols(path):
+        return None
+    parser = PyfileParser(path, previews)
+    parser.scan()
+    return parser.content
+
+
+def parse_cache_name(package_name: str, render: str = "mkdocstrings", prefilter: bool = True) -> str:
+    """
+    Returns:
+        str: The name of the parse cache of a package. Contents parsed for the preview renderer hold the signatures
+            and docstrings too, and the ones parsed without the prefilter (for the symbol index or the public API)
+            hold the modules that have nothing to document : they are cached apart.
+    """
+    cache_name = f"{package_name}_preview" if render == "preview" else package_name
+    return cache_name if prefilter else f"{cache_name}_unfiltered"
+
+
+def timed_parse_python_file(path: str, previews: bool = False, prefilter: bool = True) -> tuple:
+    """
+    Same as ``parse_python_file``, also returning the time it took, measured in the worker process.
+    Returns:
+        tuple: ``(seconds, content)``
+    """
+    start = time.perf_counter()
+    content = parse_python_file(path, previews, prefilter)
+    return time.perf_counter() - start, content
+
+
+def parallel_map(function, items: list, jobs: int, executor: "ProcessPoolExecutor | None" = None) -> list:
+    """
+    Applies ``function`` to every item, in a process pool if there is enough work to be worth it.
+    Args:
+        function (callable): A picklable (module level) function taking one item as argument.
+        items (list): The items to process.
+        jobs (int): Maximum number of worker processes. 1 processes everything in the current process.
+        executor (ProcessPoolExecutor): An already started pool to use, instead of starting a new one.
+    Returns:
+        list: The results, in the same order as ``items``.
+    """
+    return list(parallel_imap(function, items, jobs, executor))
+
+
+def parallel_imap(function, items: list, jobs: int, executor: "ProcessPoolExecutor | None" = None):
+    """
+    Generator version of ``parallel_map`` : yields the results in the same order as ``items``, as soon as they
+    are ready, so that they can be consumed while the next items are processed.
+    In the current process, items are only processed when their result is asked for.
+    """
+    jobs = min(jobs, len(items) // _MIN_ITEMS_PER_JOB)
+    if jobs <= 1:
+        yield from map(function, items)
+        return
+
+    chunksize = max(1, len(items) // (jobs * 4))
+    if executor is not None:
+        yield from executor.map(function, items, chunksize=chunksize)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(function, items, chunksize=chunksize)
+
+
 class RepositoryConfigurator:
     def __init__(self, args):
         self.set_package_name(args.package_name)
@@ -187,11 +428,21 @@ class RepositoryConfigurator:
         self.set_username(args.username)
         self.set_git_platform(args.platform)
         self.set_platform_groups(args.groups)
+        self.set_render(args.render)
+        self.set_symbol_index(args.symbol_index, args.symbol_index_json)
+        self.set_public_api(args.public_api)
+        self.set_cache(args.cache_dir, args.no_cache)
+        self.set_jobs(args.jobs)
+        self.profiler = Profiler(enabled=args.profile is not None, top_files=args.profile_top)
+        self.discovered_files = None
+        self.set_granularity(args.granularity)
+        self.set_since(args.since)
 
         self.update_package_path()
+        self.set_discovery_rules(args.include, args.exclude, args.exclude_private)
         self.update_package_url()
         self.update_static_doc_url()
-        self.update_doc_path()
+        self.update_doc_path(args.docs_dir)
 
         LOGGER.info(f"Working path is :{self.cwd}")
         LOGGER.info(f"Package layout style :{self.layout_type}")
@@ -201,18 +452,25 @@ class RepositoryConfigurator:
         LOGGER.info("Building with auto-doc :")
 
         # create and fill the .md files
-        self.create_index()
+        with self.profiler.phase("index"):
+            self.create_index()
         nav_dic = self.make_markdown_files()
 
-        doc_files_digest = ", \n - ".join(find_files(self.docpath, r".*\.md$", relative=True))
-        LOGGER.info(f"created markdown files :\n\n - {doc_files_digest}")
+        # listing the docs folder and reading mkdocs.yml again is only worth it when someone reads the debug logs
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            doc_files_digest = ", \n - ".join(find_files(self.docpath, r".*\.md$", relative=True))
+            LOGGER.debug(f"created markdown files :\n\n - {doc_files_digest}")
 
         # create and fill the mkocs.yml file with the nav corresponding to files above
-        mkd_conf = MkdocsConfigurator(os.path.join(self.cwd, "mkdocs.yml"))
-        mkd_conf.auto_config(self)
-        mkd_conf.write_mkdocs_nav(nav_dic)
-
-        LOGGER.info(f"final mkdocs.yml config is :\n\n{''.join(mkd_conf.current_content())}")
+        with self.profiler.phase("mkdocs_config"):
+            mkd_conf = MkdocsConfigurator(os.path.join(self.cwd, "mkdocs.yml"))
+            # mkdocstrings must import the package from the src folder in src layout
+            mkd_conf.auto_config(self, ["src"] if self.layout_type == "src" else None)
+            mkd_conf.write_mkdocs_nav(nav_dic)
+
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"final mkdocs.yml config is :\n\n{''.join(mkd_conf.current_content())}")
+        return nav_dic
 
     def set_cwd(self, path):
         self.cwd = path
@@ -235,6 +493,73 @@ class RepositoryConfigurator:
         else:
             self.git_address = "com"
 
+    def set_cache(self, cache_dir: str | None, no_cache: bool = False):
+        if no_cache:
+            self.cache = None
+            return
+        if cache_dir is None:
+            cache_dir = os.path.join(self.cwd, CACHE_DIRNAME)
+        cache_name = parse_cache_name(self.package_name, self.render, self.uses_prefilter())
+        self.cache = ParseCache(cache_dir, cache_name)
+
+    def set_render(self, render: str):
+        if render not in ("mkdocstrings", "preview"):
+            raise ValueError(f"render can only be mkdocstrings or preview. Got {render}")
+        self.render = render
+
+    def set_symbol_index(self, path: str | None, json_path: str | None = None):
+        if path is None and json_path is not None:
+            raise ValueError("--symbol-index-json exports the symbol index : give its path with --symbol-index too")
+        self.symbol_index_path = path
+        self.symbol_index_json_path = json_path
+
+    def set_discovery_rules(
+        self, include: list | None = None, exclude: list | None = None, exclude_private: bool = False
+    ):
+        """
+        Sets the include / exclude rules of the discovery, from the ``[tool.auto_fast_docs]`` table of the
+        pyproject.toml file in the current path, extended by the ones given on the command line.
+        ``rules`` is None when there is no rule at all.
+        """
+        config = read_discovery_config(os.path.join(self.cwd, "pyproject.toml"))
+        include = config.get("include", []) + list(include or [])
+        exclude = config.get("exclude", []) + list(exclude or [])
+        exclude_private = exclude_private or config.get("exclude_private", False)
+        if not include and not exclude and not exclude_private:
+            self.rules = None
+            return
+        self.rules = DiscoveryRules(include, exclude, exclude_private)
+        LOGGER.info(f"Discovery rules : include {include}, exclude {exclude}, exclude_private {exclude_private}")
+
+    def set_granularity(self, granularity: str):
+        if granularity not in ("symbol", "module", "package"):
+            raise ValueError(f"granularity can only be symbol, module or package. Got {granularity}")
+        self.granularity = granularity
+
+    def set_public_api(self, public_api: bool):
+        # full content of every module (with the __all__ and imports) in public API mode, see load_contents
+        self.public_api = public_api
+        self.module_contents = {}
+        self.public_targets = {}
+
+    def uses_prefilter(self) -> bool:
+        """
+        Returns:
+            bool: The modules with nothing to document are skipped without being parsed. The symbol index lists
+                every module, and the public API follows the imports of the modules that only re-export names :
+                both need every module parsed.
+        """
+        return self.symbol_index_path is None and not self.public_api
+
+    def set_since(self, since: str | None):
+        self.since = since
+
+    def set_jobs(self, jobs: int | None, executor: "ProcessPoolExecutor | None" = None):
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        self.jobs = max(1, jobs)
+        self.executor = executor
+
     def set_platform_groups(self, groups: str):
         groups_list = groups.split("/")
 
@@ -272,8 +597,8 @@ class RepositoryConfigurator:
         # "https://gitlab.pasteur.fr/haisslab/analysis-packages/Inflow"
         # "https://gitlab.pasteur.fr/tjostmou/Inflow"
 
-    def update_doc_path(self):
-        self.docpath = os.path.join(self.cwd, "docs")
+    def update_doc_path(self, docpath: str | None = None):
+        self.docpath = os.path.join(self.cwd, "docs") if docpath is None else docpath
         os.makedirs(self.docpath, exist_ok=True)
 
     def create_index(self):
@@ -281,18 +606,20 @@ class RepositoryConfigurator:
         if os.path.isfile(index_file_path):
             return
 
+        with open(index_file_path, "w") as fi:
+            fi.write(self.get_index_content())
+
+    def get_index_content(self) -> str:
         readme_file_paths = [os.path.join(self.cwd, suffix) for suffix in ["README.md", "readme.md"]]
         for readme_file_path in readme_file_paths:
             if os.path.isfile(readme_file_path):
                 with open(readme_file_path, "r") as fr:
                     content = fr.read()
-                LOGGER.info(f"created an index.md file from the {readme_file_path} file")
+                LOGGER.info(f"index.md made from the {readme_file_path} file")
                 break
         else:
             content = f"# {self.package_name}\n\n**{self.package_name}** codebase documentation.\n"
-
-        with open(index_file_path, "w") as fi:
-            fi.write(content)
+        return content
 
     def update_static_doc_url(self):
         if self.username is None:
@@ -326,151 +653,858 @@ class RepositoryConfigurator:
         # "https://josttim.pages.pasteur.fr/analysis-packages/Inflow/"
 
     def make_markdown_files(self):
-        def _create_layer(layer, reference):
-            if layer in reference.keys():
-                return
-            reference[layer] = {}
-
-        def _create_layers(layers):
-            nonlocal nav_dic
-            reference = nav_dic
-            for layer in layers:
-                _create_layer(layer, reference)
-                reference = reference[layer]
-
-        def _select_layer(layers):
-            nonlocal nav_dic
-            reference = nav_dic
-            for layer in layers:
-                reference = reference[layer]
-            return reference
-
-        matched_py_files = find_python_files(self.package_path)
-        matched_files_digest = " ,\n\t- ".join(matched_py_files)
-        LOGGER.info(f"Discovered python files :\n\t - {matched_files_digest}")
+        if self.since is not None:
+            nav_dic = self.make_changed_markdown_files()
+            if nav_dic is not None:
+                return nav_dic
+        if self.public_api:
+            return self.make_public_markdown_files()
+
+        filepaths = [filepath for filepath in self.discover_python_files() if self.is_documented_module(filepath)]
         LOGGER.info("Making markdown files")
+        # modules are parsed, made into pages and written one after the other, the files being written by another
+        # thread. The contents and pages kept in memory (to update them module by module, see watch mode) are only
+        # the names of the symbols and the nav entries : the pages are made again from them when needed.
+        self.contents, self.pages = {}, {}
+        self.writer = ThreadedPageWriter(self.docpath, profiler=self.profiler)
+        modules = self.iter_module_pages(filepaths)
+        if self.symbol_index_path is not None:
+            modules = self.iter_indexed_modules(modules)
+        try:
+            with self.profiler.phase("parsing"):
+                for page_path, page_content in self.iter_merged_pages(modules, filepaths):
+                    self.writer.write(page_path, page_content)
+        except BaseException:
+            with contextlib.suppress(Exception):
+                self.writer.stop()
+            raise
+        self.writer.finish()
+
+        return self.make_nav()
+
+    def make_public_markdown_files(self):
+        """
+        Makes the pages of the public API of the package only (see ``public_api``).
+        Where each object is documented depends on the ``__init__.py`` files of the whole package,
+        so every module is parsed before the pages are made.
+        """
+        self.load_contents()
+        LOGGER.info("Making markdown files")
+        self.writer = PageWriter(self.docpath)
+        with self.profiler.phase("emission"):
+            for page_path, page_content in self.make_pages().items():
+                self.writer.write(page_path, page_content)
+            self.writer.finish()
+        self.update_symbol_index(self.module_contents, complete=True)
+        return self.make_nav()
+
+    def make_public_contents(self, contents: dict) -> dict:
+        """
+        Resolves the public API of the package from the content of its modules.
+        Args:
+            contents (dict): The ``PyfileParser.content`` of every module, ``__init__.py`` files included.
+        Returns:
+            dict: For each public module exporting classes or functions, a content with the ``classes`` and
+                ``functions`` it exports (by their public name), to make its pages with ``make_module_pages``.
+                Where each definition is documented is kept in ``public_targets``, for the symbol index.
+        """
+        graph = ModuleGraph(self.package_name, contents)
+        exports = graph.public_api()
+        public_contents, self.public_targets = {}, {}
+        for filepath, names in exports.items():
+            stem = os.path.splitext(os.path.basename(filepath))[0]
+            public_content = {"functions": [], "classes": []}
+            if self.render == "preview":
+                public_content["previews"] = {}
+            for public_name, (kind, module, name) in names:
+                public_content[kind].append(f"{stem}.{public_name}")
+                if self.render == "preview":
+                    public_content["previews"][public_name] = graph.modules[module]["previews"][name]
+                self.public_targets.setdefault(graph.filepaths[module], []).append((name, filepath, public_name))
+            public_contents[filepath] = public_content
+        exported = sum(len(names) for names in exports.values())
+        defined = sum(len(content["functions"]) + len(content["classes"]) for content in contents.values())
+        LOGGER.info(
+            f"Public API : {exported} classes and functions exported by {len(exports)} modules, "
+            f"out of {defined} defined at module level in {len(contents)} modules"
+        )
+        return public_contents
+
+    def discover_python_files(self) -> list:
+        with self.profiler.phase("discovery"):
+            matched_py_files = self.find_python_files()
+        LOGGER.info(f"Discovered {len(matched_py_files)} python files")
+        if self.rules is not None:
+            self.rules.log_summary()
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            matched_files_digest = " ,\n\t- ".join(matched_py_files)
+            LOGGER.debug(f"Discovered python files :\n\t - {matched_files_digest}")
+        return matched_py_files
+
+    def load_contents(self) -> dict:
+        """
+        Discovers and parses the python files of the package, keeping the whole content of every module
+        (unlike ``make_markdown_files``).
+        Returns:
+            dict: The ``PyfileParser.content`` of each documented module, keyed by its path relative to the package
+                path. In public API mode, the public contents of the modules exporting names
+                (see ``make_public_contents``), the whole contents being kept in ``module_contents``.
+        """
+        matched_py_files = self.discover_python_files()
+        with self.profiler.phase("parsing"):
+            self.contents = self.parse_python_files(matched_py_files)
+        if self.public_api:
+            # only the public classes and functions get pages
+            self.module_contents = self.contents
+            with self.profiler.phase("public_api"):
+                self.contents = self.make_public_contents(self.module_contents)
+        return self.contents
+
+    def iter_module_pages(self, filepaths: list):
+        """
+        Parses the modules and makes their pages, one module at a time.
+        Only the names of the classes and functions of each module are kept in ``contents``,
+        and the nav entries of its pages in ``pages`` (see ``merge_pages``).
+        Args:
+            filepaths (list): Paths of the documented python files, relative to the package path.
+        Yields:
+            tuple: ``(filepath, content, module_pages)`` for each module, in ``filepaths`` order,
+                with its ``PyfileParser.content`` and the pages returned by ``make_module_pages``.
+        """
+        for filepath, content in self.iter_parsed_files(filepaths):
+            module_pages = self.make_module_pages(filepath, content)
+            self.contents[filepath] = {"functions": content["functions"], "classes": content["classes"]}
+            if "previews" in content:
+                # the pages of the preview renderer are made from them
+                self.contents[filepath]["previews"] = content["previews"]
+            self.pages[filepath] = [(nav_layers, page_path, None) for nav_layers, page_path, _ in module_pages]
+            yield filepath, content, module_pages
+
+    def iter_merged_pages(self, modules, filepaths: list):
+        """
+        Merges the pages of the modules given by ``iter_module_pages``, like ``merge_pages`` does.
+        Args:
+            modules (iterable): The ``(filepath, content, module_pages)`` of each module.
+            filepaths (list): Paths of every module that ``modules`` yields, in the same order.
+        Yields:
+            tuple: ``(page_path, page_content)`` of each page, as soon as it is complete :
+                after its module, or in package granularity, after the last module of its folder.
+        """
+        last_modules = {os.path.dirname(filepath): filepath for filepath in filepaths}
+        pending = {}
+        for filepath, _, module_pages in modules:
+            folder = os.path.dirname(filepath)
+            parts = pending.setdefault(folder, {})
+            for nav_layers, page_path, page_content in module_pages:
+                self.add_page_part(parts, nav_layers, page_path, page_content)
+            if self.granularity != "package" or last_modules[folder] == filepath:
+                yield from pending.pop(folder).items()
+
+    def iter_indexed_modules(self, modules):
+        """
+        Passes the modules given by ``iter_module_pages`` through, updating the symbol index with each of them.
+        The update is committed once they are all made.
+        """
+        index = SymbolIndex(self.symbol_index_path)
+        try:
+            index.start_update()
+            for filepath, content, module_pages in modules:
+                index.update_module(
+                    filepath.replace(os.sep, "/"),
+                    self.get_symbol_digest(filepath, content),
+                    lambda _: self.get_symbol_rows(filepath, content),
+                )
+                yield filepath, content, module_pages
+            with self.profiler.phase("symbol_index"):
+                index.finish_update(complete=True)
+                if self.symbol_index_json_path is not None:
+                    index.export_json(self.symbol_index_json_path)
+        finally:
+            index.close()
+
+    def make_pages(self) -> dict:
+        """
+        Makes the pages of the modules parsed by ``load_contents``, without writing them.
+        Returns:
+            dict: The content of every page, keyed by page path (see ``merge_pages``).
+        """
+        self.pages = {}
+        for filepath, content in self.contents.items():
+            self.pages[filepath] = self.make_module_pages(filepath, content)
+        return self.merge_pages()
 
-        nav_dic = {}
-        for filepath in matched_py_files:
-            file_name = os.path.splitext(os.path.basename(filepath))[0]
-            if file_name in ["auto-doc", "__init__"]:
-                continue
+    def make_changed_markdown_files(self) -> dict | None:
+        """
+        Parses again only the modules changed since the ``since`` git reference, and updates their pages.
+        The pages and nav entries of the other modules are taken from the nav of the existing mkdocs.yml,
+        that must have been generated by a previous run with the same options.
+        Returns:
+            dict | None: The nested nav dictionnary, or None if there is no previous nav to start from.
+        """
+        from .gitdiff import changed_python_files
 
-            parser = PyfileParser(os.path.join(self.package_path, filepath))
-            parser.visit()
-            if parser.is_empty():
-                continue
+        if self.public_api:
+            # a change in any __init__.py can move pages of modules that didn't change
+            LOGGER.info("--since can't be used with --public-api, documenting the whole package")
+            return None
 
-            directories = os.path.dirname(filepath)
+        previous_nav = MkdocsConfigurator(os.path.join(self.cwd, "mkdocs.yml")).read_nav()
+        if not previous_nav:
+            LOGGER.info("No nav found in mkdocs.yml to start from, documenting the whole package")
+            return None
 
-            if directories == "":
-                directories = []
+        with self.profiler.phase("discovery"):
+            changed = changed_python_files(self.package_path, self.since)
+            changed = [filepath for filepath in changed if self.is_selected_module(filepath)]
+            self.pages = self.pages_from_nav(previous_nav)
+            if self.granularity == "package":
+                # a package page is made of every module of its folder, so all of them must be parsed again
+                stale_keys = {os.path.dirname(filepath) for filepath in changed}
+                changed = sorted(set(changed).union(*map(self.find_folder_modules, stale_keys)))
+            else:
+                stale_keys = set(changed)
+        LOGGER.info(f"{len(changed)} python files changed since {self.since}")
+
+        existing = [filepath for filepath in changed if os.path.isfile(os.path.join(self.package_path, filepath))]
+        with self.profiler.phase("parsing"):
+            self.contents = dict(zip(existing, self.parse_files(existing)))
+
+        with self.profiler.phase("emission"):
+            stale_pages = {page_path for key in stale_keys for _, page_path, _ in self.pages.pop(key, [])}
+            for filepath, content in self.contents.items():
+                self.pages[filepath] = self.make_module_pages(filepath, content)
+            self.pages = dict(sorted(self.pages.items(), key=lambda item: discovery_sort_key(item[0])))
+
+            self.writer = PageWriter(self.docpath)
+            self.writer.pages = set(self.writer.previous_pages)
+            merged_pages = self.merge_pages(existing)
+            for page_path in sorted(stale_pages - set(merged_pages)):
+                self.writer.remove(page_path)
+            for page_path, page_content in merged_pages.items():
+                # the source changed, so the page must be rendered again even if its stub didn't change
+                self.writer.write(page_path, page_content, force=True)
+            self.writer.save_manifest()
+            self.writer.log_summary()
+        self.update_symbol_index(self.contents, removed=sorted(set(changed) - set(existing)))
+
+        return self.make_nav()
+
+    def pages_from_nav(self, nav_dic: dict) -> dict:
+        """
+        Finds back the pages made by a previous run from its nav, without their content.
+        Args:
+            nav_dic (dict): The nested nav dictionnary of the previous run.
+        Returns:
+            dict: The ``(nav_layers, page_path, None)`` pages, keyed by the path of their module
+                (or of their folder, in package granularity), relative to the package path.
+        """
+        pages = {}
+        stack = [(iter(nav_dic.items()), [])]
+        while stack:
+            entries, layers = stack[-1]
+            for key, value in entries:
+                if hasattr(value, "items"):
+                    stack.append((iter(value.items()), layers + [key]))
+                    break
+                page_path = value.replace("/", os.sep)
+                if self.granularity == "package":
+                    module_key = os.path.join("", *layers)
+                elif self.granularity == "module":
+                    module_key = os.path.splitext(page_path)[0] + ".py"
+                else:
+                    module_key = os.path.dirname(page_path) + ".py"
+                pages.setdefault(module_key, []).append((layers + [key], page_path, None))
             else:
-                directories = directories.split(os.sep)
+                stack.pop()
+        return pages
 
-            directories += [file_name]
+    def find_folder_modules(self, folder: str) -> list:
+        """
+        Returns:
+            list: Paths of the documented python files directly inside a folder of the package,
+                relative to the package path.
+        """
+        path = os.path.join(self.package_path, folder)
+        if not os.path.isdir(path):
+            return []
+        return [
+            os.path.join(folder, name)
+            for name in os.listdir(path)
+            if name.endswith(".py") and self.is_selected_module(os.path.join(folder, name))
+        ]
+
+    def update_markdown_files(self, filepaths: list) -> bool:
+        """
+        Parses again only the given modules, and updates their pages.
+        The pages of the modules that don't exist anymore are removed.
+        Must be called after ``make_markdown_files``.
+        Args:
+            filepaths (list): Paths of the modified, created or deleted python files, relative to the package path.
+        Returns:
+            bool: True if the nav changed, and the mkdocs.yml file must be written again.
+        """
+        if self.public_api:
+            return self.update_public_markdown_files(filepaths)
+        filepaths = [filepath for filepath in filepaths if self.is_selected_module(filepath)]
+        existing = [filepath for filepath in filepaths if os.path.isfile(os.path.join(self.package_path, filepath))]
+        if set(existing) != set(filepaths) or not set(existing).issubset(self.contents):
+            # files were created or deleted : discover again, to keep the same modules order as a full run
+            order = [filepath for filepath in self.find_python_files() if self.is_documented_module(filepath)]
+        else:
+            order = list(self.contents)
+
+        parsed = dict(zip(existing, self.parse_files(existing)))
+        # pages of the changed modules, before and after the change
+        affected = {page_path for filepath in filepaths for _, page_path, _ in self.pages.get(filepath, [])}
+        contents, pages = {}, {}
+        for filepath in order:
+            contents[filepath] = parsed[filepath] if filepath in parsed else self.contents[filepath]
+            if filepath in parsed:
+                pages[filepath] = self.make_module_pages(filepath, contents[filepath])
+                affected.update(page_path for _, page_path, _ in pages[filepath])
+            else:
+                pages[filepath] = self.pages[filepath]
+
+        previous_nav = self.make_nav()
+        self.contents, self.pages = contents, pages
+
+        # only the modules having a part of an affected page (several ones in package granularity) are merged
+        merged_pages = self.merge_pages(
+            [
+                filepath
+                for filepath, module_pages in pages.items()
+                if any(page_path in affected for _, page_path, _ in module_pages)
+            ]
+        )
+        for page_path in sorted(affected):
+            if page_path in merged_pages:
+                # the source changed, so the page must be rendered again even if its stub didn't change
+                self.writer.write(page_path, merged_pages[page_path], force=True)
+            else:
+                self.writer.remove(page_path)
+        self.writer.save_manifest()
+        self.writer.log_summary()
+        self.update_symbol_index(parsed, removed=sorted(set(filepaths) - set(existing)))
+
+        return self.make_nav() != previous_nav
 
-            file_root_path = unix_join(self.docpath, *directories)
-            os.makedirs(file_root_path, exist_ok=True)
+    def update_public_markdown_files(self, filepaths: list) -> bool:
+        """
+        Public API mode version of ``update_markdown_files`` : the public API is resolved again from the content
+        of every module, as a changed ``__init__.py`` can move the pages of modules that didn't change.
+        Only the pages whose content changed, or whose definitions changed, are written again.
+        """
+        filepaths = [filepath for filepath in filepaths if self.is_selected_module(filepath)]
+        existing = [filepath for filepath in filepaths if os.path.isfile(os.path.join(self.package_path, filepath))]
+        if set(existing) != set(filepaths) or not set(existing).issubset(self.module_contents):
+            order = [filepath for filepath in self.find_python_files() if self.is_documented_module(filepath)]
+        else:
+            order = list(self.module_contents)
+
+        parsed = dict(zip(existing, self.parse_files(existing)))
+        # pages of the changed definitions, before and after the change
+        affected = {page_path for filepath in filepaths for _, page_path in self.get_symbol_pages(filepath)}
+        previous_pages = {page_path for module_pages in self.pages.values() for _, page_path, _ in module_pages}
+        previous_nav = self.make_nav()
+
+        self.module_contents = {
+            filepath: parsed[filepath] if filepath in parsed else self.module_contents[filepath] for filepath in order
+        }
+        self.contents = self.make_public_contents(self.module_contents)
+        merged_pages = self.make_pages()
+        affected.update(page_path for filepath in filepaths for _, page_path in self.get_symbol_pages(filepath))
+
+        for page_path in sorted(previous_pages - set(merged_pages)):
+            self.writer.remove(page_path)
+        for page_path, page_content in merged_pages.items():
+            # unchanged pages of unchanged definitions are left as they are
+            self.writer.write(page_path, page_content, force=page_path in affected)
+        self.writer.save_manifest()
+        self.writer.log_summary()
+        self.update_symbol_index(self.module_contents, removed=sorted(set(filepaths) - set(existing)), complete=True)
+
+        return self.make_nav() != previous_nav
+
+    def update_symbol_index(self, contents: dict, removed: list | tuple = (), complete: bool = False) -> None:
+        """
+        Updates the symbol index with the records of the given modules (see ``symbols.SymbolIndex.update``),
+        and exports it to json if requested. Must be called once their pages are made.
+        Args:
+            contents (dict): The ``PyfileParser.content`` of the modules to update, keyed by relative path.
+            removed (list | tuple): Relative paths of the modules that don't exist anymore.
+            complete (bool): ``contents`` are all the modules of the package.
+        """
+        if self.symbol_index_path is None:
+            return
+        with self.profiler.phase("symbol_index"):
+            index = SymbolIndex(self.symbol_index_path)
+            try:
+                filepaths = {filepath.replace(os.sep, "/"): filepath for filepath in contents}
+                modules = {
+                    module_path: self.get_symbol_digest(filepath, contents[filepath])
+                    for module_path, filepath in filepaths.items()
+                }
+                index.update(
+                    modules,
+                    lambda module_path: self.get_symbol_rows(filepaths[module_path], contents[filepaths[module_path]]),
+                    [filepath.replace(os.sep, "/") for filepath in removed],
+                    complete,
+                )
+                if self.symbol_index_json_path is not None:
+                    index.export_json(self.symbol_index_json_path)
+            finally:
+                index.close()
+
+    def get_symbol_digest(self, filepath: str, content: dict) -> str:
+        # rows are made from the records and the pages of a module : unchanged ones are not made again
+        return records_digest(
+            [
+                self.package_name,
+                self.granularity,
+                content.get("symbols", []),
+                self.get_symbol_pages(filepath),
+            ]
+        )
+
+    def get_symbol_pages(self, filepath: str) -> list:
+        """
+        Returns:
+            list: The ``(name, page_path)`` of the pages of the classes and functions defined in a module
+                (or of the module page, named after the module, in module and package granularity).
+                In public API mode, the pages are the ones of the public names of the definitions, that can be
+                made by other modules (see ``make_public_contents``).
+        """
+        if not self.public_api:
+            return [(nav_layers[-1], page_path) for nav_layers, page_path, _ in self.pages.get(filepath, [])]
+        symbol_pages = []
+        for name, exporting_filepath, public_name in self.public_targets.get(filepath, []):
+            for nav_layers, page_path, _ in self.pages.get(exporting_filepath, []):
+                if self.granularity != "symbol" or nav_layers[-1] == public_name:
+                    symbol_pages.append((name, page_path))
+                    break
+        return symbol_pages
+
+    def get_symbol_rows(self, filepath: str, content: dict) -> list:
+        """
+        Args:
+            filepath (str): Path of the python file, relative to the package path.
+            content (dict): The ``PyfileParser.content`` of the module, whose pages are in ``pages``.
+        Returns:
+            list: The rows of the symbol index for the module (see ``symbols.COLUMNS``),
+                with the page each symbol is documented in (None for excluded symbols, or symbols without a page).
+        """
+        module_path = filepath.replace(os.sep, "/")
+        module = module_name(self.package_name, filepath)
+        symbol_pages = self.get_symbol_pages(filepath)
+        if self.granularity == "symbol" or self.public_api:
+            # one page per top level class or function, where their methods are documented too
+            # (in public API mode, the page of each definition can be made by a different module)
+            symbol_pages = dict(symbol_pages)
+        else:
+            module_page = symbol_pages[0][1] if symbol_pages else None
+
+        rows = []
+        for qualname, kind, lineno, end_lineno, docstring_hash, excluded in content.get("symbols", []):
+            if excluded:
+                page = None
+            elif self.granularity == "symbol" or self.public_api:
+                page = None if kind == "module" else symbol_pages.get(qualname.split(".")[0])
+            else:
+                page = module_page
+            rows.append([module_path, module, qualname, kind, lineno, end_lineno, docstring_hash, int(excluded), page])
+        return rows
 
-            _create_layers(directories)
+    def make_module_pages(self, filepath: str, content: dict) -> list:
+        """
+        Args:
+            filepath (str): Path of the python file, relative to the package path.
+            content (dict): The ``PyfileParser.content`` of the module.
+        Returns:
+            list: A list of ``(nav_layers, page_path, page_content)`` tuples, one per page of the module
+                (or per part of a page shared with other modules, in package granularity).
+                ``nav_layers`` are the keys of the page in the nav, ``page_path`` is relative to the docs folder.
+        """
+        if len(content["functions"]) == 0 and len(content["classes"]) == 0:
+            return []
 
-            nav_sublayer = _select_layer(directories)
+        file_name = os.path.splitext(os.path.basename(filepath))[0]
+        directories = os.path.dirname(filepath)
 
-            for func_type in ["classes", "functions"]:
-                for func_item in parser.content[func_type]:
-                    func_name = func_item.split(".")[1]
-                    func_markdown_file = f"{func_name}.md"
-                    nav_sublayer[func_name] = unix_join(*directories, func_markdown_file)
+        if directories == "":
+            directories = []
+        else:
+            # the same folder names are in the nav entries of every page of the folder, that are kept in memory
+            directories = [sys.intern(directory) for directory in directories.split(os.sep)]
+
+        is_package = file_name == "__init__"
+        if is_package:
+            # names exported by a package (public API mode) are documented under the package import path
+            module_parts = directories
+            file_name = directories[-1] if directories else self.package_name
+        else:
+            module_parts = directories + [file_name]
+        module_location = ".".join([self.package_name] + module_parts)
+
+        if self.granularity == "package":
+            # one page per package folder, with a section per module. The page of a subpackage is the index of its
+            # folder : it can't have the path of the root package page, even when the folder has the same name
+            package_name = directories[-1] if directories else self.package_name
+            page_path = unix_join(*directories, "index.md") if directories else f"{package_name}.md"
+            if not directories and os.path.isdir(os.path.join(self.package_path, package_name)):
+                # the nav section of this folder is next to the root package page, with the same name
+                package_name = f"{package_name} (root)"
+            directives = self.get_module_directives(module_location, content, heading_level=3)
+            return [(directories + [package_name], page_path, f"## {file_name}\n\n{directives}")]
+
+        if self.granularity == "module":
+            page_path = unix_join(*module_parts[:-1], f"{file_name}.md")
+            directives = self.get_module_directives(module_location, content, heading_level=2)
+            # a package page goes in the section of its folder, with the pages of its modules
+            nav_layers = module_parts + [file_name] if is_package else module_parts
+            return [(nav_layers, page_path, f"# {file_name}\n\n{directives}")]
+
+        pages = []
+        for func_type in ["classes", "functions"]:
+            for func_item in content[func_type]:
+                func_name = func_item.split(".")[1]
+                func_markdown_file = unix_join(*module_parts, f"{func_name}.md")
+                pages.append(
+                    (
+                        module_parts + [func_name],
+                        func_markdown_file,
+                        self.get_symbol_content(module_location, content, func_name, func_type),
+                    )
+                )
+        return pages
+
+    def get_module_directives(self, module_location: str, content: dict, heading_level: int) -> str:
+        return "\n\n".join(
+            self.get_symbol_content(module_location, content, func_item.split(".")[1], func_type, heading_level)
+            for func_type in ["classes", "functions"]
+            for func_item in content[func_type]
+        )
+
+    def get_symbol_content(
+        self, module_location: str, content: dict, name: str, item_type: str, heading_level: int = 1
+    ) -> str:
+        """
+        Returns:
+            str: The markdown documenting a class or function of a module : a mkdocstrings stub,
+                or the final markdown in preview render mode (see ``preview``).
+        """
+        if self.render == "preview":
+            return render_preview(name, content["previews"][name], heading_level)
+        return self.get_mkdocstrings_file_content(f"{module_location}.{name}", item_type, heading_level)
 
-                    function_docfile_name = unix_join(file_root_path, func_markdown_file)
+    def merge_pages(self, filepaths: list | None = None) -> dict:
+        """
+        Args:
+            filepaths (list | None): Only merges the pages of these modules. By default, the pages of every module.
+        Returns:
+            dict: The content of every page, keyed by page path, in modules order.
+                In package granularity, the parts of a page coming from several modules are joined together.
+        """
+        if filepaths is not None:
+            filepaths = set(filepaths)
+        merged = {}
+        for filepath, module_pages in self.pages.items():
+            if filepaths is not None and filepath not in filepaths:
+                continue
+            if module_pages and module_pages[0][2] is None and filepath in self.contents:
+                # only the nav entries of the pages are kept by make_markdown_files
+                module_pages = self.make_module_pages(filepath, self.contents[filepath])
+            for nav_layers, page_path, page_content in module_pages:
+                self.add_page_part(merged, nav_layers, page_path, page_content)
+        return merged
+
+    def add_page_part(self, merged: dict, nav_layers: list, page_path: str, page_content: str) -> None:
+        if page_path in merged:
+            merged[page_path] += "\n\n" + page_content
+            return
+        if self.granularity == "package":
+            page_content = f"# {nav_layers[-1]}\n\n{page_content}"
+        if self.render == "preview":
+            page_content = PREVIEW_BANNER + page_content
+        merged[page_path] = page_content
 
-                    if os.path.isfile(function_docfile_name):
-                        LOGGER.warning(f"doc file {function_docfile_name} has been overwritten")
+    def make_nav(self) -> dict:
+        """
+        Returns:
+            dict: The nested nav dictionnary of the pages made by ``make_markdown_files``, in modules order.
+        """
+        nav_dic = {}
+        for module_pages in self.pages.values():
+            for nav_layers, page_path, _ in module_pages:
+                reference = nav_dic
+                for layer in nav_layers[:-1]:
+                    reference = reference.setdefault(layer, {})
+                reference[nav_layers[-1]] = page_path
+        return nav_dic
 
-                    module_location = ".".join([self.package_name] + directories + [func_name])
+    def get_page_sources(self) -> dict:
+        """
+        Returns:
+            dict: A digest of the content of the python files documented in each page of the last run,
+                keyed by page path (with / separators, like the src_uri of mkdocs), for the render cache.
+        """
+        exported = {}
+        for def_filepath, targets in self.public_targets.items():
+            for _, filepath, _ in targets:
+                exported.setdefault(filepath, set()).add(def_filepath)
+
+        page_filepaths = {}
+        for key, module_pages in self.pages.items():
+            # pages found back from the nav of a --since run are keyed by folder, in package granularity
+            filepaths = {key} if key.endswith(".py") else set(self.find_folder_modules(key))
+            # in public API mode, the objects of a page are defined in other modules
+            filepaths |= exported.get(key, set())
+            for _, page_path, _ in module_pages:
+                page_filepaths.setdefault(page_path.replace(os.sep, "/"), set()).update(filepaths)
+
+        hashes = {}
+        page_sources = {}
+        for page_path, filepaths in page_filepaths.items():
+            digest = hashlib.sha256()
+            for filepath in sorted(filepaths):
+                if filepath not in hashes:
+                    hashes[filepath] = self.get_source_hash(filepath)
+                digest.update(f"{filepath}\0{hashes[filepath]}\0".encode())
+            page_sources[page_path] = digest.hexdigest()
+        return page_sources
+
+    def get_source_hash(self, filepath: str) -> str | None:
+        # the parse cache already hashed the files it checked during this run
+        entry = self.cache.seen.get(filepath) if self.cache is not None else None
+        if entry is not None:
+            return entry["sha256"]
+        path = os.path.join(self.package_path, filepath)
+        return hash_file(path) if os.path.isfile(path) else None
+
+    def find_python_files(self) -> list:
+        """
+        Returns:
+            list: Paths of the python files of the package, relative to the package path.
+                ``discovered_files`` is used instead of walking the package again if it was set
+                (by a batch run, that walks every package at once).
+        """
+        if self.discovered_files is not None:
+            discovered_files, self.discovered_files = self.discovered_files, None
+            return discovered_files
+        if self.rules is not None:
+            self.rules.reset_counts()
+        return find_python_files(self.package_path, rules=self.rules)
+
+    def is_documented_module(self, filepath: str) -> bool:
+        # in public API mode, the __init__.py files are parsed for their __all__ and re-exports
+        ignored = ["auto-doc"] if self.public_api else ["auto-doc", "__init__"]
+        return os.path.splitext(os.path.basename(filepath))[0] not in ignored
+
+    def is_selected_module(self, filepath: str) -> bool:
+        """
+        Like ``is_documented_module``, but also applies the discovery rules, for the paths that don't come
+        from the discovery walk (files changed in git, or in watch mode).
+        """
+        return self.is_documented_module(filepath) and (self.rules is None or self.rules.allows(filepath))
 
-                    with open(function_docfile_name, "w") as mof:
-                        mof.write(self.get_mkdocstrings_file_content(module_location, func_type))
+    def parse_python_files(self, filepaths: list) -> dict:
+        """
+        Parses the modules of the package, reusing the content of unchanged modules from the parse cache.
+        Args:
+            filepaths (list): Paths of the python files, relative to the package path.
+        Returns:
+            dict: The ``PyfileParser.content`` of each documented module, keyed by its relative path,
+                in the same order as ``filepaths``.
+        """
+        return dict(self.iter_parsed_files(filepaths))
 
-        return nav_dic
+    def iter_parsed_files(self, filepaths: list):
+        """
+        Generator version of ``parse_python_files`` : yields the content of each module as soon as it is parsed
+        (or found in the parse cache). The parse cache is saved once every module is yielded.
+        Yields:
+            tuple: ``(filepath, content)`` for each documented module, in the same order as ``filepaths``.
+        """
+        filepaths = [filepath for filepath in filepaths if self.is_documented_module(filepath)]
+        cached = {}
+        if self.cache is not None:
+            self.cache.scan(self.package_path, filepaths)
+            cached = {filepath: self.cache.get(filepath) for filepath in filepaths}
+
+        to_parse = [filepath for filepath in filepaths if cached.get(filepath) is None]
+        # results come in submission order, so contents (and thus the nav) doesn't depend on
+        # the order in wich the workers finish
+        parsed = self.iter_parse_files(to_parse)
+        for filepath in filepaths:
+            content = cached.pop(filepath, None)
+            if content is None:
+                content = next(parsed)
+                if self.cache is not None:
+                    self.cache.put(filepath, content)
+            yield filepath, content
+        # logs the prefilter summary
+        next(parsed, None)
+
+        if self.cache is not None:
+            self.cache.save()
+
+    def parse_files(self, filepaths: list) -> list:
+        """
+        Parses the given modules, without using the parse cache.
+        Args:
+            filepaths (list): Paths of the python files, relative to the package path.
+        Returns:
+            list: The ``PyfileParser.content`` of each module, in the same order as ``filepaths``.
+        """
+        return list(self.iter_parse_files(filepaths))
 
-    def get_mkdocstrings_file_content(self, item_name: str, item_type: str) -> str:
+    def iter_parse_files(self, filepaths: list):
+        """
+        Generator version of ``parse_files`` : yields the content of each module as soon as it is parsed.
+        """
+        paths = [os.path.join(self.package_path, filepath) for filepath in filepaths]
+        parse = timed_parse_python_file if self.profiler.enabled else parse_python_file
+        if self.render == "preview":
+            parse = functools.partial(parse, previews=True)
+        if not self.uses_prefilter():
+            parse = functools.partial(parse, prefilter=False)
+        parsed = parallel_imap(parse, paths, self.jobs, self.executor)
+        skipped_files, skipped_bytes = 0, 0
+        for filepath, content in zip(filepaths, parsed):
+            if self.profiler.enabled:
+                seconds, content = content
+                self.profiler.record_file(filepath, seconds)
+            if content is None:
+                skipped_files += 1
+                skipped_bytes += os.path.getsize(os.path.join(self.package_path, filepath))
+                content = {"functions": [], "classes": [], "symbols": [], "all": None, "imports": []}
+                if self.render == "preview":
+                    content["previews"] = {}
+            yield content
+
+        if filepaths and self.uses_prefilter():
+            LOGGER.info(
+                f"Prefilter skipped {skipped_files} of {len(filepaths)} files with nothing to document "
+                f"({skipped_bytes} bytes never decoded nor parsed)"
+            )
+
+    def get_mkdocstrings_file_content(self, item_name: str, item_type: str, heading_level: int = 1) -> str:
         content = []
         content.append("::: " + item_name)
 
         if item_type == "functions":
-            content.append(_FUNCTION_OPTIONS)
+            content.append(_FUNCTION_OPTIONS.format(heading_level=heading_level))
 
         if item_type == "classes":
-            content.append(_CLASS_OPTIONS)
+            content.append(_CLASS_OPTIONS.format(heading_level=heading_level))
 
         return "".join(content)
 
 
 @dataclass
 class MkdocsConfigurator:
+    """
+    In memory model of a mkdocs.yml file. The file is read at most once : the text before and after the nav
+    is kept verbatim, the nav is rendered from a nav dictionnary, and the file is only written if its text changed.
+    """
+
     file_path: str
-    content = ""
+
+    def __post_init__(self):
+        self.lines = []
+        self.before = None
+        self.nav = ""
+        self.after = ""
+        self.saved_text = None
 
     def add_line(self, line):
-        self.content += line + "\n"
+        self.lines.append(line + "\n")
 
-    def add_lines_from_template(self):
+    def add_lines_from_template(self, source_paths: list | None = None):
         template_path = os.path.join(os.path.dirname(__file__), "mkdocs_template.yml")
         with open(template_path, "r") as f:
             content = f.read()
+        if source_paths is not None:
+            # folders where mkdocstrings imports the documented packages from, relative to mkdocs.yml
+            content = content.replace("paths: [.]", "paths: [" + ", ".join(source_paths) + "]")
 
-        self.content += content + "\n"
+        self.lines.append(content + "\n")
 
     def config_exists(self) -> bool:
         if os.path.isfile(self.file_path):
             return True
         return False
 
+    def load(self) -> None:
+        """
+        Reads the mkdocs.yml file, if it was not read (or generated) yet.
+        """
+        if self.before is not None:
+            return
+        text = ""
+        if self.config_exists():
+            with open(self.file_path, "r") as f:
+                text = f.read()
+        self.set_text(text)
+        self.saved_text = text
+
+    def set_text(self, text: str) -> None:
+        """
+        Splits the text of a mkdocs.yml file in the part before the nav (up to the ``nav:`` line included),
+        the nav entries, and the part after them.
+        """
+        lines = text.splitlines(keepends=True)
+        for index, line in enumerate(lines):
+            if "nav:" == line.lower().replace(" ", "").strip():
+                break
+        else:
+            if text and not text.endswith("\n"):
+                text += "\n"
+            self.before, self.nav, self.after = text + "nav:\n", "", ""
+            return
+
+        end = index + 1
+        # the nav entries are indented (or list items at the top level), the next top level key ends them
+        while end < len(lines) and (not lines[end].strip() or lines[end][0] in " \t-"):
+            end += 1
+        # blank lines before the next key belong to it, trailing blank lines are dropped
+        start_after = end
+        while start_after > index + 1 and not lines[start_after - 1].strip():
+            start_after -= 1
+        self.before = "".join(lines[: index + 1])
+        self.nav = "".join(lines[index + 1 : start_after])
+        self.after = "".join(lines[start_after:]) if end < len(lines) else ""
+
+    def render(self) -> str:
+        return self.before + self.nav + self.after
+
     def write_file(self):
-        with open(self.file_path, "w") as f:
-            f.write(self.content)
+        """
+        Writes the file (atomically) if its text differs from the one on disk. An existing file keeps its
+        permissions, and when it is a symbolic link, the file it points to is written instead of replacing the link.
+        Returns:
+            bool: True if the file was written.
+        """
+        if self.before is None:
+            self.set_text("".join(self.lines))
+        text = self.render()
+        if text == self.saved_text:
+            LOGGER.debug(f"{self.file_path} is unchanged")
+            return False
+        atomic_write(os.path.realpath(self.file_path), text)
+        self.saved_text = text
+        return True
 
     def write_mkdocs_nav(self, nav_dic: dict) -> None:
-        def _entry_level(level: int, entry_name: str, entry_value: str | None = None) -> str:
-            line = "    " * (level + 1) + "- "
-            # add quotes
-            line += _quoting(entry_name) if entry_value is not None else entry_name
-            line += ": "
-            if entry_value is not None:
-                line += _quoting(entry_value)
-            return line + _eol()
-
-        def _quoting(name: str) -> str:
-            return "'" + name + "'"
-
-        def _eol() -> str:
-            return "\n"
-
-        def recursive_writer(dico, depth):
-            nonlocal fo
-            for key, value in dico.items():
-                if hasattr(value, "items"):
-                    line = _entry_level(depth, key)
-                    fo.write(line)
-                    recursive_writer(value, depth + 1)
-                else:
-                    line = _entry_level(depth, key, value)
-                    fo.write(line)
-
-        original_content = self.current_content(with_nav=False)
-        with open(self.file_path, "w") as fo:
-            for line in original_content:
-                fo.write(line)
-            # always start the nav with index.md as home
-            fo.write("    - Home: index.md\n")
-            recursive_writer(nav_dic, depth=0)
-
-    def auto_config(self, repository_conf: RepositoryConfigurator):
+        self.load()
+        self.nav = render_nav(nav_dic)
+        self.write_file()
+
+    def auto_config(self, repository_conf: RepositoryConfigurator, source_paths: list | None = None):
         if self.config_exists():
             return
 
+        from datetime import datetime
+
         LOGGER.info("No mkdocs.yml file has been found in the package. Auto generating one")
         self.add_line(f"site_name: {repository_conf.package_name}")
         if repository_conf.username is not None:
@@ -481,89 +1515,147 @@ class MkdocsConfigurator:
         if repository_conf.package_url is not None:
             self.add_line(f"repo_url: '{repository_conf.package_url}'")
 
-        self.add_lines_from_template()
+        self.add_lines_from_template(source_paths)
         self.write_file()
 
+    def read_nav(self) -> dict:
+        """
+        Returns:
+            dict: The nested nav dictionnary of the nav of the file, without its Home entry.
+        """
+        import yaml
+
+        self.load()
+        nav_dic = nav_entries_to_dict(yaml.safe_load(self.nav) or [])
+        if nav_dic.get("Home") == "index.md":
+            del nav_dic["Home"]
+        return nav_dic
+
     def current_content(self, with_nav=True) -> list:
-        original_content = []
-        with open(self.file_path, "r") as fi:
-            for line in fi.readlines():
-                original_content.append(line)
-                if "nav:" == line.lower().replace(" ", "") and not with_nav:
-                    return original_content
-        return original_content
-
-
-parser = argparse.ArgumentParser(
-    description="Automatic markdown documentation mkdocstrings formated files generator",
-)
-parser.add_argument("package_name", help="Name of the packaged sources folder")
-parser.add_argument(
-    "current_path",
-    default=os.getcwd(),
-    nargs="?",
-    help=(
-        "local path used througout the program to generate the doc files. by default,it's the current working directory"
-    ),
-)
-parser.add_argument(
-    "-l",
-    "--layout",
-    default="flat",
-    help="Layout style for the source code to document, default is 'flat' and optionnal is src",
-)
-parser.add_argument(
-    "-u",
-    "--username",
-    default=None,
-    help="Name of the user to wich the repo belongs to.Used to automatically determine things for auto mkdocs config.",
-)
-parser.add_argument(
-    "-p",
-    "--platform",
-    default="github",
-    help=(
-        "Platform on wich auto_doc is ran in CI/CD container. Supports github and gitlab, "
-        "and is used to automatically determine the url of the published "
-        "static documentation site homepage."
-    ),
-)
-parser.add_argument(
-    "-g",
-    "--groups",
-    default="",
-    help=(
-        "Groups (on gitlab) or organisation (on hithub) on wich the repo is located. "
-        "Use / to separate groups if multiple are present (gitlab only)"
-    ),
-)
-
-
-def console_mkds_make_docfiles():
-    """Calls the auto-doc program on a code repository.
+        self.load()
+        text = self.render() if with_nav else self.before
+        return text.splitlines(keepends=True)
+
 
+def nav_entries_to_dict(entries: list) -> dict:
+    """
+    Args:
+        entries (list): The nav of mkdocs.yml, as loaded from yaml : a list of ``{title: page_path}``
+            or ``{title: [entries]}`` dictionnaries.
+    Returns:
+        dict: The same nav, as a nested nav dictionnary. Entries without a title are ignored.
+    """
+    nav_dic = {}
+    for entry in entries:
+        if not hasattr(entry, "items"):
+            continue
+        for key, value in entry.items():
+            nav_dic[str(key)] = nav_entries_to_dict(value) if isinstance(value, list) else value
+    return nav_dic
+
+
+def make_mkdocs_nav(nav_dic: dict) -> list:
+    """
+    Args:
+        nav_dic (dict): The nested nav dictionnary made by ``RepositoryConfigurator.make_nav``.
+    Returns:
+        list: The same nav, in the format of the ``nav`` key of mkdocs.yml.
+    """
+    return [
+        {key: make_mkdocs_nav(value) if hasattr(value, "items") else value.replace(os.sep, "/")}
+        for key, value in nav_dic.items()
+    ]
+
+
+def render_nav(nav_dic: dict) -> str:
+    """
+    Renders the entries of the nav key of mkdocs.yml, always starting with index.md as home.
+    The tree is walked with an explicit stack and the lines are joined once, so that the time and memory
+    are linear in the number of entries.
+    Args:
+        nav_dic (dict): The nested nav dictionnary, made by ``RepositoryConfigurator.make_nav``.
+    Returns:
+        str: The nav entries, one per line.
+    """
+
+    def _quoting(name: str) -> str:
+        return "'" + name.replace("'", "''") + "'"
+
+    lines = ["    - Home: index.md\n"]
+    stack = [(iter(nav_dic.items()), "    ")]
+    while stack:
+        entries, indent = stack[-1]
+        for key, value in entries:
+            if hasattr(value, "items"):
+                lines.append(f"{indent}- {key}: \n")
+                stack.append((iter(value.items()), indent + "    "))
+                break
+            lines.append(f"{indent}- {_quoting(key)}: {_quoting(value)}\n")
+        else:
+            stack.pop()
+    return "".join(lines)
+
+
+def make_docs(args) -> None:
+    """
+    Generates the documentation of a package, then builds (gitlab) or deploys (github) its site with mkdocs.
+    With ``versions``, builds the site of each version instead (see ``versions``).
     Args:
-        see argparse.ArgumentParser.
-        This function is not meant to be called internally in python but through CLI.
+        args (argparse.Namespace): Arguments parsed by ``cli.get_parser``.
     """
-    args = parser.parse_args()
+    from .build import build_site
+
+    if args.versions is not None:
+        from .versions import build_versions
+
+        return build_versions(args)
+
     LOGGER.info("Running auto_fast_docs")
 
     configurator = RepositoryConfigurator(args)
-    configurator.run()
+    nav_dic = configurator.run()
 
     LOGGER.info("Running mkdocs build")
 
-    if "github" in args.platform:
-        command = "mkdocs gh-deploy --force"
-        # if args.token:
-        #     command += f"--remote-name https://{args.token}@github.com/{args.username}/{args.package_name}.git"
-        subprocess.run(command, shell=True)
-    elif "gitlab" in args.platform:
-        command = "mkdocs build --site-dir public"
-        subprocess.run(command, shell=True)
-    else:
-        raise ValueError("Must be gitlab or github")
+    config_file = os.path.join(configurator.cwd, "mkdocs.yml")
+    # the nav is given as it is, instead of letting mkdocs read it again from mkdocs.yml
+    nav = [{"Home": "index.md"}] + make_mkdocs_nav(nav_dic)
+    build_options = dict(use_subprocess=args.mkdocs_subprocess, shards=args.build_shards, jobs=args.jobs)
+    if args.render_cache:
+        build_options.update(
+            render_cache=get_render_cache(args, configurator.cwd), page_sources=configurator.get_page_sources()
+        )
+    with configurator.profiler.phase("mkdocs", subprocess=args.mkdocs_subprocess or args.build_shards > 1):
+        if "github" in args.platform:
+            # if args.token:
+            #     command += f"--remote-name https://{args.token}@github.com/{args.username}/{args.package_name}.git"
+            build_site(config_file, "gh-deploy", nav=nav, incremental_deploy=args.incremental_deploy, **build_options)
+        elif "gitlab" in args.platform:
+            build_site(config_file, "build", site_dir="public", nav=nav, **build_options)
+        else:
+            raise ValueError("Must be gitlab or github")
+
+    configurator.profiler.write(args.profile, args.profile_format)
+
+
+def get_render_cache(args, cwd: str) -> "RenderCache":
+    """
+    Returns:
+        RenderCache: The render cache of the command line options, in the cache folder (even with ``--no-cache``).
+    """
+    from .render_cache import RenderCache
+
+    cache_dir = args.cache_dir if args.cache_dir is not None else os.path.join(cwd, CACHE_DIRNAME)
+    return RenderCache(cache_dir, args.render_cache_size * 1_000_000)
+
+
+def __getattr__(name):
+    # the parsers are built on first use by the cli module, these names are kept for compatibility
+    if name in ("parser", "options_parser"):
+        from . import cli
+
+        return cli.get_parser() if name == "parser" else cli.get_options_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,241 @@
+import os
+import logging
+import argparse
+import multiprocessing
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import tomllib
+except ImportError:  # python < 3.11
+    import tomli as tomllib
+
+from .auto_doc import RepositoryConfigurator, MkdocsConfigurator, unix_join, get_render_cache
+from .build import build_site
+from .constants import CACHE_DIRNAME
+from .discover import iter_files, DEFAULT_PRUNE_DIRS
+
+LOGGER = logging.getLogger()
+
+
+_PACKAGE_OPTIONS = ("layout", "username", "platform", "groups")
+
+
+def read_manifest(manifest_path: str) -> list:
+    """
+    Args:
+        manifest_path (str): Path to the toml manifest.
+    Returns:
+        list: The ``[[package]]`` tables of the manifest, with their path made relative to the manifest folder.
+    """
+    with open(manifest_path, "rb") as f:
+        packages = tomllib.load(f).get("package", [])
+    manifest_folder = os.path.dirname(os.path.abspath(manifest_path))
+    for package in packages:
+        if "name" not in package:
+            raise ValueError(f"Every [[package]] of {manifest_path} must have a name key")
+        package["path"] = os.path.join(manifest_folder, package.get("path", "."))
+    return packages
+
+
+def get_package_args(args, package: dict) -> argparse.Namespace:
+    """
+    Returns:
+        argparse.Namespace: The arguments of a single package run, like the main command would have parsed them.
+    """
+    package_args = argparse.Namespace(**vars(args))
+    package_args.package_name = package["name"]
+    package_args.current_path = os.path.normpath(os.path.join(args.root, package.get("path", ".")))
+    for option in _PACKAGE_OPTIONS:
+        if option in package:
+            setattr(package_args, option, package[option])
+    if args.combined:
+        package_args.docs_dir = os.path.join(args.root, "docs", package["name"])
+    # one symbol index per package, next to the requested paths
+    for option in ("symbol_index", "symbol_index_json"):
+        if getattr(args, option) is not None:
+            stem, extension = os.path.splitext(getattr(args, option))
+            setattr(package_args, option, f"{stem}_{package['name']}{extension}")
+    if args.cache_dir is None:
+        # one cache folder for the whole monorepo, instead of one per package
+        package_args.cache_dir = os.path.join(args.root, CACHE_DIRNAME)
+    return package_args
+
+
+def share_discovery(configurators: list) -> None:
+    """
+    Walks the folders of every package at once (from their common parent, entering only folders that lead to
+    or are inside a package), and gives each configurator its own python files.
+    The discovery rules of each package are applied to the folders and files it owns.
+    """
+    package_paths = [os.path.normpath(configurator.package_path) for configurator in configurators]
+    root = os.path.commonpath(package_paths)
+
+    relative_packages = [os.path.relpath(path, root) for path in package_paths]
+    relative_packages = ["" if path == os.curdir else path for path in relative_packages]
+    package_rules = {package: configurator.rules for package, configurator in zip(relative_packages, configurators)}
+    # the deepest package first, so that a nested package gets its own files
+    by_depth = sorted(relative_packages, key=len, reverse=True)
+
+    def _owner(relative_path):
+        for package in by_depth:
+            if package == "" or relative_path.startswith(package + os.sep):
+                return package
+        return None
+
+    # folders excluded by the rules of their package, but entered anyway to reach a nested package
+    excluded_folders = []
+
+    def _enter(relative_folder):
+        leads = any(
+            relative_folder == package or package.startswith(relative_folder + os.sep) for package in relative_packages
+        )
+        owner = _owner(relative_folder)
+        if owner is None:
+            return leads
+        rules = package_rules[owner]
+        if rules is None or rules.enter(relative_folder[len(owner) + 1 :] if owner else relative_folder):
+            return True
+        if leads:
+            excluded_folders.append((relative_folder, owner))
+        return leads
+
+    discovered = {path: [] for path in relative_packages}
+    for relpath in iter_files(root, r".*\.py$", relative=True, prune=DEFAULT_PRUNE_DIRS, enter=_enter):
+        package = _owner(relpath)
+        if package is None:
+            continue
+        if any(relpath.startswith(folder + os.sep) and owner == package for folder, owner in excluded_folders):
+            continue
+        filepath = relpath[len(package) + 1 :] if package else relpath
+        if package_rules[package] is None or package_rules[package].keep(filepath):
+            discovered[package].append(filepath)
+
+    for configurator, package in zip(configurators, relative_packages):
+        configurator.discovered_files = discovered[package]
+
+
+def prefix_nav(nav_dic: dict, prefix: str) -> dict:
+    return {
+        key: prefix_nav(value, prefix) if hasattr(value, "items") else unix_join(prefix, value)
+        for key, value in nav_dic.items()
+    }
+
+
+def build_package_site(
+    cwd: str,
+    use_subprocess: bool = False,
+    shards: int = 1,
+    jobs: int | None = None,
+    render_cache=None,
+    page_sources: dict | None = None,
+) -> None:
+    LOGGER.info(f"Running mkdocs build in {cwd}")
+    build_site(
+        os.path.join(cwd, "mkdocs.yml"),
+        use_subprocess=use_subprocess,
+        shards=shards,
+        jobs=jobs,
+        render_cache=render_cache,
+        page_sources=page_sources,
+    )
+
+
+def batch(args) -> None:
+    """
+    Generates (and builds, unless ``no_build``) the documentation of every package of a batch run.
+    Args:
+        args (argparse.Namespace): Arguments parsed by ``cli.get_batch_parser``.
+    """
+    packages = read_manifest(args.manifest) if args.manifest is not None else []
+    for package in args.packages:
+        name, _, path = package.partition("=")
+        packages.append({"name": name, "path": path or "."})
+    if not packages:
+        raise ValueError("No package to document : give package names, or a --manifest")
+
+    jobs = args.jobs if args.jobs is not None else os.cpu_count() or 1
+    # the pool is fed by the threads documenting the packages : a worker forked while they run would inherit the
+    # state of their locks, so the workers are spawned
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as executor:
+        configurators = []
+        for package in packages:
+            configurator = RepositoryConfigurator(get_package_args(args, package))
+            configurator.set_jobs(jobs, executor)
+            configurators.append(configurator)
+        share_discovery(configurators)
+
+        run = (lambda configurator: configurator.make_markdown_files()) if args.combined else RepositoryConfigurator.run
+        with ThreadPoolExecutor(max_workers=max(1, args.package_jobs)) as package_executor:
+            results = list(package_executor.map(run, configurators))
+
+    if args.profile is not None:
+        # one trace per package, next to the requested path
+        stem, extension = os.path.splitext(args.profile)
+        for configurator in configurators:
+            configurator.profiler.write(f"{stem}_{configurator.package_name}{extension}", args.profile_format)
+
+    # one render cache for the whole monorepo, like the parse cache
+    render_cache = get_render_cache(args, args.root) if args.render_cache and not args.mkdocs_subprocess else None
+    if args.combined:
+        write_combined_config(args, configurators, results)
+        if not args.no_build:
+            page_sources = None
+            if render_cache is not None:
+                page_sources = {
+                    f"{configurator.package_name}/{page_path}": digest
+                    for configurator in configurators
+                    for page_path, digest in configurator.get_page_sources().items()
+                }
+            build_package_site(
+                args.root, args.mkdocs_subprocess, args.build_shards, args.jobs, render_cache, page_sources
+            )
+        return
+
+    if args.no_build:
+        return
+    cwds = [configurator.cwd for configurator in configurators]
+    if args.mkdocs_subprocess:
+        with ThreadPoolExecutor(max_workers=max(1, args.package_jobs)) as package_executor:
+            list(package_executor.map(lambda cwd: build_package_site(cwd, use_subprocess=True), cwds))
+    else:
+        # mkdocs and its markdown extensions keep global state : in process builds can't run concurrently
+        for configurator in configurators:
+            page_sources = configurator.get_page_sources() if render_cache is not None else None
+            build_package_site(
+                configurator.cwd,
+                shards=args.build_shards,
+                jobs=args.jobs,
+                render_cache=render_cache,
+                page_sources=page_sources,
+            )
+
+
+def write_combined_config(args, configurators: list, nav_dics: list) -> None:
+    """
+    Writes the index and the mkdocs.yml of a combined site at the root, with one nav section per package.
+    """
+    docpath = os.path.join(args.root, "docs")
+    index_path = os.path.join(docpath, "index.md")
+    if not os.path.isfile(index_path):
+        with open(index_path, "w") as f:
+            f.write(f"# {os.path.basename(os.path.abspath(args.root))}\n\n")
+            f.writelines(f"- **{configurator.package_name}**\n" for configurator in configurators)
+
+    nav_dic = {}
+    for configurator, package_nav in zip(configurators, nav_dics):
+        nav_dic[configurator.package_name] = prefix_nav(package_nav, configurator.package_name)
+
+    site = SimpleNamespace(
+        package_name=os.path.basename(os.path.abspath(args.root)),
+        username=args.username,
+        static_doc_url=None,
+        package_url=None,
+    )
+    source_paths = [
+        os.path.relpath(os.path.dirname(configurator.package_path), args.root).replace(os.sep, "/")
+        for configurator in configurators
+    ]
+    mkd_conf = MkdocsConfigurator(os.path.join(args.root, "mkdocs.yml"))
+    mkd_conf.auto_config(site, sorted(set(source_paths)))
+    mkd_conf.write_mkdocs_nav(nav_dic)
@@ -0,0 +1,177 @@
+import os
+import sys
+import logging
+import subprocess
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .render_cache import RenderCache
+
+LOGGER = logging.getLogger()
+
+COMMANDS = ("build", "gh-deploy")
+
+
+class MkdocsBuildError(RuntimeError):
+    """
+    mkdocs failed to build or to deploy a site.
+
+    Attributes:
+        command str: The mkdocs command that failed, ``build`` or ``gh-deploy``.
+        config_file str: Path of the mkdocs.yml of the site.
+        reason str: The error reported by mkdocs.
+        returncode int | None: Exit code of mkdocs, when it was ran in a subprocess.
+    """
+
+    def __init__(self, command: str, config_file: str, reason: str, returncode: int | None = None):
+        self.command = command
+        self.config_file = config_file
+        self.reason = reason
+        self.returncode = returncode
+        super().__init__(f"mkdocs {command} failed for {config_file} : {reason}")
+
+    def __reduce__(self):
+        # raised in the processes building shards, so it must survive pickling
+        return (self.__class__, (self.command, self.config_file, self.reason, self.returncode))
+
+
+def build_site(
+    config_file: str,
+    command: str = "build",
+    site_dir: str | None = None,
+    nav: list | None = None,
+    use_subprocess: bool = False,
+    shards: int = 1,
+    jobs: int | None = None,
+    render_cache: "RenderCache | None" = None,
+    page_sources: dict | None = None,
+    incremental_deploy: bool = False,
+) -> None:
+    """
+    Builds (and deploys, with ``gh-deploy``) a mkdocs site, in the current process through the mkdocs python api,
+    so that the interpreter startup and the imports of mkdocs and its plugins are not paid again.
+    Args:
+        config_file (str): Path of the mkdocs.yml of the site.
+        command (str): ``build``, or ``gh-deploy`` to build and push the site to the gh-pages branch (forced).
+        site_dir (str | None): Overrides the site_dir of mkdocs.yml.
+        nav (list | None): Overrides the nav of mkdocs.yml (in the mkdocs format), when it is already in memory.
+        use_subprocess (bool): Runs the mkdocs command line in a separate process instead.
+        shards (int): Splits the pages in this number of shards, built in parallel processes (see ``shards``).
+        jobs (int | None): Maximum number of processes building shards at once. By default, one per shard.
+        render_cache (RenderCache | None): Reuses the HTML of the pages that didn't change since a previous build
+            from this cache (see ``render_cache``), and stores the pages it renders in it.
+        page_sources (dict | None): A digest of the python files documented in each page, keyed by src_uri.
+            Only these pages are taken from the render cache.
+        incremental_deploy (bool): With ``gh-deploy``, commits and pushes (without force) only the files of the site
+            that changed since the last commit of the gh-pages branch (see ``deploy``).
+    Raises:
+        MkdocsBuildError: If mkdocs reports an error.
+    """
+    if command not in COMMANDS:
+        raise ValueError(f"command must be one of {COMMANDS}, not {command}")
+    if use_subprocess:
+        if render_cache is not None:
+            LOGGER.warning("The render cache can't be used when mkdocs runs in a subprocess, every page is rendered")
+        if command == "gh-deploy" and incremental_deploy:
+            run_mkdocs_subprocess(config_file, "build", site_dir)
+            return deploy_built_site(config_file, load_site_config(config_file, site_dir))
+        return run_mkdocs_subprocess(config_file, command, site_dir)
+
+    from mkdocs.commands import gh_deploy
+    from mkdocs.exceptions import MkDocsException
+
+    try:
+        config = load_site_config(config_file, site_dir, nav)
+        if shards > 1:
+            from .shards import build_sharded_site
+
+            build_sharded_site(config_file, config, shards, nav, jobs, render_cache, page_sources)
+        else:
+            run_build(config, command, plugins=get_render_cache_plugins(render_cache, page_sources))
+        if render_cache is not None:
+            evicted = render_cache.evict()
+            if evicted:
+                LOGGER.info(f"Render cache : {evicted} least recently used pages evicted")
+        if command == "gh-deploy" and incremental_deploy:
+            deploy_built_site(config_file, config)
+        elif command == "gh-deploy":
+            gh_deploy.gh_deploy(config, force=True)
+    except MkDocsException as error:
+        raise MkdocsBuildError(command, config_file, error.format_message()) from error
+
+
+def deploy_built_site(config_file: str, config) -> None:
+    """
+    Deploys a built site incrementally to the remote branch of its config (``remote_name`` and ``remote_branch``).
+    Raises:
+        MkdocsBuildError: If a git command fails.
+    """
+    from .deploy import deploy_site
+
+    repository = os.path.dirname(os.path.abspath(config_file))
+    try:
+        deploy_site(config.site_dir, repository, config.remote_name, config.remote_branch)
+    except ValueError as error:
+        raise MkdocsBuildError("gh-deploy", config_file, str(error)) from error
+
+
+def load_site_config(config_file: str, site_dir: str | None = None, nav: list | None = None):
+    """
+    Returns:
+        mkdocs.config.defaults.MkDocsConfig: The validated config of the site, with the given overrides.
+    """
+    from mkdocs.config import load_config
+
+    overrides = {}
+    if site_dir is not None:
+        overrides["site_dir"] = site_dir
+    if nav is not None:
+        overrides["nav"] = nav
+    return load_config(config_file, **overrides)
+
+
+def run_build(config, command: str = "build", plugins: dict | None = None) -> None:
+    """
+    Builds a site from its loaded config, calling the startup and shutdown events of the plugins
+    like the mkdocs command line does.
+    Args:
+        config (mkdocs.config.defaults.MkDocsConfig): The config returned by ``load_site_config``.
+        command (str): The mkdocs command given to the plugins.
+        plugins (dict | None): Extra plugins instances to use for this build, keyed by name.
+    """
+    from mkdocs.commands import build
+
+    for name, plugin in (plugins or {}).items():
+        config.plugins[name] = plugin
+    config.plugins.on_startup(command=command, dirty=False)
+    try:
+        build.build(config)
+    finally:
+        config.plugins.on_shutdown()
+
+
+def get_render_cache_plugins(render_cache: "RenderCache | None", page_sources: dict | None) -> dict:
+    """
+    Returns:
+        dict: The plugin using the render cache, keyed by name, to give to ``run_build``. Empty without a cache.
+    """
+    if render_cache is None:
+        return {}
+    from .render_cache import RenderCachePlugin
+
+    return {"auto_fast_docs/render_cache": RenderCachePlugin(render_cache, page_sources or {})}
+
+
+def run_mkdocs_subprocess(config_file: str, command: str = "build", site_dir: str | None = None) -> None:
+    """
+    Same as ``build_site``, but runs the mkdocs command line in a separate process.
+    """
+    arguments = [sys.executable, "-m", "mkdocs", command, "--config-file", config_file]
+    if command == "gh-deploy":
+        arguments.append("--force")
+    if site_dir is not None:
+        arguments += ["--site-dir", site_dir]
+    LOGGER.debug(f"Running {' '.join(arguments)}")
+    result = subprocess.run(arguments, cwd=os.path.dirname(os.path.abspath(config_file)))
+    if result.returncode != 0:
+        raise MkdocsBuildError(command, config_file, f"exited with code {result.returncode}", result.returncode)
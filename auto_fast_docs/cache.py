@@ -0,0 +1,208 @@
+import os
+import json
+import hashlib
+import logging
+
+from . import __version__
+
+LOGGER = logging.getLogger()
+
+# bump this when the layout of the cached entries changes, so that old caches are dropped instead of misread.
+_CACHE_FORMAT = 5
+
+
+def hash_file(path, algorithm="sha256"):
+    """
+    Returns the hexadecimal digest of the bytes of a file, read by chunks.
+    Args:
+        path (str): Full path to the file to hash.
+        algorithm (str): Any algorithm name supported by ``hashlib.new``. Defaults to ``sha256``.
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    On-disk cache of the ``content`` extracted by ``PyfileParser`` for each module of a package.
+
+    Entries are keyed on the module path relative to the package root, and validated in two steps :
+
+    - stat fast path : a module whose mtime and size are unchanged is reused.
+    - content hash : otherwise the file is hashed, and reused if its sha256 is unchanged
+        (this is what makes the cache survive a fresh CI checkout, where every mtime changes).
+
+    Entries of modules that are not seen during a run are evicted when the cache is saved.
+    The cache is a single json file per package, inside ``cache_dir``, so that the directory can be saved
+    and restored between CI runs.
+
+    Attributes:
+        hits int: number of modules reused from the cache during this run.
+        misses int: number of modules that had to be parsed during this run.
+    """
+
+    def __init__(self, cache_dir, package_name):
+        self.cache_dir = cache_dir
+        self.file_path = os.path.join(cache_dir, f"parse_{package_name}.json")
+        self.entries = {}
+        self.load()
+        self.reset()
+
+    def reset(self):
+        self.root = None
+        self.hits = 0
+        self.misses = 0
+        self.signatures = {}
+        # digests computed by get for the modules that must be parsed again, reused by put
+        self.digests = {}
+        self.seen = {}
+
+    def load(self):
+        if not os.path.isfile(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            LOGGER.warning(f"Could not read the parse cache at {self.file_path}, starting from an empty one")
+            return
+        if data.get("format") != _CACHE_FORMAT or data.get("version") != __version__:
+            LOGGER.info("Parse cache was written by another version of auto_fast_docs, ignoring it")
+            return
+        self.entries = data.get("files", {})
+
+    def save(self):
+        """
+        Writes the entries seen during this run to disk. Entries of modules that were not seen are dropped.
+        """
+        self.write()
+        evicted = len(set(self.entries) - set(self.seen))
+        LOGGER.info(
+            f"Parse cache : {self.hits} modules reused, {self.misses} parsed, {evicted} evicted ({self.file_path})"
+        )
+        self.entries = self.seen
+
+    def write(self):
+        data = {
+            "format": _CACHE_FORMAT,
+            "version": __version__,
+            "files": self.seen,
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, self.file_path)
+
+    def scan(self, root, relpaths):
+        """
+        Stats every module, before any lookup.
+        Args:
+            root (str): The package path, to wich ``relpaths`` are relative.
+            relpaths (list): Relative paths of the modules that will be looked up during this run.
+        """
+        self.reset()
+        self.root = root
+        for relpath in relpaths:
+            stat = os.stat(os.path.join(root, relpath))
+            self.signatures[relpath] = [stat.st_mtime_ns, stat.st_size]
+
+    def get(self, relpath):
+        """
+        Returns the cached content of a module if it is still valid, None otherwise.
+        Args:
+            relpath (str): Path of the module relative to the package root given to ``scan``.
+        Returns:
+            dict | None: The ``PyfileParser.content`` of the module, or None if it must be parsed again.
+        """
+        entry = self.entries.get(relpath)
+        if entry is None:
+            return self._miss()
+
+        signature = self.signatures[relpath]
+        if entry["stat"] == signature:
+            return self._hit(relpath, entry)
+
+        digest = hash_file(os.path.join(self.root, relpath))
+        if digest == entry["sha256"]:
+            entry["stat"] = signature
+            return self._hit(relpath, entry)
+
+        self.digests[relpath] = digest
+        return self._miss()
+
+    def put(self, relpath, content):
+        """
+        Stores the freshly parsed content of a module. The file is only hashed if ``get`` didn't hash it already.
+        Args:
+            relpath (str): Path of the module relative to the package root given to ``scan``.
+            content (dict): The ``PyfileParser.content`` of the module.
+        """
+        digest = self.digests.pop(relpath, None)
+        if digest is None:
+            digest = hash_file(os.path.join(self.root, relpath))
+        self.seen[relpath] = {"stat": self.signatures[relpath], "sha256": digest, "content": content}
+
+    def _hit(self, relpath, entry):
+        self.hits += 1
+        self.seen[relpath] = entry
+        return entry["content"]
+
+    def _miss(self):
+        self.misses += 1
+        return None
+
+
+class BlobParseCache(ParseCache):
+    """
+    Parse cache shared by the versions of a package built by ``--versions`` (see ``versions``), keyed on the git
+    blob hash of each module instead of its path : a file that is the same in several versions is parsed once,
+    and its hash comes from ``git ls-tree``, without reading nor hashing the file.
+    As the content of a module holds its name, the key is the blob hash and the file name.
+
+    The entries of every version built during a run are kept (``scan`` doesn't forget the previous versions),
+    the other ones are evicted when the cache is saved.
+
+    Attributes:
+        blobs dict: The blob hash of each module of the version being parsed, keyed by its path relative to the
+            package root. Modules without a blob hash (not tracked by git) are always parsed.
+    """
+
+    def __init__(self, cache_dir, package_name):
+        super().__init__(cache_dir, f"{package_name}_blobs")
+        self.blobs = {}
+
+    def scan(self, root, relpaths):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, relpath):
+        blob = self.blobs.get(relpath)
+        return None if blob is None else f"{blob}:{os.path.basename(relpath)}"
+
+    def get(self, relpath):
+        key = self.key(relpath)
+        entry = self.entries.get(key)
+        if entry is None:
+            return self._miss()
+        self.hits += 1
+        self.seen[key] = entry
+        return entry["content"]
+
+    def put(self, relpath, content):
+        key = self.key(relpath)
+        if key is not None:
+            self.seen[key] = {"content": content}
+
+    def save(self):
+        # only the entries of the versions built so far are written, but the versions parsed next
+        # can still reuse the other entries of the previous runs
+        self.write()
+        LOGGER.info(f"Parse cache : {self.hits} modules reused, {self.misses} parsed ({self.file_path})")
+        self.entries.update(self.seen)
@@ -0,0 +1,435 @@
+"""
+Command line entry points. This module only imports the standard library pieces needed to parse the arguments :
+the modules doing the work (and their dependencies) are imported once the arguments are parsed,
+so that ``--help`` and small runs start fast.
+"""
+
+import os
+import sys
+import logging
+import argparse
+import functools
+
+from .constants import CACHE_DIRNAME
+
+LOGGER = logging.getLogger()
+
+
+@functools.lru_cache(maxsize=None)
+def get_options_parser() -> argparse.ArgumentParser:
+    """
+    Returns the options shared by every command (the main one, watch and batch).
+    """
+    options_parser = argparse.ArgumentParser(add_help=False)
+    options_parser.add_argument(
+        "-l",
+        "--layout",
+        default="flat",
+        help="Layout style for the source code to document, default is 'flat' and optionnal is src",
+    )
+    options_parser.add_argument(
+        "-u",
+        "--username",
+        default=None,
+        help=(
+            "Name of the user to wich the repo belongs to. "
+            "Used to automatically determine things for auto mkdocs config."
+        ),
+    )
+    options_parser.add_argument(
+        "-p",
+        "--platform",
+        default="github",
+        help=(
+            "Platform on wich auto_doc is ran in CI/CD container. Supports github and gitlab, "
+            "and is used to automatically determine the url of the published "
+            "static documentation site homepage."
+        ),
+    )
+    options_parser.add_argument(
+        "-g",
+        "--groups",
+        default="",
+        help=(
+            "Groups (on gitlab) or organisation (on hithub) on wich the repo is located. "
+            "Use / to separate groups if multiple are present (gitlab only)"
+        ),
+    )
+    options_parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help=(
+            "Directory where the parse cache is stored between runs. "
+            f"By default, it's a {CACHE_DIRNAME} folder in the current_path. "
+            "Save and restore it in CI to speed up runs."
+        ),
+    )
+    options_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of processes used to parse the python files. By default, it's the number of CPUs of the machine.",
+    )
+    options_parser.add_argument(
+        "--docs-dir",
+        default=None,
+        help="Folder where the markdown files are generated. By default, it's the docs folder in the current_path.",
+    )
+    options_parser.add_argument(
+        "--granularity",
+        choices=("symbol", "module", "package"),
+        default="symbol",
+        help=(
+            "Makes one documentation page per class and function (symbol, the default), "
+            "per module (module) or per package folder (package). Fewer pages build much faster with mkdocs."
+        ),
+    )
+    options_parser.add_argument(
+        "--render",
+        choices=("mkdocstrings", "preview"),
+        default="mkdocstrings",
+        help=(
+            "How the classes and functions are rendered : mkdocstrings stubs rendered during the mkdocs build "
+            "(the default), or preview, final markdown written from the sources (signatures and Google style "
+            "docstrings), much faster to build but without cross references. Pages are labeled as previews."
+        ),
+    )
+    options_parser.add_argument(
+        "--public-api",
+        action="store_true",
+        help=(
+            "Only documents the public API : the names in the __all__ of each module, or re-exported by the "
+            "__init__.py of each package, under their shortest public import path. Private modules are left out. "
+            "It's read from the sources, nothing is imported."
+        ),
+    )
+    options_parser.add_argument(
+        "--include",
+        action="append",
+        default=None,
+        metavar="PATTERN",
+        help=(
+            "Only documents the python files matching this glob pattern (or regular expression, prefixed with re:), "
+            "relative to the package folder. Can be given several times, and adds to the include list of "
+            "[tool.auto_fast_docs] in pyproject.toml."
+        ),
+    )
+    options_parser.add_argument(
+        "--exclude",
+        action="append",
+        default=None,
+        metavar="PATTERN",
+        help=(
+            "Never walks into the folders, nor documents the python files, matching this glob pattern "
+            "(or regular expression, prefixed with re:). Can be given several times, and adds to the exclude list "
+            "of [tool.auto_fast_docs] in pyproject.toml."
+        ),
+    )
+    options_parser.add_argument(
+        "--exclude-private",
+        action="store_true",
+        help="Doesn't document the modules and folders whose name starts with a single underscore.",
+    )
+    options_parser.add_argument(
+        "--since",
+        default=None,
+        metavar="GIT_REF",
+        help=(
+            "Only parses again the python files changed since this git reference (commit, branch, tag), and reuses "
+            "the nav of the existing mkdocs.yml for the others. Meant for pull request preview builds."
+        ),
+    )
+    options_parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Logs the full lists of discovered files, generated pages and the final mkdocs.yml content.",
+    )
+    options_parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="TRACE_PATH",
+        help="Records the wall time, CPU time and peak memory of each phase of the run, and writes them to TRACE_PATH.",
+    )
+    options_parser.add_argument(
+        "--profile-format",
+        choices=("json", "chrome"),
+        default="json",
+        help="Format of the --profile trace : plain json (default), or chrome trace events (for chrome://tracing).",
+    )
+    options_parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=20,
+        help="Number of slowest files to parse recorded in the --profile trace. Default is 20",
+    )
+    options_parser.add_argument(
+        "--symbol-index",
+        default=None,
+        metavar="INDEX_PATH",
+        help=(
+            "Keeps an index of the documented symbols (module, qualified name, kind, lines, docstring hash, page) "
+            "in this SQLite database. Every file is then parsed, even the ones without anything to document."
+        ),
+    )
+    options_parser.add_argument(
+        "--symbol-index-json",
+        default=None,
+        metavar="JSON_PATH",
+        help="Also exports the symbol index to this json file. Requires --symbol-index.",
+    )
+    options_parser.add_argument(
+        "--build-shards",
+        type=int,
+        default=1,
+        help=(
+            "Splits the pages of the site in this number of shards, built by parallel processes with mkdocs, "
+            "then merged. Default is 1 (a single mkdocs build)."
+        ),
+    )
+    options_parser.add_argument(
+        "--render-cache",
+        action="store_true",
+        help=(
+            "Keeps the HTML of the pages built by mkdocs in a 'rendered' folder of the cache folder, and reuses it "
+            "in the next builds for the pages whose stub, python files and mkdocs config didn't change."
+        ),
+    )
+    options_parser.add_argument(
+        "--render-cache-size",
+        type=int,
+        default=500,
+        metavar="MB",
+        help="Size of the render cache above wich the least recently used pages are evicted. Default is 500 MB",
+    )
+    options_parser.add_argument(
+        "--mkdocs-subprocess",
+        action="store_true",
+        help=(
+            "Runs mkdocs in a separate process (the mkdocs command line), instead of in the current one "
+            "through its python api."
+        ),
+    )
+    options_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every python file again, without reading nor writing the parse cache.",
+    )
+    return options_parser
+
+
+@functools.lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Returns the parser of the main command.
+    """
+    parser = argparse.ArgumentParser(
+        description="Automatic markdown documentation mkdocstrings formated files generator",
+        parents=[get_options_parser()],
+    )
+    parser.add_argument("package_name", help="Name of the packaged sources folder")
+    parser.add_argument(
+        "current_path",
+        default=os.getcwd(),
+        nargs="?",
+        help=(
+            "local path used througout the program to generate the doc files. "
+            "by default,it's the current working directory"
+        ),
+    )
+    parser.add_argument(
+        "--versions",
+        nargs="+",
+        default=None,
+        metavar="GIT_REF",
+        help=(
+            "Documents and builds each of these git references (branches, tags, commits) of the local repository, "
+            "in its own git worktree, in public/<version>, with a mike compatible versions.json for the version "
+            "selector of the material theme. The first one is the default version. Nothing is deployed."
+        ),
+    )
+    parser.add_argument(
+        "--incremental-deploy",
+        action="store_true",
+        help=(
+            "On github, commits only the files of the site that changed since the last commit of the gh-pages "
+            "branch of the remote, on top of it, and pushes it without force, instead of mkdocs gh-deploy --force."
+        ),
+    )
+    return parser
+
+
+@functools.lru_cache(maxsize=None)
+def get_watch_parser() -> argparse.ArgumentParser:
+    """
+    Returns the parser of the watch subcommand.
+    """
+    watch_parser = argparse.ArgumentParser(
+        prog="auto_fast_docs watch",
+        description=(
+            "Generates the documentation once, then watches the package sources and updates only the pages "
+            "of the modified modules, while mkdocs serves the site."
+        ),
+        parents=[get_parser()],
+        add_help=False,
+    )
+    watch_parser.add_argument(
+        "-a",
+        "--dev-addr",
+        default="localhost:8000",
+        help="IP address and port on wich mkdocs serves the documentation. Default is localhost:8000",
+    )
+    watch_parser.add_argument(
+        "--no-serve",
+        action="store_true",
+        help="Only keep the docs folder and mkdocs.yml up to date, without starting mkdocs serve.",
+    )
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.1,
+        help="Seconds between two checks for changes. Default is 0.1",
+    )
+    watch_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.2,
+        help="Seconds without any new change to wait for, before updating the docs. Default is 0.2",
+    )
+    watch_parser.add_argument(
+        "--polling",
+        action="store_true",
+        help="Detect changes by polling the files modification times, even if watchdog is installed.",
+    )
+    return watch_parser
+
+
+@functools.lru_cache(maxsize=None)
+def get_batch_parser() -> argparse.ArgumentParser:
+    """
+    Returns the parser of the batch subcommand.
+    """
+    batch_parser = argparse.ArgumentParser(
+        prog="auto_fast_docs batch",
+        description=(
+            "Generates the documentation of several packages in a single run, sharing the discovery walk, "
+            "the parse cache and the parsing processes between them."
+        ),
+        parents=[get_options_parser()],
+    )
+    batch_parser.add_argument(
+        "packages",
+        nargs="*",
+        help=(
+            "Packages to document, as 'package_name' or 'package_name=path', path being the folder "
+            "(relative to --root) that contains the package (and its mkdocs.yml in per package mode). "
+            "Can be combined with --manifest."
+        ),
+    )
+    batch_parser.add_argument(
+        "-m",
+        "--manifest",
+        default=None,
+        help=(
+            "A toml file listing the packages to document, as [[package]] tables with a name key, "
+            "and optionally path, layout, username, platform and groups keys (overriding the command line options)."
+        ),
+    )
+    batch_parser.add_argument(
+        "--root",
+        default=os.getcwd(),
+        help=(
+            "Root folder of the monorepo. Package paths are relative to it. "
+            "By default, it's the current working directory"
+        ),
+    )
+    batch_parser.add_argument(
+        "--combined",
+        action="store_true",
+        help=(
+            "Builds one site at the root, with a nav section per package (pages in docs/<package_name>), "
+            "instead of one site per package."
+        ),
+    )
+    batch_parser.add_argument(
+        "--package-jobs",
+        type=int,
+        default=1,
+        help="Number of packages generated (and built, with --mkdocs-subprocess) concurrently. Default is 1",
+    )
+    batch_parser.add_argument(
+        "--no-build",
+        action="store_true",
+        help="Only generate the markdown files and mkdocs.yml files, without running mkdocs build.",
+    )
+    return batch_parser
+
+
+def set_verbosity(verbose: bool):
+    """
+    Sets up the logging of the command line : messages are printed to stdout, at the INFO level (DEBUG if verbose).
+    """
+    if not any(getattr(handler, "_auto_fast_docs", False) for handler in LOGGER.handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(" %(levelname)-8s : %(message)s"))
+        handler._auto_fast_docs = True
+        LOGGER.addHandler(handler)
+    LOGGER.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+
+def console_mkds_make_docfiles():
+    """Calls the auto-doc program on a code repository.
+
+    Args:
+        see get_parser.
+        This function is not meant to be called internally in python but through CLI.
+    """
+    if sys.argv[1:2] == ["watch"]:
+        return console_mkds_watch(sys.argv[2:])
+    if sys.argv[1:2] == ["batch"]:
+        return console_mkds_batch(sys.argv[2:])
+
+    parser = get_parser()
+    args = parser.parse_args()
+    if args.versions is not None and args.since is not None:
+        # each version is documented from scratch in its own worktree
+        parser.error("--since can't be used with --versions")
+    set_verbosity(args.verbose)
+    from .auto_doc import make_docs
+
+    make_docs(args)
+
+
+def console_mkds_watch(argv=None):
+    """Calls the auto-doc watch mode on a code repository.
+
+    Args:
+        see get_watch_parser.
+        This function is not meant to be called internally in python but through CLI : ``auto_fast_docs watch``.
+    """
+    watch_parser = get_watch_parser()
+    args = watch_parser.parse_args(argv)
+    if args.since is not None:
+        # updates need the content of every module, that a --since run doesn't parse
+        watch_parser.error("--since can't be used in watch mode")
+    if args.versions is not None:
+        watch_parser.error("--versions can't be used in watch mode")
+    set_verbosity(args.verbose)
+    from .watch import watch
+
+    watch(args)
+
+
+def console_mkds_batch(argv=None):
+    """Calls the auto-doc program on several packages of a repository.
+
+    Args:
+        see get_batch_parser.
+        This function is not meant to be called internally in python but through CLI : ``auto_fast_docs batch``.
+    """
+    args = get_batch_parser().parse_args(argv)
+    set_verbosity(args.verbose)
+    from .batch import batch
+
+    batch(args)
@@ -0,0 +1,7 @@
+"""
+Name shared by the command line (``cli``) and the modules doing the work. Kept apart, without imports,
+so that ``cli`` can use it without importing these modules and their dependencies.
+"""
+
+# folder of the parse and render caches, in the current path by default
+CACHE_DIRNAME = ".auto_fast_docs_cache"
@@ -0,0 +1,184 @@
+"""
+Incremental deploy of a built site to the gh-pages branch (``--incremental-deploy``), instead of ``mkdocs gh-deploy``
+that commits every file of the site again and force pushes it.
+
+The files of the site are compared, by git blob hash, to the tree of the last commit of the remote branch :
+only the changed and added files are written in the object database, the new tree is made from the previous one
+in a temporary index, and the commit made on top of the remote branch is pushed without force. As the remote
+already has every other object, the push only sends the changed files. Everything but the fetch and the push uses
+the local repository.
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+
+from . import __version__
+from .gitdiff import git
+
+LOGGER = logging.getLogger()
+
+NOJEKYLL = ".nojekyll"
+
+_EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+_NULL_OBJECT = "0" * 40
+_REGULAR_MODE = "100644"
+_EXECUTABLE_MODE = "100755"
+
+
+def blob_hash(filepath: str) -> str:
+    """
+    Returns:
+        str: The hash git gives to the content of a file (``git hash-object --no-filters``), without running git.
+    """
+    with open(filepath, "rb") as f:
+        content = f.read()
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def list_site_files(site_dir: str) -> dict:
+    """
+    Returns:
+        dict: The git mode and blob hash of each file of a site folder, keyed by its path relative to it
+            (with ``/`` separators, like in a git tree).
+    """
+    files = {}
+    for root, _, filenames in os.walk(site_dir, followlinks=True):
+        for filename in filenames:
+            filepath = os.path.join(root, filename)
+            relpath = os.path.relpath(filepath, site_dir).replace(os.sep, "/")
+            mode = _EXECUTABLE_MODE if os.access(filepath, os.X_OK) else _REGULAR_MODE
+            files[relpath] = (mode, blob_hash(filepath))
+    return files
+
+
+def list_tree_files(repository: str, commit: str) -> dict:
+    """
+    Returns:
+        dict: The git mode and blob hash of each file of the tree of a commit, keyed by its path.
+    """
+    files = {}
+    for entry in git(repository, "ls-tree", "-r", "-z", commit).split("\0"):
+        if not entry:
+            continue
+        meta, _, path = entry.partition("\t")
+        mode, _, blob = meta.split()
+        files[path] = (mode, blob)
+    return files
+
+
+def fetch_branch(repository: str, remote: str, branch: str) -> str | None:
+    """
+    Returns:
+        str | None: The last commit of the branch of the remote, fetched in the local repository, or None if the
+            remote has no such branch yet.
+    """
+    if not git(repository, "ls-remote", "--heads", remote, f"refs/heads/{branch}").strip():
+        return None
+    # the history of the branch is not needed, but a complete repository must not be made shallow
+    depth = ["--depth", "1"] if git(repository, "rev-parse", "--is-shallow-repository").strip() == "true" else []
+    git(repository, "fetch", "--no-tags", *depth, remote, f"refs/heads/{branch}")
+    return git(repository, "rev-parse", "--verify", "FETCH_HEAD^{commit}").strip()
+
+
+def update_local_branch(repository: str, branch: str, commit: str) -> bool:
+    """
+    Fast forwards the local branch to a deployed commit (or creates it), so that it follows the deploys.
+    A local branch that is checked out, or that has commits missing from the history of the deployed commit
+    (never deployed), is left alone.
+    Returns:
+        bool: True if the local branch was updated.
+    """
+    ref = f"refs/heads/{branch}"
+    local = git(repository, "for-each-ref", "--format=%(objectname)", ref).strip()
+    if local:
+        try:
+            head = git(repository, "symbolic-ref", "-q", "HEAD").strip()
+        except ValueError:
+            # detached HEAD
+            head = None
+        if head == ref:
+            return False
+        try:
+            git(repository, "merge-base", "--is-ancestor", local, commit)
+        except ValueError:
+            return False
+    # the branch is only moved if it didn't change in the meantime
+    git(repository, "update-ref", ref, commit, local or _NULL_OBJECT)
+    return True
+
+
+def get_source_commit(repository: str) -> str:
+    try:
+        return git(repository, "rev-parse", "--short", "HEAD").strip()
+    except ValueError:
+        # no commit yet
+        return "unknown"
+
+
+def deploy_site(
+    site_dir: str,
+    repository: str,
+    remote: str = "origin",
+    branch: str = "gh-pages",
+    message: str | None = None,
+) -> str | None:
+    """
+    Commits the changes of a site since the last commit of a remote branch on top of it, and pushes the commit
+    (without force : the push fails if the branch moved in the meantime). Once pushed, the local branch of the same
+    name is fast forwarded to the commit, if it can be (see ``update_local_branch``).
+    Like ``mkdocs gh-deploy``, a ``.nojekyll`` file is added to the site.
+    Args:
+        site_dir (str): Folder of the built site.
+        repository (str): Folder inside the git repository, whose remote is deployed to.
+        remote (str): Name or url of the remote.
+        branch (str): Branch of the remote the site is pushed to.
+        message (str | None): Message of the commit. By default, the source commit and the version of auto_fast_docs.
+    Returns:
+        str | None: The pushed commit, or None if the site didn't change.
+    Raises:
+        ValueError: If a git command fails (no repository, unknown remote, rejected push...).
+    """
+    with open(os.path.join(site_dir, NOJEKYLL), "a"):
+        pass
+    site_files = list_site_files(site_dir)
+    parent = fetch_branch(repository, remote, branch)
+    tree_files = list_tree_files(repository, parent) if parent is not None else {}
+
+    changed = sorted(relpath for relpath, entry in site_files.items() if tree_files.get(relpath) != entry)
+    removed = sorted(set(tree_files) - set(site_files))
+    LOGGER.info(
+        f"Deploy to {remote} {branch} : {len(changed)} files changed or added, {len(removed)} removed, "
+        f"{len(site_files) - len(changed)} unchanged"
+    )
+    if parent is not None and not changed and not removed:
+        LOGGER.info("The site didn't change, nothing to deploy")
+        return None
+
+    # only the changed files are written in the object database
+    if changed:
+        paths = "\n".join(os.path.join(site_dir, relpath) for relpath in changed) + "\n"
+        written = git(repository, "hash-object", "-w", "--no-filters", "--stdin-paths", input=paths).split()
+        for relpath, blob in zip(changed, written):
+            if blob != site_files[relpath][1]:
+                raise ValueError(f"{relpath} changed during the deploy")
+
+    # the new tree is the previous one with these changes, made in an index of its own
+    with tempfile.TemporaryDirectory(prefix="auto_fast_docs_deploy_") as index_dir:
+        env = {"GIT_INDEX_FILE": os.path.join(index_dir, "index")}
+        git(repository, "read-tree", parent if parent is not None else _EMPTY_TREE, env=env)
+        index_info = [f"{site_files[relpath][0]} {site_files[relpath][1]}\t{relpath}" for relpath in changed]
+        index_info += [f"0 {_NULL_OBJECT}\t{relpath}" for relpath in removed]
+        git(repository, "update-index", "-z", "--index-info", input="\0".join(index_info) + "\0", env=env)
+        tree = git(repository, "write-tree", env=env).strip()
+
+    if message is None:
+        message = f"Deployed {get_source_commit(repository)} with auto_fast_docs version: {__version__}"
+    parents = ["-p", parent] if parent is not None else []
+    commit = git(repository, "commit-tree", tree, *parents, "-m", message).strip()
+    git(repository, "push", remote, f"{commit}:refs/heads/{branch}")
+    LOGGER.info(f"Commit {commit[:12]} pushed to {remote} {branch}")
+    if not update_local_branch(repository, branch, commit):
+        LOGGER.warning(f"The local {branch} branch is checked out or has commits that were not deployed, it is kept")
+    return commit
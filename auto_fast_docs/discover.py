@@ -1,6 +1,10 @@
 import os
 import re
-import natsort
+import fnmatch
+import logging
+import functools
+
+LOGGER = logging.getLogger()
 
 
 # def unix_join(*args, **kwargs):
@@ -9,12 +13,42 @@ import natsort
 unix_join = os.path.join
 
 
-def find_python_files(search_path):
-    matched_py_files = find_files(search_path, r".*\.py$", relative=True)
+# folders that never contain sources to document. Names can be glob patterns.
+DEFAULT_PRUNE_DIRS = (
+    "__pycache__",
+    ".git",
+    ".hg",
+    ".svn",
+    ".venv",
+    "venv",
+    ".tox",
+    ".nox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".auto_fast_docs_cache",
+    "node_modules",
+    "build",
+    "dist",
+    "*.egg-info",
+)
+
+# names of DEFAULT_PRUNE_DIRS that a subpackage can also have : these folders are pruned only when they are not
+# python packages (without an __init__.py file)
+PRUNED_UNLESS_PACKAGE = frozenset(("build", "dist", "venv"))
+
+# a regex that only checks the end of the path, like r".*\.py$", can be replaced by a str.endswith call
+_SUFFIX_PATTERN = re.compile(r"^(?:\.\*)?((?:\\\.|[\w-])+)\$$")
+
+
+def find_python_files(search_path, prune=DEFAULT_PRUNE_DIRS, rules=None):
+    matched_py_files = find_files(search_path, r".*\.py$", relative=True, prune=prune, rules=rules)
     return matched_py_files
 
 
-def find_files(input_path, re_pattern=None, relative=False, levels=-1, get="files", parts="all", sort=True):
+def find_files(
+    input_path, re_pattern=None, relative=False, levels=-1, get="files", parts="all", sort=True, prune=None, rules=None
+):
     """
     Get full path of files from all folders under the ``input_path`` (including itself).
     Can return specific files with optionnal conditions
@@ -26,46 +60,368 @@ def find_files(input_path, re_pattern=None, relative=False, levels=-1, get="file
     Returns:
         list: List of the file fullpaths found under ``input_path`` folder and subfolders.
     """
+    return list(iter_files(input_path, re_pattern, relative, levels, get, parts, sort, prune, rules=rules))
+
+
+def iter_files(
+    input_path,
+    re_pattern=None,
+    relative=False,
+    levels=-1,
+    get="files",
+    parts="all",
+    sort=True,
+    prune=None,
+    enter=None,
+    rules=None,
+):
+    """
+    Generator version of ``find_files`` : yields paths as the folders are walked, instead of returning a list.
+
+    The walk is iterative and uses ``os.scandir``, so that the file / folder type cached in each ``DirEntry``
+    is reused instead of issuing one more stat per entry.
+    Entries are sorted naturally inside each folder (if ``sort`` is True) and folders are walked depth first :
+    the paths come out in the order of ``discovery_sort_key``, that is not always the one of a natural sort
+    of the whole list (a folder ``a`` and its files are yielded before a file ``a-b.py`` of the same folder).
+    Args:
+        input_path (str): A valid path to a folder, used as the root of the walk.
+        re_pattern (str): A regular expression searched in the path of each entry. None matches everything.
+        relative (bool): If True, yields paths relative to ``input_path``.
+        levels (int): Maximum depth of subfolders to walk into. -1 means no limit.
+        get (str): ``files``, ``dirs`` (or ``folders``) or ``all``, the kind of entries to yield.
+        parts (str): ``all`` yields the paths, ``name`` only the entry names.
+        sort (bool): Sorts the entries of each folder naturally.
+        prune (iterable): Names (or glob patterns) of folders that are never entered, nor yielded.
+            The ones of ``PRUNED_UNLESS_PACKAGE`` are still walked when they hold an ``__init__.py`` file.
+        enter (callable): Optional function taking the relative path of a folder, and returning False
+            if the walk must not enter it (the folder itself can still be yielded).
+        rules (DiscoveryRules): Include / exclude rules, applied to the paths relative to ``input_path`` :
+            excluded folders are never entered nor yielded, and excluded files are not yielded.
+    Yields:
+        str: The matched paths.
+    """
+    if os.path.isfile(input_path):
+        raise ValueError(f"Can only list files in a directory. A file was given : {input_path}")
 
-    # if levels = -1, we get everything whatever the depth, at least up to 32767 subfolders, should be fine.. ;)
     if levels == -1:
         levels = 32767
-    current_level = 0
-    output_list = []
+    match = compile_matcher(re_pattern)
+    is_pruned = compile_pruner(tuple(prune) if prune is not None else ())
+    get_files = get in ("all", "files")
+    get_dirs = get in ("all", "dirs", "folders")
+    sort_key = _natural_sort_key() if sort else None
 
-    def _recursive_search(_input_path):
-        nonlocal current_level
-        for subdir in os.listdir(_input_path):
-            fullpath = unix_join(_input_path, subdir)
-            if os.path.isfile(fullpath):
-                if (get == "all" or get == "files") and (re_pattern is None or qregexp(re_pattern, fullpath)):
-                    output_list.append(os.path.normpath(fullpath))
+    def _entries(path):
+        with os.scandir(path) as iterator:
+            entries = list(iterator)
+        if sort_key is not None:
+            entries.sort(key=lambda entry: sort_key(entry.name))
+        return iter(entries)
 
-            else:
-                if (get == "all" or get == "dirs" or get == "folders") and (
-                    re_pattern is None or qregexp(re_pattern, fullpath)
-                ):
-                    output_list.append(os.path.normpath(fullpath))
-                if current_level < levels:
-                    current_level += 1
-                    _recursive_search(fullpath)
-        current_level -= 1
+    # each stack level holds the iterator over a folder's entries, and the relative path of that folder
+    stack = [(_entries(input_path), "")]
+    while stack:
+        entries, relative_folder = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
 
-    if os.path.isfile(input_path):
-        raise ValueError(f"Can only list files in a directory. A file was given : {input_path}")
+        relative_path = os.path.join(relative_folder, entry.name) if relative_folder else entry.name
+        if entry.is_file():
+            if not get_files:
+                continue
+        else:
+            if is_pruned(entry.name) and is_pruned_folder(is_pruned, entry.path):
+                continue
+            if rules is not None and not rules.enter(relative_path):
+                continue
+            if len(stack) - 1 < levels and (enter is None or enter(relative_path)):
+                stack.append((_entries(entry.path), relative_path))
+            if not get_dirs:
+                continue
+
+        if not match(entry.path):
+            continue
+        if rules is not None and entry.is_file() and not rules.keep(relative_path):
+            continue
+        if parts == "name":
+            yield entry.name
+        elif relative:
+            yield relative_path
+        else:
+            yield os.path.normpath(entry.path)
+
+
+@functools.lru_cache(maxsize=64)
+def compile_matcher(re_pattern=None, case=False):
+    r"""
+    Compiles a regular expression once, into a callable telling if a path matches it.
+
+    Patterns that only check the extension, like ``r".*\.py$"``, are turned into a ``str.endswith`` call.
+    Args:
+        re_pattern (str): A regular expression, searched anywhere in the path, like ``qregexp`` does.
+            None matches every path.
+        case (bool): Case insensitive matching, with the same (inverted) meaning as in ``qregexp``.
+    Returns:
+        callable: A function taking a path and returning a bool.
+    """
+    if re_pattern is None:
+        return lambda path: True
+
+    suffix_match = _SUFFIX_PATTERN.match(re_pattern)
+    if suffix_match is not None:
+        suffix = suffix_match.group(1).replace("\\.", ".")
+        if case:
+            suffix = suffix.lower()
+            return lambda path: path.lower().endswith(suffix)
+        return lambda path: path.endswith(suffix)
+
+    flags = re.MULTILINE | re.IGNORECASE if case else re.MULTILINE
+    search = re.compile(re_pattern, flags).search
+    return lambda path: search(path) is not None
+
+
+@functools.lru_cache(maxsize=64)
+def compile_pruner(prune=()):
+    """
+    Compiles folder names and glob patterns into a callable telling if a folder must not be walked into.
+    Args:
+        prune (tuple): Names (or glob patterns, like ``*.egg-info``) of the folders to prune.
+    Returns:
+        callable: A function taking a folder name and returning a bool.
+    """
+    names = frozenset(name for name in prune if not any(char in name for char in "*?["))
+    patterns = [fnmatch.translate(name) for name in prune if name not in names]
+    if not patterns:
+        return names.__contains__
+    pattern_match = re.compile("|".join(patterns)).match
+    return lambda name: name in names or pattern_match(name) is not None
+
+
+def is_pruned_folder(is_pruned, folder_path: str) -> bool:
+    """
+    Args:
+        is_pruned (callable): A function returned by ``compile_pruner``.
+        folder_path (str): Path of a folder.
+    Returns:
+        bool: True if the walks must not enter the folder : its name is pruned, and it is not a python package
+            named like one of ``PRUNED_UNLESS_PACKAGE`` (a ``build`` subpackage is documented).
+    """
+    name = os.path.basename(os.path.normpath(folder_path))
+    if not is_pruned(name):
+        return False
+    return name not in PRUNED_UNLESS_PACKAGE or not os.path.isfile(os.path.join(folder_path, "__init__.py"))
+
+
+class DiscoveryRules:
+    """
+    Include / exclude rules selecting the python files to document, applied while the package is walked :
+    excluded folders are never entered, so the files under them are never listed, read nor parsed.
+
+    Patterns are matched against the paths relative to the package folder, with ``/`` separators :
+
+    - a glob without ``/`` (like ``tests`` or ``*_pb2.py``) matches the name of a file or folder at any depth,
+    - a glob with ``/`` (like ``vendor/**`` or ``io/legacy_*.py``) matches the whole relative path.
+        ``**`` matches any number of folders, ``*`` and ``?`` never match a ``/``.
+    - a glob ending with ``/`` (like ``generated/``) only matches folders,
+    - a pattern starting with ``re:`` is a regular expression searched in the relative path
+        (folders are tested with a trailing ``/``).
+
+    A folder matched by an exclude pattern is pruned. A file is kept if it matches an include pattern
+    (or if there are none), and no exclude pattern.
+    With ``exclude_private``, modules and folders whose name starts with a single ``_`` are excluded too.
+
+    Attributes:
+        pruned_folders int: number of folders that the walks were not allowed to enter.
+        excluded_files int: number of files found by the walks, but excluded.
+    """
+
+    def __init__(self, include: list | tuple = (), exclude: list | tuple = (), exclude_private: bool = False):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.exclude_private = exclude_private
+        self.match_include = _compile_rules(self.include, folders=False)
+        self.match_exclude_file = _compile_rules(self.exclude, folders=False)
+        self.match_exclude_folder = _compile_rules(self.exclude, folders=True)
+        self.reset_counts()
+
+    def reset_counts(self) -> None:
+        self.pruned_folders = 0
+        self.excluded_files = 0
+
+    def is_excluded_folder(self, relative_folder: str) -> bool:
+        path = relative_folder.replace(os.sep, "/")
+        if self.exclude_private and _is_private(path.rpartition("/")[2]):
+            return True
+        return self.match_exclude_folder(path) or self.match_exclude_folder(path + "/")
+
+    def is_excluded_file(self, relative_path: str) -> bool:
+        path = relative_path.replace(os.sep, "/")
+        if self.exclude_private and _is_private(path.rpartition("/")[2]):
+            return True
+        if self.include and not self.match_include(path):
+            return True
+        return self.match_exclude_file(path)
+
+    def enter(self, relative_folder: str) -> bool:
+        """
+        Returns:
+            bool: False if the walk must not enter the folder. Counted in ``pruned_folders``.
+        """
+        if self.is_excluded_folder(relative_folder):
+            self.pruned_folders += 1
+            return False
+        return True
+
+    def keep(self, relative_path: str) -> bool:
+        """
+        Returns:
+            bool: False if the file is excluded. Counted in ``excluded_files``.
+        """
+        if self.is_excluded_file(relative_path):
+            self.excluded_files += 1
+            return False
+        return True
+
+    def allows(self, relative_path: str) -> bool:
+        """
+        Checks a file path that doesn't come from a walk (like the files changed in git, or in watch mode),
+        including its parent folders. Nothing is counted.
+        Returns:
+            bool: True if the file would have been found by a walk with these rules.
+        """
+        folder = os.path.dirname(relative_path)
+        while folder:
+            if self.is_excluded_folder(folder):
+                return False
+            folder = os.path.dirname(folder)
+        return not self.is_excluded_file(relative_path)
+
+    def log_summary(self) -> None:
+        LOGGER.info(
+            f"Discovery rules pruned {self.pruned_folders} folders (never walked) "
+            f"and excluded {self.excluded_files} python files"
+        )
+
+
+def read_discovery_config(pyproject_path: str) -> dict:
+    """
+    Reads the ``[tool.auto_fast_docs]`` table of a pyproject.toml file.
+    Args:
+        pyproject_path (str): Path to the pyproject.toml file. A missing file gives an empty config.
+    Returns:
+        dict: The ``include``, ``exclude`` (lists of patterns) and ``exclude_private`` (bool) keys that are set.
+    """
+    if not os.path.isfile(pyproject_path):
+        return {}
+    try:
+        import tomllib
+    except ImportError:  # python < 3.11
+        import tomli as tomllib
+
+    with open(pyproject_path, "rb") as f:
+        config = tomllib.load(f).get("tool", {}).get("auto_fast_docs", {})
+    for key in config:
+        if key not in _DISCOVERY_KEYS:
+            LOGGER.warning(f"Unknown key {key} in [tool.auto_fast_docs] of {pyproject_path}, ignoring it")
+    config = {key: value for key, value in config.items() if key in _DISCOVERY_KEYS}
+    for key in ("include", "exclude"):
+        if isinstance(config.get(key), str):
+            config[key] = [config[key]]
+        if not all(isinstance(pattern, str) for pattern in config.get(key, [])):
+            raise ValueError(f"{key} of [tool.auto_fast_docs] in {pyproject_path} must be a list of patterns")
+    if not isinstance(config.get("exclude_private", False), bool):
+        raise ValueError(f"exclude_private of [tool.auto_fast_docs] in {pyproject_path} must be true or false")
+    return config
+
+
+_DISCOVERY_KEYS = ("include", "exclude", "exclude_private")
+
+
+def _is_private(name: str) -> bool:
+    # dunder names (__init__.py, __main__.py) are not private
+    return name.startswith("_") and not name.startswith("__")
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_rules(patterns: tuple, folders: bool):
+    """
+    Compiles the patterns of ``DiscoveryRules`` into a single regular expression.
+    Args:
+        patterns (tuple): Glob patterns, or regular expressions starting with ``re:``.
+        folders (bool): Compiles the patterns matching folders. Otherwise, the ones matching files
+            (every pattern, but the globs ending with ``/``).
+    Returns:
+        callable: A function taking a relative path with ``/`` separators, and returning a bool.
+    """
+    regexes = []
+    for pattern in patterns:
+        if pattern.startswith("re:"):
+            regexes.append(f".*?(?:{pattern[3:]})")
+        elif pattern.endswith("/") and not folders:
+            continue
+        else:
+            regexes.append(_glob_regex(pattern.rstrip("/")) + r"\Z")
+    if not regexes:
+        return lambda path: False
+    match = re.compile("|".join(f"(?:{regex})" for regex in regexes), re.DOTALL).match
+    return lambda path: match(path) is not None
+
+
+def _glob_regex(pattern: str) -> str:
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    regex = [] if anchored else ["(?:.*/)?"]
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            regex.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("**", index):
+            regex.append(".*")
+            index += 2
+        elif pattern[index] == "*":
+            regex.append("[^/]*")
+            index += 1
+        elif pattern[index] == "?":
+            regex.append("[^/]")
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 2 :]:
+            end = pattern.index("]", index + 2)
+            characters = pattern[index + 1 : end]
+            if characters.startswith("!"):
+                characters = "^" + characters[1:]
+            regex.append("[" + characters.replace("\\", "\\\\") + "]")
+            index = end + 1
+        else:
+            regex.append(re.escape(pattern[index]))
+            index += 1
+    return "".join(regex)
+
+
+def discovery_sort_key(relative_path: str) -> list:
+    """
+    Sort key giving relative paths the order in wich ``iter_files`` yields them (folders walked depth first,
+    entries of each folder in natural order), without walking the folders.
+    Args:
+        relative_path (str): A path relative to the walked folder.
+    Returns:
+        list: The natural sort keys of the parts of the path.
+    """
+    sort_key = _natural_sort_key() or (lambda name: name)
+    return [sort_key(part) for part in relative_path.split(os.sep)]
+
+
+@functools.lru_cache(maxsize=None)
+def _natural_sort_key():
+    try:
+        # imported on first use, as it is slow to import
+        import natsort
 
-    _recursive_search(input_path)
-
-    if relative:
-        output_list = [os.path.relpath(file, start=input_path) for file in output_list]
-    if parts == "name":
-        output_list = [os.path.basename(file) for file in output_list]
-    if sort:
-        try:
-            output_list = natsort.natsorted(output_list)
-        except Exception:
-            pass
-    return output_list
+        return natsort.natsort_keygen()
+    except Exception:
+        return None
 
 
 def qregexp(regex, input_line, groupidx=None, matchid=None, case=False):
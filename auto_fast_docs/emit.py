@@ -0,0 +1,219 @@
+import os
+import json
+import queue
+import logging
+import tempfile
+import threading
+import contextlib
+
+LOGGER = logging.getLogger()
+
+# mkdocs excludes dot files from the docs folder, so the manifest is never published
+MANIFEST_NAME = ".auto_fast_docs_pages.json"
+
+
+def _get_umask() -> int:
+    # os.umask can only be read by setting it : done once at import, before any thread writes files
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _get_umask()
+
+
+def atomic_write(path: str, content: str) -> None:
+    """
+    Writes a text file through a temporary file in the same folder, then replaces the destination with it,
+    so that readers (mkdocs serve, a concurrent build) never see a half written file.
+    The file keeps the permissions of the one it replaces, or gets the default ones of a new file (0644 usually),
+    instead of the private ones of the temporary file.
+    Args:
+        path (str): Full path of the file to write.
+        content (str): Text content of the file.
+    """
+    folder = os.path.dirname(path)
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    file_descriptor, temp_path = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as f:
+            f.write(content)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def write_if_changed(path: str, content: str) -> str:
+    """
+    Writes a text file only if its content differs from what is already on disk,
+    so that unchanged files keep their modification time.
+    Args:
+        path (str): Full path of the file to write.
+        content (str): Text content of the file.
+    Returns:
+        str: ``created``, ``updated`` or ``unchanged``.
+    """
+    try:
+        with open(path, "r") as f:
+            if f.read() == content:
+                return "unchanged"
+        status = "updated"
+    except FileNotFoundError:
+        status = "created"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, content)
+    return status
+
+
+class PageWriter:
+    """
+    Writes the generated markdown pages of a docs folder, and removes the ones that are not generated anymore.
+
+    The list of generated pages is kept in a manifest file inside the docs folder,
+    so that only pages written by auto_fast_docs are ever removed. Without a manifest (first run, or docs generated
+    by an older version), no page is removed : a hand written page can look like a generated one.
+
+    Attributes:
+        counts dict: number of ``created``, ``updated``, ``unchanged`` and ``removed`` pages during this run.
+    """
+
+    def __init__(self, docpath: str):
+        self.docpath = docpath
+        self.manifest_path = os.path.join(docpath, MANIFEST_NAME)
+        self.previous_pages = self.load_manifest()
+        self.pages = set()
+        self.counts = {"created": 0, "updated": 0, "unchanged": 0, "removed": 0}
+
+    def load_manifest(self) -> set:
+        try:
+            with open(self.manifest_path, "r") as f:
+                return set(json.load(f)["pages"])
+        except FileNotFoundError:
+            return set()
+        except (OSError, ValueError, KeyError):
+            LOGGER.warning(f"Could not read the pages manifest at {self.manifest_path}, stale pages won't be removed")
+            return set()
+
+    def write(self, relpath: str, content: str, force: bool = False) -> None:
+        """
+        Args:
+            relpath (str): Path of the page, relative to the docs folder.
+            content (str): Markdown content of the page.
+            force (bool): Rewrites the page even if its content didn't change,
+                to make mkdocs render it again when the documented source changed.
+        """
+        self.pages.add(relpath)
+        path = os.path.join(self.docpath, relpath)
+        status = write_if_changed(path, content)
+        if force and status == "unchanged":
+            atomic_write(path, content)
+            status = "updated"
+        self.counts[status] += 1
+
+    def remove(self, relpath: str) -> None:
+        """
+        Removes a generated page, and the folders left empty by its removal.
+        Args:
+            relpath (str): Path of the page, relative to the docs folder.
+        """
+        self.pages.discard(relpath)
+        path = os.path.join(self.docpath, relpath)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        self.counts["removed"] += 1
+        folder = os.path.dirname(path)
+        while os.path.normpath(folder) != os.path.normpath(self.docpath) and not os.listdir(folder):
+            os.rmdir(folder)
+            folder = os.path.dirname(folder)
+
+    def remove_stale_pages(self) -> None:
+        """
+        Removes the pages generated by a previous run that were not written during this one.
+        """
+        for relpath in sorted(self.previous_pages - self.pages):
+            self.remove(relpath)
+
+    def save_manifest(self) -> None:
+        write_if_changed(self.manifest_path, json.dumps({"pages": sorted(self.pages)}, indent=0))
+
+    def log_summary(self) -> None:
+        LOGGER.info("Markdown pages : " + ", ".join(f"{count} {status}" for status, count in self.counts.items()))
+        self.counts = dict.fromkeys(self.counts, 0)
+
+    def finish(self) -> None:
+        """
+        Removes the stale pages, saves the manifest of the pages written during this run and logs a summary.
+        The writer can then keep being used to update single pages, with ``write`` and ``remove``.
+        """
+        self.remove_stale_pages()
+        self.save_manifest()
+        self.previous_pages = set(self.pages)
+        self.log_summary()
+
+
+class ThreadedPageWriter(PageWriter):
+    """
+    Same as ``PageWriter``, but the pages given to ``write`` are written by a background thread, fed through a
+    bounded queue : writing the files overlaps with parsing the next modules, and at most ``maxsize`` pages wait
+    in memory to be written.
+
+    Once ``finish`` (or ``stop``) is called, the thread is stopped and ``write`` writes pages directly again.
+    """
+
+    def __init__(self, docpath: str, maxsize: int = 256, profiler=None):
+        """
+        Args:
+            docpath (str): The docs folder.
+            maxsize (int): Maximum number of pages waiting to be written. ``write`` blocks while the queue is full.
+            profiler (Profiler | None): Records the time spent writing pages, as the ``emission`` phase.
+        """
+        super().__init__(docpath)
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.profiler = profiler
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name="auto_fast_docs_writer", daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        phase = self.profiler.phase("emission") if self.profiler is not None else contextlib.nullcontext()
+        with phase:
+            while (item := self.queue.get()) is not None:
+                if self.error is not None:
+                    # keep consuming, so that the producer never blocks on a full queue
+                    continue
+                try:
+                    super().write(*item)
+                except BaseException as error:
+                    self.error = error
+
+    def write(self, relpath: str, content: str, force: bool = False) -> None:
+        if self.thread is None:
+            return super().write(relpath, content, force)
+        if self.error is not None:
+            raise self.error
+        self.queue.put((relpath, content, force))
+
+    def stop(self) -> None:
+        """
+        Waits for the queued pages to be written, and stops the thread.
+        Raises:
+            Exception: The error that stopped the writing of the pages, if any.
+        """
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        if self.error is not None:
+            raise self.error
+
+    def finish(self) -> None:
+        self.stop()
+        super().finish()
@@ -0,0 +1,60 @@
+import os
+import logging
+import subprocess
+
+LOGGER = logging.getLogger()
+
+
+def git(path: str, *args: str, input: str | None = None, env: dict | None = None) -> str:
+    """
+    Runs a git command in a folder, and returns its output.
+    Args:
+        path (str): Folder in wich the command is ran.
+        *args (str): Arguments of the git command.
+        input (str | None): Given to the command on its standard input.
+        env (dict | None): Environment variables added to the ones of the current process.
+    Returns:
+        str: The standard output of the command.
+    """
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=path,
+            input=input,
+            env=None if env is None else {**os.environ, **env},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except FileNotFoundError:
+        raise ValueError("git is not installed, it is required by --since, --versions and --incremental-deploy")
+    except subprocess.CalledProcessError as error:
+        raise ValueError(f"git {' '.join(args)} failed in {path} : {error.stderr.strip()}")
+    return result.stdout
+
+
+def changed_python_files(path: str, ref: str) -> list:
+    """
+    Lists the python files of a folder that differ between a git reference and the working tree :
+    modified, added, deleted, renamed (both the old and the new path) and untracked (but not ignored) files.
+    Only uses the local repository, so it works offline.
+    Args:
+        path (str): A folder inside a git repository. Files outside of it are ignored.
+        ref (str): Any git reference : a commit, a branch (``origin/main``), a tag...
+    Returns:
+        list: Paths of the changed python files, relative to ``path``, sorted.
+    """
+    changed = set()
+    # -z separates fields with NUL, so that paths are never quoted
+    fields = git(path, "diff", "--name-status", "-z", "-M", "--relative", ref, "--").split("\0")
+    index = 0
+    while index < len(fields) and fields[index]:
+        status = fields[index]
+        paths_count = 2 if status[0] in "RC" else 1
+        changed.update(fields[index + 1 : index + 1 + paths_count])
+        index += 1 + paths_count
+
+    untracked = git(path, "ls-files", "--others", "--exclude-standard", "-z")
+    changed.update(filter(None, untracked.split("\0")))
+
+    return sorted(os.path.normpath(filepath) for filepath in changed if filepath.endswith(".py"))
@@ -0,0 +1,97 @@
+"""
+mkdocs plugin generating the documentation pages in memory, during ``mkdocs build`` or ``mkdocs serve``.
+
+Instead of writing the markdown files in the docs folder and the nav in mkdocs.yml before running mkdocs,
+the package is parsed inside the mkdocs process, and the pages are given to mkdocs as virtual files.
+
+Example:
+    ```yaml
+    plugins:
+      - search
+      - auto_fast_docs:
+          package_name: MyPackage
+      - mkdocstrings
+    ```
+"""
+
+import os
+import logging
+
+from mkdocs.config import config_options as c
+from mkdocs.config.base import Config
+from mkdocs.exceptions import PluginError
+from mkdocs.plugins import BasePlugin
+from mkdocs.structure.files import File
+
+from .auto_doc import RepositoryConfigurator, make_mkdocs_nav
+from .cli import get_parser, set_verbosity
+
+LOGGER = logging.getLogger()
+
+
+class AutoFastDocsPluginConfig(Config):
+    package_name = c.Type(str)
+    layout = c.Choice(("flat", "src"), default="flat")
+    granularity = c.Choice(("symbol", "module", "package"), default="symbol")
+    jobs = c.Optional(c.Type(int))
+    cache = c.Type(bool, default=True)
+    cache_dir = c.Optional(c.Type(str))
+    include = c.ListOfItems(c.Type(str), default=[])
+    exclude = c.ListOfItems(c.Type(str), default=[])
+    exclude_private = c.Type(bool, default=False)
+    nav = c.Type(bool, default=True)
+    public_api = c.Type(bool, default=False)
+    render = c.Choice(("mkdocstrings", "preview"), default="mkdocstrings")
+
+
+class AutoFastDocsPlugin(BasePlugin[AutoFastDocsPluginConfig]):
+    """
+    Parses the package in ``on_config`` (setting the nav), and adds its pages as virtual files in ``on_files``.
+    Nothing is written in the docs folder, nor in mkdocs.yml.
+    """
+
+    def on_config(self, config):
+        # follow the verbosity of mkdocs (mkdocs build -v)
+        set_verbosity(logging.getLogger("mkdocs").isEnabledFor(logging.DEBUG))
+        cwd = os.path.dirname(os.path.abspath(config.config_file_path))
+        args = get_parser().parse_args([self.config.package_name, cwd, "--layout", self.config.layout])
+        args.granularity = self.config.granularity
+        args.jobs = self.config.jobs
+        args.no_cache = not self.config.cache
+        args.cache_dir = self.config.cache_dir
+        args.docs_dir = config.docs_dir
+        args.public_api = self.config.public_api
+        args.render = self.config.render
+        # added to the rules of [tool.auto_fast_docs] in pyproject.toml, like the command line ones
+        args.include = self.config.include
+        args.exclude = self.config.exclude
+        args.exclude_private = self.config.exclude_private
+
+        self.configurator = RepositoryConfigurator(args)
+        if not os.path.isdir(self.configurator.package_path):
+            raise PluginError(f"auto_fast_docs : no package found at {self.configurator.package_path}")
+        self.configurator.load_contents()
+        self.pages = self.configurator.make_pages()
+        LOGGER.info(f"auto_fast_docs generated {len(self.pages)} pages in memory")
+
+        if self.config.nav:
+            config.nav = [{"Home": "index.md"}] + make_mkdocs_nav(self.configurator.make_nav())
+        return config
+
+    def on_files(self, files, config):
+        for page_path, page_content in self.pages.items():
+            src_uri = page_path.replace(os.sep, "/")
+            # a page left on disk by a previous command line run would be a duplicate
+            existing = files.get_file_from_path(src_uri)
+            if existing is not None:
+                files.remove(existing)
+            files.append(File.generated(config, src_uri, content=page_content))
+
+        if files.get_file_from_path("index.md") is None:
+            files.append(File.generated(config, "index.md", content=self.configurator.get_index_content()))
+        return files
+
+    def on_serve(self, server, config, builder):
+        # rebuild when the sources change, as the pages are not files that mkdocs serve could watch
+        server.watch(self.configurator.package_path)
+        return server
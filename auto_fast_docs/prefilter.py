@@ -0,0 +1,48 @@
+import os
+import re
+import ast
+import mmap
+
+# a class or function definition always starts a logical line (it cannot follow a ; or a compound statement colon),
+# so any file that can produce a page has one of these at the start of a line. Lines may end with \r only.
+_DEFINITION_PATTERN = re.compile(rb"(?:^|\r)(?:\xef\xbb\xbf)?[ \t\f]*(?:async[ \t]+)?(?:def|class)\b", re.MULTILINE)
+_MODULE_MARKER = b"<EXCLUDE_MODULE_FROM_MKDOCSTRINGS>"
+_ALL_NAME = b"__all__"
+
+
+def may_have_symbols(path: str) -> bool:
+    """
+    Quick byte level check telling if a python file can produce any documentation page,
+    without decoding nor parsing it.
+
+    The file is memory mapped and searched for a ``def``, ``async def`` or ``class`` keyword at the start of a line.
+    If none is found, or if the ``<EXCLUDE_MODULE_FROM_MKDOCSTRINGS>`` marker is found in the module docstring,
+    the file cannot produce a page. Files that may export names for the public API mode
+    (``__init__.py`` files, and files mentioning ``__all__``) are always parsed.
+    The check is conservative : when in doubt (a keyword inside a string, a marker outside of the docstring...)
+    it returns True and the file is parsed as usual.
+    Args:
+        path (str): The full path to the python file.
+    Returns:
+        bool: False if the file certainly contains nothing to document, True otherwise.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if os.path.basename(path) == "__init__.py" or mapped.find(_ALL_NAME) != -1:
+                return True
+            definition = _DEFINITION_PATTERN.search(mapped)
+            if definition is None:
+                return False
+            if mapped.find(_MODULE_MARKER, 0, definition.start()) == -1:
+                return True
+            head = mapped[: definition.start()]
+
+    # the marker appears before the first definition, so it may be in the module docstring.
+    # Parsing only the head of the file is enough to know : the docstring is its first statement.
+    try:
+        docstring = ast.get_docstring(ast.parse(head))
+    except (SyntaxError, ValueError):
+        return True
+    return docstring is None or _MODULE_MARKER.decode() not in docstring
@@ -0,0 +1,222 @@
+"""
+Preview renderer (``--render preview``) : documents the classes and functions of a module from its AST,
+and writes final markdown pages, instead of ``::: module.symbol`` stubs that mkdocstrings renders during the build.
+
+Signatures and docstrings are taken from the nodes that ``PyfileParser`` walks anyway, and the Google style
+sections of the docstrings (``Args:``, ``Returns:``, ``Example:``...) are turned into lists and admonitions.
+Nothing is imported, and cross references, inherited members or docstrings styles other than Google are not handled :
+pages are labeled as previews.
+"""
+
+import re
+import ast
+import copy
+import textwrap
+
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+PREVIEW_BANNER = (
+    '!!! warning "Preview"\n'
+    "    This page is a quick preview, rendered from the sources without mkdocstrings : "
+    "cross references, inherited members and non Google style docstrings are not rendered.\n\n"
+)
+
+# titles of the Google style sections, rendered as lists of items
+_LIST_SECTIONS = {
+    "args": "Parameters",
+    "arguments": "Parameters",
+    "parameters": "Parameters",
+    "params": "Parameters",
+    "keyword args": "Keyword arguments",
+    "keyword arguments": "Keyword arguments",
+    "kwargs": "Keyword arguments",
+    "other parameters": "Other parameters",
+    "attributes": "Attributes",
+    "returns": "Returns",
+    "return": "Returns",
+    "yields": "Yields",
+    "yield": "Yields",
+    "raises": "Raises",
+    "warns": "Warns",
+}
+
+# titles of the Google style sections, rendered as admonitions
+_ADMONITION_SECTIONS = {
+    "example": "example",
+    "examples": "example",
+    "note": "note",
+    "notes": "note",
+    "warning": "warning",
+    "warnings": "warning",
+    "tip": "tip",
+    "hint": "tip",
+    "important": "info",
+    "see also": "info",
+    "references": "info",
+    "todo": "todo",
+    "danger": "danger",
+    "caution": "warning",
+    "attention": "warning",
+}
+
+_SECTION_PATTERN = re.compile(r"^([A-Za-z][A-Za-z ]*):\s*$")
+# "name (type): description" (or "name type: description") in parameters sections,
+# "type: description" in returns sections
+_PARAMETER_PATTERN = re.compile(r"^(\*{0,2}[\w.]+)(?:\s*\((.*)\)|\s+([\w.\[\], |]+?))?\s*:(?:\s+(.*))?$")
+_TYPE_PATTERN = re.compile(r"^([^\s:][^:]*?)\s*:(?:\s+(.*))?$")
+
+
+def extract_preview(node, is_excluded=None, method: bool = False) -> dict:
+    """
+    Extracts what ``render_preview`` needs to document a class or a function, from its AST node.
+    Args:
+        node (ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef): The definition.
+        is_excluded (callable): Takes a member node and returns True if it is excluded from the documentation.
+        method (bool): The function is defined in a class : its first argument is not shown (unless a staticmethod).
+    Returns:
+        dict: The ``name``, ``kind`` (``class`` or ``function``), ``signature``, ``docstring`` and ``decorators``
+            of the definition, and for a class, its ``bases`` and the same dictionnary for its public ``members``.
+            The ``signature`` of a class without ``__init__`` is None.
+    """
+    decorators = [ast.unparse(decorator) for decorator in node.decorator_list]
+    if isinstance(node, ast.ClassDef):
+        # like the merge_init_into_class option of mkdocstrings
+        init = next((item for item in node.body if isinstance(item, _FUNCTION_TYPES) and item.name == "__init__"), None)
+        docstrings = [ast.get_docstring(node), None if init is None else ast.get_docstring(init)]
+        # like the filters of the mkdocs.yml template : members starting with _ are not documented
+        members = [
+            extract_preview(item, is_excluded, method=True)
+            for item in node.body
+            if isinstance(item, _FUNCTION_TYPES + (ast.ClassDef,))
+            and not item.name.startswith("_")
+            and (is_excluded is None or not is_excluded(item))
+        ]
+        return {
+            "name": node.name,
+            "kind": "class",
+            # without an __init__, the signature is inherited : it can't be known without the bases
+            "signature": None if init is None else get_parameters(init, method=True),
+            "returns": None,
+            "docstring": "\n\n".join(docstring for docstring in docstrings if docstring),
+            "decorators": decorators,
+            "bases": [ast.unparse(base) for base in node.bases],
+            "members": members,
+        }
+    return {
+        "name": node.name,
+        "kind": "function",
+        "signature": get_parameters(node, method and "staticmethod" not in decorators),
+        "returns": None if node.returns is None else ast.unparse(node.returns),
+        "docstring": ast.get_docstring(node) or "",
+        "decorators": decorators,
+        "async": isinstance(node, ast.AsyncFunctionDef),
+    }
+
+
+def get_parameters(node, method: bool = False) -> str:
+    """
+    Returns:
+        str: The parameters of a function, as written in its signature (without the first one for a method).
+    """
+    arguments = node.args
+    if method:
+        arguments = copy.copy(arguments)
+        if arguments.posonlyargs:
+            arguments.posonlyargs = arguments.posonlyargs[1:]
+        elif arguments.args:
+            arguments.args = arguments.args[1:]
+    return ast.unparse(arguments)
+
+
+def render_preview(name: str, preview: dict, heading_level: int = 1) -> str:
+    """
+    Renders the markdown documentation of a class or a function.
+    Args:
+        name (str): The name to show in the heading (the public name, in public API mode).
+        preview (dict): What ``extract_preview`` returned for the definition.
+        heading_level (int): Level of the heading of the definition. Members are one level below.
+    Returns:
+        str: The markdown documentation.
+    """
+    lines = [f"{'#' * min(heading_level, 6)} `{name}`", "", "```python"]
+    lines.extend(f"@{decorator}" for decorator in preview["decorators"])
+    if preview["kind"] == "class":
+        lines.append(f"class {name}" if preview["signature"] is None else f"class {name}({preview['signature']})")
+    else:
+        returns = "" if preview["returns"] is None else f" -> {preview['returns']}"
+        lines.append(f"{'async ' if preview.get('async') else ''}def {name}({preview['signature']}){returns}")
+    lines.extend(["```", ""])
+    if preview.get("bases"):
+        lines.extend(["Bases: " + ", ".join(f"`{base}`" for base in preview["bases"]), ""])
+    if preview["docstring"]:
+        lines.extend([format_docstring(preview["docstring"]), ""])
+    parts = ["\n".join(lines).rstrip()]
+    for member in preview.get("members", []):
+        parts.append(render_preview(member["name"], member, heading_level + 1))
+    return "\n\n".join(parts)
+
+
+def format_docstring(docstring: str) -> str:
+    """
+    Turns the Google style sections of a (cleaned) docstring into markdown. Other lines are kept as they are.
+    Args:
+        docstring (str): The docstring, as returned by ``ast.get_docstring``.
+    Returns:
+        str: The markdown text.
+    """
+    lines = docstring.splitlines()
+    output = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        header = _SECTION_PATTERN.match(line)
+        title = header.group(1).strip().lower() if header is not None else None
+        if title not in _LIST_SECTIONS and title not in _ADMONITION_SECTIONS:
+            output.append(line)
+            index += 1
+            continue
+
+        # the section is made of the indented (or blank) lines that follow its header
+        end = index + 1
+        while end < len(lines) and (not lines[end].strip() or lines[end][:1] in (" ", "\t")):
+            end += 1
+        body = textwrap.dedent("\n".join(lines[index + 1 : end])).strip("\n")
+        if output and output[-1].strip():
+            output.append("")
+        if title in _LIST_SECTIONS:
+            output.extend([f"**{_LIST_SECTIONS[title]}:**", "", format_items(body, title), ""])
+        else:
+            output.append(f'!!! {_ADMONITION_SECTIONS[title]} "{header.group(1).strip()}"')
+            output.extend(f"    {body_line}" if body_line.strip() else "" for body_line in body.splitlines())
+            output.append("")
+        index = end
+    return "\n".join(output).strip("\n")
+
+
+def format_items(body: str, title: str) -> str:
+    """
+    Returns:
+        str: The items of a parameters, returns or raises section, as a markdown list.
+            Lines indented below an item continue its description.
+    """
+    pattern = _TYPE_PATTERN if _LIST_SECTIONS[title] in ("Returns", "Yields", "Raises", "Warns") else _PARAMETER_PATTERN
+    items = []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        match = None if line[:1] in (" ", "\t") else pattern.match(line)
+        if match is None:
+            if items:
+                items[-1] += " " + line.strip()
+            else:
+                items.append(line.strip())
+            continue
+        if pattern is _PARAMETER_PATTERN:
+            name, annotation, bare_annotation, description = match.groups()
+            annotation = annotation or bare_annotation
+            item = f"`{name}`" if not annotation else f"`{name}` (`{annotation}`)"
+        else:
+            annotation, description = match.groups()
+            item = f"`{annotation}`"
+        items.append(f"{item} : {description}" if description else item)
+    return "\n".join(f"- {item}" for item in items)
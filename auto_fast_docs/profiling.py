@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import heapq
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+LOGGER = logging.getLogger()
+
+
+def peak_rss(children: bool = False) -> int | None:
+    """
+    Returns:
+        int | None: The peak resident set size, in bytes, of the current process (or of its waited for children)
+            since it started : it never decreases. None where it is not available (windows).
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on linux, but in bytes on macos
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+def current_rss() -> int | None:
+    """
+    Returns:
+        int | None: The current resident set size, in bytes, of the current process.
+            None where it is not available (anywhere but linux).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def children_cpu_time() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Profiler:
+    """
+    Records the wall time, CPU time and RSS of the phases of a run, and the slowest files to parse.
+    A disabled profiler records nothing, so that it can always be called.
+
+    Phases can run at the same time in different threads (the pages are written by a thread while the modules are
+    parsed) : ``cpu_time`` is the CPU time of the thread running the phase, and ``process_cpu_time`` the one of the
+    whole process during the phase, that counts the phases running at the same time more than once.
+    ``rss_start`` and ``rss_end`` are the RSS when the phase started and ended, ``lifetime_peak_rss`` the peak RSS
+    of the process since it started, not the one of the phase.
+
+    Attributes:
+        phases list: one dict per recorded phase, in the order they started.
+        slowest_files list: the ``(seconds, path)`` of the slowest files to parse, slowest first.
+    """
+
+    def __init__(self, enabled: bool = False, top_files: int = 20):
+        self.enabled = enabled
+        self.top_files = top_files
+        self.origin = time.perf_counter()
+        self.phases = []
+        self._file_heap = []
+
+    @contextmanager
+    def phase(self, name: str, subprocess: bool = False):
+        """
+        Context manager measuring the phase it wraps.
+        Args:
+            name (str): Name of the phase.
+            subprocess (bool): Also measures the CPU time and peak RSS of the child processes waited for during the
+                phase (the peak RSS of children is the maximum over all children since the start of the program).
+        """
+        if not self.enabled:
+            yield
+            return
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        process_cpu_start = time.process_time()
+        children_cpu_start = children_cpu_time()
+        rss_start = current_rss()
+        try:
+            yield
+        finally:
+            record = {
+                "name": name,
+                "start": wall_start - self.origin,
+                "wall_time": time.perf_counter() - wall_start,
+                "cpu_time": time.thread_time() - cpu_start,
+                "process_cpu_time": time.process_time() - process_cpu_start,
+                "rss_start": rss_start,
+                "rss_end": current_rss(),
+                "lifetime_peak_rss": peak_rss(),
+                "thread": threading.get_ident(),
+            }
+            if subprocess:
+                record["children_cpu_time"] = children_cpu_time() - children_cpu_start
+                record["children_lifetime_peak_rss"] = peak_rss(children=True)
+            self.phases.append(record)
+            LOGGER.debug(f"{name} took {record['wall_time']:.3f} s")
+
+    def record_file(self, path: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        if len(self._file_heap) < self.top_files:
+            heapq.heappush(self._file_heap, (seconds, path))
+        else:
+            heapq.heappushpop(self._file_heap, (seconds, path))
+
+    @property
+    def slowest_files(self) -> list:
+        return sorted(self._file_heap, reverse=True)
+
+    def to_dict(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "phases": self.phases,
+            "slowest_files": [{"path": path, "seconds": seconds} for seconds, path in self.slowest_files],
+        }
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Returns:
+            dict: The phases in the chrome trace event format, that can be opened in ``chrome://tracing``
+                or https://ui.perfetto.dev
+        """
+        events = []
+        for record in self.phases:
+            events.append(
+                {
+                    "name": record["name"],
+                    "ph": "X",
+                    "ts": record["start"] * 1e6,
+                    "dur": record["wall_time"] * 1e6,
+                    "pid": os.getpid(),
+                    "tid": record["thread"],
+                    "args": {key: value for key, value in record.items() if key not in ("name", "start", "thread")},
+                }
+            )
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"slowest_files": self.to_dict()["slowest_files"]},
+        }
+
+    def write(self, path: str, trace_format: str = "json") -> None:
+        """
+        Args:
+            path (str): Path of the trace file to write.
+            trace_format (str): ``json`` for the plain trace, ``chrome`` for the chrome trace event format.
+        """
+        if not self.enabled:
+            return
+        data = self.to_chrome_trace() if trace_format == "chrome" else self.to_dict()
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        LOGGER.info(f"Profile written to {path}")
+        for record in self.phases:
+            LOGGER.info(f"  {record['name']:<16} {record['wall_time']:8.3f} s wall, {record['cpu_time']:8.3f} s cpu")
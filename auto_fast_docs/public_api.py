@@ -0,0 +1,204 @@
+"""
+Static resolution of the public API of a package, for the ``--public-api`` mode.
+
+The public names of each module are read from the ``__all__`` and ``from ... import ...`` statements collected by
+``PyfileParser`` : nothing is imported. Re-exports are followed through a graph of the modules of the package,
+up to the module where each class or function is defined, so that every object is documented once,
+under the shortest public import path it has.
+
+Example:
+    ```python
+    # mypackage/__init__.py
+    from ._engine import Engine
+    from .io import read as read_file
+
+    __all__ = ["Engine", "read_file"]
+    ```
+    documents ``mypackage.Engine`` and ``mypackage.read_file`` (and not ``mypackage._engine.Engine``).
+"""
+
+import os
+
+
+def module_name(package_name: str, filepath: str) -> str:
+    """
+    Args:
+        package_name (str): Name of the package.
+        filepath (str): Path of a python file, relative to the package path.
+    Returns:
+        str: The dotted import path of the module. ``__init__.py`` files give the name of their package.
+    """
+    parts = os.path.splitext(filepath)[0].split(os.sep)
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join([package_name] + parts)
+
+
+def is_private(name: str) -> bool:
+    # dunder names (__init__, __version__) are not private
+    return name.startswith("_") and not name.startswith("__")
+
+
+class ModuleGraph:
+    """
+    Graph of the modules of a package, linked by their ``from ... import ...`` statements.
+    The public names of the modules, and the definitions they lead to, are memoized.
+
+    Attributes:
+        modules dict: The ``PyfileParser.content`` of each module, keyed by its dotted name.
+        filepaths dict: The path of each module relative to the package path, keyed by its dotted name.
+        packages set: Dotted names of the modules that are packages (``__init__.py`` files).
+    """
+
+    def __init__(self, package_name: str, contents: dict):
+        """
+        Args:
+            package_name (str): Name of the package.
+            contents (dict): The ``PyfileParser.content`` of each module, keyed by its path relative to the package
+                path.
+        """
+        self.package_name = package_name
+        self.modules = {}
+        self.filepaths = {}
+        self.packages = set()
+        for filepath, content in contents.items():
+            name = module_name(package_name, filepath)
+            self.modules[name] = content
+            self.filepaths[name] = filepath
+            if os.path.basename(filepath) == "__init__.py":
+                self.packages.add(name)
+        self._definitions = {}
+        self._public_names = {}
+        self._resolved = {}
+
+    def definitions(self, module: str) -> dict:
+        """
+        Returns:
+            dict: The kind (``classes`` or ``functions``) of each class and function defined in the module,
+                keyed by name, in the order of ``content``.
+        """
+        if module not in self._definitions:
+            content = self.modules[module]
+            self._definitions[module] = {
+                item.split(".")[1]: kind for kind in ("classes", "functions") for item in content[kind]
+            }
+        return self._definitions[module]
+
+    def imported_module(self, module: str, level: int, from_module: str | None) -> str | None:
+        """
+        Returns:
+            str | None: The dotted name of the module a ``from ... import ...`` statement of ``module`` imports from,
+                or None if it is outside of the package.
+        """
+        if level == 0:
+            target = from_module or ""
+        else:
+            # a relative import starts from the package of the module (the module itself for a package)
+            base = module.split(".") if module in self.packages else module.split(".")[:-1]
+            if level - 1 >= len(base):
+                return None
+            base = base[: len(base) - level + 1]
+            target = ".".join(base + ([from_module] if from_module else []))
+        if target == self.package_name or target.startswith(self.package_name + "."):
+            return target
+        return None
+
+    def public_names(self, module: str) -> list:
+        """
+        Returns:
+            list: The public names of the module : its ``__all__`` if it has a static one. Otherwise, the classes and
+                functions it defines, and for a package, the names its ``__init__.py`` imports from the package,
+                leaving out the private ones (starting with an underscore).
+        """
+        if module in self._public_names:
+            return self._public_names[module]
+        # a cycle of star imports stops here
+        self._public_names[module] = []
+        content = self.modules.get(module)
+        if content is None:
+            return []
+        if content.get("all") is not None:
+            names = list(content["all"])
+        else:
+            names = [name for name in self.definitions(module) if not is_private(name)]
+            if module in self.packages:
+                for from_module, level, imported, asname in content.get("imports", []):
+                    target = self.imported_module(module, level, from_module)
+                    if target is None:
+                        continue
+                    if imported == "*":
+                        names.extend(self.public_names(target))
+                    elif not is_private(asname or imported):
+                        names.append(asname or imported)
+        self._public_names[module] = list(dict.fromkeys(names))
+        return self._public_names[module]
+
+    def resolve(self, module: str, name: str) -> tuple | None:
+        """
+        Follows the re-exports of a name, up to the module where it is defined.
+        Returns:
+            tuple | None: ``(kind, module, name)`` of the definition, ``kind`` being ``classes`` or ``functions``.
+                None if the name is not a class or function defined in the package (a variable, a submodule,
+                an object imported from another package, or an excluded one).
+        """
+        key = (module, name)
+        if key in self._resolved:
+            return self._resolved[key]
+        # a cycle of re-exports resolves to nothing
+        self._resolved[key] = None
+        self._resolved[key] = self._resolve(module, name)
+        return self._resolved[key]
+
+    def _resolve(self, module: str, name: str) -> tuple | None:
+        content = self.modules.get(module)
+        if content is None:
+            return None
+        kind = self.definitions(module).get(name)
+        if kind is not None:
+            return (kind, module, name)
+        # the last import binding the name wins, like when the module is run
+        for from_module, level, imported, asname in reversed(content.get("imports", [])):
+            target = self.imported_module(module, level, from_module)
+            if target is None:
+                continue
+            if imported == "*":
+                if name in self.public_names(target):
+                    return self.resolve(target, name)
+            elif (asname or imported) == name:
+                return self.resolve(target, imported)
+        return None
+
+    def is_public_module(self, module: str) -> bool:
+        return not any(is_private(part) for part in module.split("."))
+
+    def public_api(self) -> dict:
+        """
+        Returns:
+            dict: The ``(public_name, (kind, module, name))`` of the classes and functions exported by each public
+                module, keyed by its path relative to the package path, in modules order.
+                Each definition is only exported by the module with the shortest import path (the first one in
+                modules order on a tie), so that it gets a single page.
+        """
+        best = {}
+        for order, module in enumerate(self.modules):
+            if not self.is_public_module(module):
+                continue
+            for public_name in self.public_names(module):
+                definition = self.resolve(module, public_name)
+                rank = (module.count("."), order)
+                if definition is not None and (definition not in best or rank < best[definition][0]):
+                    best[definition] = (rank, module, public_name)
+
+        exports = {}
+        for definition, (_, module, public_name) in best.items():
+            exports.setdefault(module, {})[public_name] = definition
+        # in the order of the modules, then of their public names
+        return {
+            self.filepaths[module]: [
+                (public_name, exports[module][public_name])
+                for public_name in self.public_names(module)
+                if public_name in exports[module]
+            ]
+            for module in self.modules
+            if module in exports
+        }
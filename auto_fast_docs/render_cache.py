@@ -0,0 +1,300 @@
+"""
+Rendered pages cache : the HTML of the pages built by mkdocs is kept in a folder that CI can save and restore,
+and the next builds reuse it for the pages that didn't change, instead of rendering them again.
+
+A page is keyed on its markdown stub, the content of the python files it documents, the mkdocs config
+(with the nav, and the versions of mkdocs, its theme and plugins) and the version of auto_fast_docs.
+A page found in the cache is excluded from the build (like the pages of other shards, see ``shards``),
+and once the other pages are built, its HTML is hard linked (or copied) in the site folder, and what it adds
+to the search index, the mkdocstrings inventory, the sitemap and the autorefs anchors is added back.
+The size of the cache is bounded : the least recently used pages are evicted first.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import contextlib
+import logging
+from importlib import metadata
+
+from mkdocs.plugins import BasePlugin, event_priority
+from mkdocs.structure.files import InclusionLevel
+
+from . import __version__
+from .discover import find_files
+from .site_files import (
+    SEARCH_INDEX,
+    INVENTORY,
+    SITEMAP,
+    SITEMAP_URL_PATTERN,
+    ExcludedLinkFilter,
+    add_search_docs,
+    add_inventory_items,
+    add_sitemap_urls,
+)
+
+LOGGER = logging.getLogger()
+
+RENDERED_DIRNAME = "rendered"
+DEFAULT_MAX_SIZE = 500_000_000
+
+# the HTML of a page also depends on the versions of what renders it
+_RENDERING_DISTRIBUTIONS = (
+    "mkdocs",
+    "mkdocs-material",
+    "mkdocstrings",
+    "mkdocstrings-python",
+    "griffe",
+    "griffelib",
+    "mkdocs-autorefs",
+    "markdown",
+    "pymdown-extensions",
+)
+
+
+class RenderCache:
+    """
+    Folder of rendered pages, two files per page : ``<key>.html`` and ``<key>.json``
+    (its search index entries, inventory items, sitemap url and autorefs anchors).
+    The modification time of the json file is the last time the page was used, for the LRU eviction.
+
+    Attributes:
+        path str: The ``rendered`` folder, inside the cache folder.
+        max_size int: Size in bytes above wich the least recently used pages are evicted by ``evict``.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_MAX_SIZE):
+        self.path = os.path.join(cache_dir, RENDERED_DIRNAME)
+        self.max_size = max_size
+
+    def entry_path(self, key: str, extension: str) -> str:
+        # a folder per first two characters, so that no folder holds every page of a big site
+        return os.path.join(self.path, key[:2], key + extension)
+
+    def get(self, key: str) -> dict | None:
+        """
+        Returns:
+            dict | None: The metadata of the page stored under this key (marking it as used), or None.
+        """
+        meta_path = self.entry_path(key, ".json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.isfile(self.entry_path(key, ".html")):
+            return None
+        os.utime(meta_path)
+        return meta
+
+    def put(self, key: str, html_path: str, meta: dict) -> None:
+        """
+        Stores a page rendered by mkdocs.
+        Args:
+            key (str): The key of the page (see ``RenderCachePlugin.page_key``).
+            html_path (str): The page, in the site folder.
+            meta (dict): What the page adds to the files listing every page of the site.
+        """
+        html_target = self.entry_path(key, ".html")
+        os.makedirs(os.path.dirname(html_target), exist_ok=True)
+        # several builds can share the cache (shards, versions) : each one writes its own temporary files
+        suffix = f".{os.getpid()}.tmp"
+        # a copy and not a link : the next build cleans the site folder
+        shutil.copyfile(html_path, html_target + suffix)
+        os.replace(html_target + suffix, html_target)
+        meta_target = self.entry_path(key, ".json")
+        with open(meta_target + suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f, separators=(",", ":"))
+        os.replace(meta_target + suffix, meta_target)
+
+    def link(self, key: str, target: str) -> None:
+        """
+        Puts a cached page in the site folder : hard linked when the site and the cache are on the same
+        file system, copied otherwise.
+        """
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.lexists(target):
+            os.remove(target)
+        try:
+            os.link(self.entry_path(key, ".html"), target)
+        except OSError:
+            shutil.copyfile(self.entry_path(key, ".html"), target)
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used pages until the cache fits in ``max_size``.
+        Returns:
+            int: The number of pages evicted.
+        """
+        entries = {}
+        for relpath in find_files(self.path, r".*\.(html|json)$", relative=True):
+            key, extension = os.path.splitext(os.path.basename(relpath))
+            try:
+                stat = os.stat(os.path.join(self.path, relpath))
+            except FileNotFoundError:
+                # evicted by another build sharing the cache
+                continue
+            size, used = entries.get(key, (0, 0))
+            entries[key] = (size + stat.st_size, max(used, stat.st_mtime) if extension == ".json" else used)
+
+        total = sum(size for size, _ in entries.values())
+        evicted = 0
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_size:
+                break
+            for extension in (".json", ".html"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.entry_path(key, extension))
+            total -= size
+            evicted += 1
+        return evicted
+
+
+def config_digest(config) -> str:
+    """
+    Returns:
+        str: A digest of what the HTML of every page depends on : the mkdocs.yml file, the nav, the extra section,
+            the files of the custom_dir of the theme, the versions of mkdocs, its theme and plugins,
+            and of auto_fast_docs.
+    """
+    digest = hashlib.sha256(__version__.encode())
+    with open(config.config_file_path, "rb") as f:
+        digest.update(f.read())
+    digest.update(json.dumps(config.nav, default=str).encode())
+    # the extra section is read by the theme templates, and can also come from an INHERIT file
+    digest.update(json.dumps(dict(config.extra), default=str, sort_keys=True).encode())
+    for distribution in _RENDERING_DISTRIBUTIONS:
+        try:
+            version = metadata.version(distribution)
+        except metadata.PackageNotFoundError:
+            version = None
+        digest.update(f"\0{distribution}={version}".encode())
+    custom_dir = config.theme.custom_dir
+    if custom_dir is not None and os.path.isdir(custom_dir):
+        for relpath in sorted(find_files(custom_dir, r".*", relative=True)):
+            with open(os.path.join(custom_dir, relpath), "rb") as f:
+                digest.update(f"\0{relpath}\0".encode() + hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+class RenderCachePlugin(BasePlugin):
+    """
+    Excludes from the build the pages found in a ``RenderCache`` once the nav (with every page) is made,
+    and puts them back in the site folder after the build. The pages it renders are stored in the cache.
+
+    Only the pages of ``page_sources`` are cached : the ones auto_fast_docs generated, whose python files are known.
+    """
+
+    def __init__(self, cache: RenderCache, page_sources: dict):
+        """
+        Args:
+            cache (RenderCache): The cache to read and fill.
+            page_sources (dict): A digest of the python files documented in each page, keyed by src_uri.
+        """
+        self.cache = cache
+        self.page_sources = page_sources
+        self.link_filter = ExcludedLinkFilter()
+
+    def on_config(self, config):
+        self.config_digest = config_digest(config)
+        self.hits = {}
+        self.misses = {}
+        self.anchors = {}
+        # record the anchors registered by each page, to register them again when the page comes from the cache
+        autorefs = config.plugins.get("autorefs")
+        if autorefs is not None:
+            register_anchor = autorefs.register_anchor
+
+            def recording_register_anchor(page, identifier, *args, **kwargs):
+                self.anchors.setdefault(getattr(page, "url", page), []).append([identifier, args, kwargs])
+                register_anchor(page, identifier, *args, **kwargs)
+
+            autorefs.register_anchor = recording_register_anchor
+        self.autorefs = autorefs
+        # links to the pages of the cache are expected, mkdocs must not report them
+        logging.getLogger("mkdocs.structure.pages").addFilter(self.link_filter)
+        return config
+
+    def page_key(self, file) -> str:
+        digest = hashlib.sha256(f"{self.config_digest}\0{file.src_uri}\0{self.page_sources[file.src_uri]}\0".encode())
+        digest.update(file.content_bytes)
+        return digest.hexdigest()
+
+    def on_nav(self, nav, config, files):
+        # pages excluded before (by the shard plugin) are left to the build that renders them
+        for file in files.documentation_pages():
+            if file.src_uri not in self.page_sources or file.page is None:
+                continue
+            key = self.page_key(file)
+            meta = self.cache.get(key)
+            if meta is None:
+                self.misses[file.src_uri] = (file, key)
+                continue
+            file.inclusion = InclusionLevel.EXCLUDED
+            self.hits[file.src_uri] = (file, key, meta)
+            if self.autorefs is not None:
+                for identifier, args, kwargs in meta["anchors"]:
+                    self.autorefs.register_anchor(file.page, identifier, *args, **kwargs)
+        return nav
+
+    @event_priority(-100)
+    def on_post_build(self, config):
+        # last, once the other plugins wrote the search index and the inventory
+        site_dir = config.site_dir
+        if self.misses:
+            search_docs, inventory_items, sitemap_urls = read_site_entries(site_dir)
+            for file, key in self.misses.values():
+                url = file.page.url
+                meta = {
+                    "search": search_docs.get(url, []),
+                    "inventory": inventory_items.get(url, []),
+                    "sitemap": sitemap_urls.get(file.page.canonical_url, []),
+                    "anchors": self.anchors.get(url, []),
+                }
+                self.cache.put(key, os.path.join(site_dir, file.dest_uri), meta)
+
+        for file, key, meta in self.hits.values():
+            self.cache.link(key, os.path.join(site_dir, file.dest_uri))
+        add_search_docs(site_dir, [doc for _, _, meta in self.hits.values() for doc in meta["search"]])
+        if self.hits and os.path.isfile(os.path.join(site_dir, INVENTORY)):
+            from mkdocstrings import InventoryItem
+
+            add_inventory_items(
+                site_dir,
+                [InventoryItem.parse_sphinx(line) for _, _, meta in self.hits.values() for line in meta["inventory"]],
+            )
+        add_sitemap_urls(site_dir, [url for _, _, meta in self.hits.values() for url in meta["sitemap"]])
+        LOGGER.info(f"Render cache : {len(self.hits)} pages reused, {len(self.misses)} rendered ({self.cache.path})")
+
+    def on_shutdown(self):
+        logging.getLogger("mkdocs.structure.pages").removeFilter(self.link_filter)
+
+
+def read_site_entries(site_dir: str) -> tuple:
+    """
+    Returns:
+        tuple: The search index entries and the mkdocstrings inventory lines of a built site, keyed by page url,
+            and the ``<url>`` elements of its sitemap, keyed by location.
+    """
+    search_docs = {}
+    if os.path.isfile(os.path.join(site_dir, SEARCH_INDEX)):
+        with open(os.path.join(site_dir, SEARCH_INDEX), "r", encoding="utf-8") as f:
+            for doc in json.load(f)["docs"]:
+                search_docs.setdefault(doc["location"].partition("#")[0], []).append(doc)
+
+    inventory_items = {}
+    if os.path.isfile(os.path.join(site_dir, INVENTORY)):
+        from mkdocstrings import Inventory
+
+        with open(os.path.join(site_dir, INVENTORY), "rb") as f:
+            for item in Inventory.parse_sphinx(f).values():
+                inventory_items.setdefault(item.uri.partition("#")[0], []).append(item.format_sphinx())
+
+    sitemap_urls = {}
+    if os.path.isfile(os.path.join(site_dir, SITEMAP)):
+        with open(os.path.join(site_dir, SITEMAP), "r", encoding="utf-8") as f:
+            for url in SITEMAP_URL_PATTERN.findall(f.read()):
+                location = url.partition("<loc>")[2].partition("</loc>")[0]
+                sitemap_urls.setdefault(location, []).append(url)
+    return search_docs, inventory_items, sitemap_urls
@@ -0,0 +1,204 @@
+"""
+Sharded mkdocs builds : the pages of a site are split in balanced shards, each shard is built by its own process,
+and the outputs are merged in the site folder.
+
+Every shard builds the whole nav (so that every page shows the same nav), but only reads and renders its own pages :
+the other pages are excluded from its build. The files that list every page (search index, mkdocstrings inventory,
+sitemap) are merged from the ones of each shard.
+"""
+
+import os
+import json
+import heapq
+import shutil
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from mkdocs.exceptions import MkDocsException
+from mkdocs.plugins import BasePlugin
+from mkdocs.structure.files import InclusionLevel
+
+from .build import MkdocsBuildError, load_site_config, run_build, get_render_cache_plugins
+from .discover import find_files
+from .site_files import (
+    SEARCH_INDEX,
+    INVENTORY,
+    SITEMAP,
+    SITEMAP_URL_PATTERN,
+    ExcludedLinkFilter,
+    add_search_docs,
+    add_inventory_items,
+    add_sitemap_urls,
+)
+
+LOGGER = logging.getLogger()
+
+_MERGED_FILES = (SEARCH_INDEX, INVENTORY, SITEMAP, SITEMAP + ".gz")
+
+
+class ShardPlugin(BasePlugin):
+    """
+    Excludes from the build the pages that are not part of a shard, once the nav (with every page) is made.
+    """
+
+    def __init__(self, pages: list, all_pages: list, default: bool = False):
+        """
+        Args:
+            pages (list): src_uri of the pages of the shard.
+            all_pages (list): src_uri of the pages of every shard.
+            default (bool): The shard also builds the pages that are in no shard (added by other plugins).
+        """
+        self.pages = set(pages)
+        self.all_pages = set(all_pages)
+        self.default = default
+
+    def on_nav(self, nav, config, files):
+        for file in files.documentation_pages():
+            if file.src_uri in self.pages or (self.default and file.src_uri not in self.all_pages):
+                continue
+            file.inclusion = InclusionLevel.EXCLUDED
+        return nav
+
+
+def partition_pages(weights: dict, shards: int) -> list:
+    """
+    Splits pages in shards of about the same total weight (heaviest pages first, each to the lightest shard).
+    Args:
+        weights (dict): The weight of each page, keyed by page.
+        shards (int): Number of shards.
+    Returns:
+        list: The list of pages of each shard.
+    """
+    heap = [(0, index) for index in range(shards)]
+    parts = [[] for _ in range(shards)]
+    for page, weight in sorted(weights.items(), key=lambda item: (-item[1], item[0])):
+        load, index = heapq.heappop(heap)
+        parts[index].append(page)
+        heapq.heappush(heap, (load + weight, index))
+    return parts
+
+
+def build_shard(
+    config_file: str,
+    site_dir: str,
+    nav: list | None,
+    pages: list,
+    all_pages: list,
+    default: bool,
+    render_cache=None,
+    page_sources: dict | None = None,
+):
+    """
+    Builds the pages of a shard in ``site_dir``. Ran in a worker process.
+    """
+    logging.getLogger("mkdocs.structure.pages").addFilter(ExcludedLinkFilter())
+    # the render cache plugin comes after the shard one, to only look at the pages of the shard
+    plugins = {"auto_fast_docs/shard": ShardPlugin(pages, all_pages, default)}
+    plugins.update(get_render_cache_plugins(render_cache, page_sources))
+    try:
+        config = load_site_config(config_file, site_dir, nav)
+        run_build(config, plugins=plugins)
+    except MkDocsException as error:
+        raise MkdocsBuildError("build", config_file, error.format_message()) from None
+
+
+def build_sharded_site(
+    config_file: str,
+    config,
+    shards: int,
+    nav: list | None = None,
+    jobs: int | None = None,
+    render_cache=None,
+    page_sources: dict | None = None,
+):
+    """
+    Builds a site in ``shards`` parallel processes, and merges their outputs in the site folder.
+    Args:
+        config_file (str): Path of the mkdocs.yml of the site.
+        config (mkdocs.config.defaults.MkDocsConfig): The loaded config of the site, for its docs and site folders.
+        shards (int): Number of shards.
+        nav (list | None): Overrides the nav of mkdocs.yml (in the mkdocs format).
+        jobs (int | None): Maximum number of shards built at once. By default, all of them.
+        render_cache (RenderCache | None): Cache of rendered pages, used by every shard (see ``render_cache``).
+        page_sources (dict | None): A digest of the python files documented in each page, keyed by src_uri.
+    """
+    pages = [page.replace(os.sep, "/") for page in find_files(config.docs_dir, r".*\.md$", relative=True)]
+    # the size of a page stub grows with the number of mkdocstrings directives, that make most of the rendering time
+    weights = {page: os.path.getsize(os.path.join(config.docs_dir, page)) for page in pages}
+    parts = partition_pages(weights, shards)
+    sizes = ", ".join(str(len(part)) for part in parts)
+    LOGGER.info(f"Building {len(pages)} pages in {shards} shards of {sizes} pages")
+
+    site_dir = os.path.normpath(config.site_dir)
+    shard_dirs = [f"{site_dir}.shard{index}" for index in range(shards)]
+    with ProcessPoolExecutor(max_workers=min(shards, jobs or shards)) as executor:
+        futures = [
+            executor.submit(
+                build_shard, config_file, shard_dir, nav, part, pages, index == 0, render_cache, page_sources
+            )
+            for index, (shard_dir, part) in enumerate(zip(shard_dirs, parts))
+        ]
+        for future in futures:
+            future.result()
+
+    merge_sites(shard_dirs, site_dir)
+
+
+def merge_sites(shard_dirs: list, site_dir: str) -> None:
+    """
+    Moves the outputs of the shards in the site folder, and merges the files listing every page.
+    The files that every shard wrote (theme assets...) are taken from the first shard.
+    """
+    shutil.rmtree(site_dir, ignore_errors=True)
+    os.replace(shard_dirs[0], site_dir)
+    for shard_dir in shard_dirs[1:]:
+        for folder, _, files in os.walk(shard_dir):
+            for name in files:
+                source = os.path.join(folder, name)
+                relpath = os.path.relpath(source, shard_dir)
+                target = os.path.join(site_dir, relpath)
+                if relpath in _MERGED_FILES or os.path.exists(target):
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(source, target)
+
+    merge_search_indexes(shard_dirs[1:], site_dir)
+    merge_inventories(shard_dirs[1:], site_dir)
+    merge_sitemaps(shard_dirs[1:], site_dir)
+    for shard_dir in shard_dirs[1:]:
+        shutil.rmtree(shard_dir)
+
+
+def merge_search_indexes(shard_dirs: list, site_dir: str) -> None:
+    if not os.path.isfile(os.path.join(site_dir, SEARCH_INDEX)):
+        return
+    docs = []
+    for shard_dir in shard_dirs:
+        with open(os.path.join(shard_dir, SEARCH_INDEX), "r", encoding="utf-8") as f:
+            docs += json.load(f)["docs"]
+    add_search_docs(site_dir, docs)
+
+
+def merge_inventories(shard_dirs: list, site_dir: str) -> None:
+    if not os.path.isfile(os.path.join(site_dir, INVENTORY)):
+        return
+    try:
+        from mkdocstrings import Inventory
+    except ImportError:
+        LOGGER.warning(f"Could not merge the {INVENTORY} of the shards, it only lists the objects of the first one")
+        return
+    items = []
+    for shard_dir in shard_dirs:
+        with open(os.path.join(shard_dir, INVENTORY), "rb") as f:
+            items += Inventory.parse_sphinx(f).values()
+    add_inventory_items(site_dir, items)
+
+
+def merge_sitemaps(shard_dirs: list, site_dir: str) -> None:
+    if not os.path.isfile(os.path.join(site_dir, SITEMAP)):
+        return
+    urls = []
+    for shard_dir in shard_dirs:
+        with open(os.path.join(shard_dir, SITEMAP), "r", encoding="utf-8") as f:
+            urls += SITEMAP_URL_PATTERN.findall(f.read())
+    add_sitemap_urls(site_dir, urls)
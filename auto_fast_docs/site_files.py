@@ -0,0 +1,79 @@
+"""
+The files of a built site that list every page (search index, mkdocstrings inventory, sitemap),
+completed with the pages that a build didn't render : the ones of other shards (see ``shards``),
+or the ones reused from the render cache (see ``render_cache``).
+"""
+
+import os
+import re
+import json
+import gzip
+import logging
+
+LOGGER = logging.getLogger()
+
+SEARCH_INDEX = os.path.join("search", "search_index.json")
+INVENTORY = "objects.inv"
+SITEMAP = "sitemap.xml"
+
+SITEMAP_URL_PATTERN = re.compile(r"<url>.*?</url>", re.DOTALL)
+
+
+class ExcludedLinkFilter(logging.Filter):
+    """
+    Hides the mkdocs warnings about links to pages excluded from the build : they are expected when the pages
+    are rendered by another shard, or reused from the render cache.
+    """
+
+    def filter(self, record):
+        return "which is excluded from the built site" not in record.getMessage()
+
+
+def add_search_docs(site_dir: str, docs: list) -> None:
+    """
+    Adds entries to the search index of a site (if it has one), for pages that this build didn't render.
+    """
+    target = os.path.join(site_dir, SEARCH_INDEX)
+    if not docs or not os.path.isfile(target):
+        return
+    with open(target, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    index["docs"] += docs
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+
+def add_inventory_items(site_dir: str, items: list) -> None:
+    """
+    Adds ``mkdocstrings.InventoryItem`` objects to the mkdocstrings inventory of a site (if it has one).
+    """
+    target = os.path.join(site_dir, INVENTORY)
+    if not items or not os.path.isfile(target):
+        return
+    from mkdocstrings import Inventory
+
+    with open(target, "rb") as f:
+        inventory = Inventory.parse_sphinx(f)
+    inventory.update((item.name, item) for item in items)
+    with open(target, "wb") as f:
+        f.write(inventory.format_sphinx())
+
+
+def add_sitemap_urls(site_dir: str, urls: list) -> None:
+    """
+    Adds ``<url>`` elements to the sitemap of a site (if it has one), the ones it already lists being kept once.
+    """
+    target = os.path.join(site_dir, SITEMAP)
+    if not urls or not os.path.isfile(target):
+        return
+    with open(target, "r", encoding="utf-8") as f:
+        sitemap = f.read()
+    matches = list(SITEMAP_URL_PATTERN.finditer(sitemap))
+    urls = dict.fromkeys([match.group(0) for match in matches] + urls)
+    start = matches[0].start() if matches else sitemap.rindex("</urlset>")
+    end = matches[-1].end() if matches else start
+    sitemap = sitemap[:start] + "\n    ".join(urls) + sitemap[end:]
+    with open(target, "w", encoding="utf-8") as f:
+        f.write(sitemap)
+    with gzip.open(target + ".gz", "wb") as f:
+        f.write(sitemap.encode("utf-8"))
@@ -0,0 +1,204 @@
+"""
+Persistent index of the symbols of a package : every module, class, function and method found by ``PyfileParser``,
+with its line range, docstring hash, exclusion status and the page it is documented in.
+
+It is only kept when requested (``--symbol-index``), in a SQLite database updated module by module :
+only the modules whose records changed are written again.
+Other tools can query it to know where a symbol is documented without parsing the package again.
+
+Example:
+    ```bash
+    sqlite3 symbols.sqlite "select module, page from symbols where qualname = 'MyClass'"
+    ```
+"""
+
+import os
+import json
+import hashlib
+import logging
+import sqlite3
+
+from . import __version__
+from .emit import atomic_write
+
+LOGGER = logging.getLogger()
+
+# fields of the records collected by PyfileParser in content["symbols"]
+SYMBOL_FIELDS = ("qualname", "kind", "lineno", "end_lineno", "docstring_hash", "excluded")
+
+# columns of the symbols table, and keys of the json export
+COLUMNS = ("module_path", "module") + SYMBOL_FIELDS + ("page",)
+
+# bump this when the tables change, so that old indexes are dropped instead of misread.
+_INDEX_FORMAT = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS modules (module_path TEXT PRIMARY KEY, digest TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS symbols (
+    module_path TEXT NOT NULL,
+    module TEXT NOT NULL,
+    qualname TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    lineno INTEGER,
+    end_lineno INTEGER,
+    docstring_hash TEXT,
+    excluded INTEGER NOT NULL,
+    page TEXT
+);
+CREATE INDEX IF NOT EXISTS symbols_module_path ON symbols (module_path);
+CREATE INDEX IF NOT EXISTS symbols_qualname ON symbols (qualname);
+"""
+
+
+def records_digest(data) -> str:
+    """
+    Returns:
+        str: A digest of lists, tuples and dictionnaries of str, int, bool and None.
+            Their repr is stable, and much faster to make than json.
+    """
+    return hashlib.sha1(repr(data).encode()).hexdigest()
+
+
+class SymbolIndex:
+    """
+    SQLite symbol index of a package.
+
+    Attributes:
+        path str: Path of the SQLite database.
+        counts dict: number of ``updated``, ``unchanged`` and ``removed`` modules during the last ``update``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.counts = {"updated": 0, "unchanged": 0, "removed": 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        try:
+            self.check_format()
+        except sqlite3.DatabaseError:
+            LOGGER.warning(f"Could not read the symbol index at {path}, starting from an empty one")
+            self.connection.close()
+            os.remove(path)
+            self.connection = sqlite3.connect(path)
+            self.check_format()
+
+    def check_format(self) -> None:
+        # drops the tables written by another version, as their records may be computed differently
+        with self.connection:
+            self.connection.executescript(_SCHEMA)
+            meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+            if meta.get("format") != str(_INDEX_FORMAT) or meta.get("version") != __version__:
+                self.connection.execute("DELETE FROM symbols")
+                self.connection.execute("DELETE FROM modules")
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    [("format", str(_INDEX_FORMAT)), ("version", __version__)],
+                )
+
+    def digests(self) -> dict:
+        """
+        Returns:
+            dict: The digest of the records of every indexed module, keyed by module path.
+        """
+        return dict(self.connection.execute("SELECT module_path, digest FROM modules"))
+
+    def update(self, modules, get_rows, removed: list | tuple = (), complete: bool = False) -> None:
+        """
+        Replaces the records of the given modules, if they changed.
+        Args:
+            modules (dict | iterable): The digest of what the records of each module are made from, keyed by
+                module path (or ``(module_path, digest)`` pairs). Rows are only made for the modules whose digest
+                changed since they were indexed.
+            get_rows (callable): Takes a module path and returns the rows (lists of ``COLUMNS`` values) of the module.
+            removed (list | tuple): Paths of the modules to remove from the index.
+            complete (bool): ``modules`` are all the modules of the package : the other ones are removed.
+        """
+        self.start_update()
+        for module_path, digest in modules.items() if hasattr(modules, "items") else modules:
+            self.update_module(module_path, digest, get_rows)
+        self.finish_update(removed, complete)
+
+    def start_update(self) -> None:
+        """
+        Starts an update made module by module with ``update_module``, and written by ``finish_update``,
+        so that the rows of every module don't have to be kept in memory until then.
+        """
+        self.indexed = self.digests()
+        self.updated = set()
+        self.counts = {"updated": 0, "unchanged": 0, "removed": 0}
+
+    def update_module(self, module_path: str, digest: str, get_rows) -> None:
+        self.updated.add(module_path)
+        if self.indexed.get(module_path) == digest:
+            self.counts["unchanged"] += 1
+            return
+        self.counts["updated"] += 1
+        if module_path in self.indexed:
+            self.delete_module(module_path)
+        self.connection.executemany(
+            f"INSERT INTO symbols VALUES ({', '.join('?' * len(COLUMNS))})", get_rows(module_path)
+        )
+        self.connection.execute("INSERT INTO modules VALUES (?, ?)", (module_path, digest))
+
+    def finish_update(self, removed: list | tuple = (), complete: bool = False) -> None:
+        """
+        Removes the modules that don't exist anymore (see ``update``), and commits the update.
+        """
+        removed = set(removed)
+        if complete:
+            removed |= set(self.indexed)
+        removed = (removed & set(self.indexed)) - self.updated
+        for module_path in removed:
+            self.delete_module(module_path)
+        self.connection.commit()
+        self.counts["removed"] = len(removed)
+        LOGGER.info(
+            f"Symbol index : {self.counts['updated']} modules updated, {self.counts['unchanged']} unchanged, "
+            f"{self.counts['removed']} removed ({self.path})"
+        )
+
+    def delete_module(self, module_path: str) -> None:
+        self.connection.execute("DELETE FROM symbols WHERE module_path = ?", (module_path,))
+        self.connection.execute("DELETE FROM modules WHERE module_path = ?", (module_path,))
+
+    def find(self, name: str) -> list:
+        """
+        Finds where a symbol is documented.
+        Args:
+            name (str): Qualified name of the symbol (``MyClass.method``), or its full dotted path
+                (``package.module.MyClass.method``).
+        Returns:
+            list: The records of the matching symbols, as dictionnaries with ``COLUMNS`` keys.
+        """
+        cursor = self.connection.execute(
+            "SELECT * FROM symbols WHERE qualname = ? OR module || '.' || qualname = ? "
+            "OR (kind = 'module' AND module = ?) ORDER BY module_path, lineno",
+            (name, name, name),
+        )
+        return [dict(zip(COLUMNS, row)) for row in cursor]
+
+    def records(self) -> list:
+        """
+        Returns:
+            list: Every record of the index, as dictionnaries with ``COLUMNS`` keys, in modules and lines order.
+        """
+        cursor = self.connection.execute("SELECT * FROM symbols ORDER BY module_path, lineno, qualname")
+        return [dict(zip(COLUMNS, row)) for row in cursor]
+
+    def export_json(self, path: str) -> None:
+        """
+        Writes every record of the index in a json file.
+        Args:
+            path (str): Full path of the json file.
+        """
+        records = self.records()
+        for record in records:
+            record["excluded"] = bool(record["excluded"])
+        data = {"format": _INDEX_FORMAT, "version": __version__, "symbols": records}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        atomic_write(os.path.abspath(path), json.dumps(data, indent=1))
+        LOGGER.info(f"Exported {len(records)} symbols to {path}")
+
+    def close(self) -> None:
+        self.connection.close()
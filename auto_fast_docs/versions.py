@@ -0,0 +1,194 @@
+"""
+Documentation of several versions of a package (``--versions``) : each git reference (branch, tag, commit) is
+checked out in its own git worktree and documented there, then the versions are built concurrently by separate
+processes, each one in its own ``<version>`` folder of the site.
+
+Like with mike, a ``versions.json`` file at the root of the site lists the versions, for the version selector
+of the material theme (``extra.version.provider: mike``), and the root page redirects to the first version.
+The versions share a parse cache keyed on the git blob hash of the files (see ``cache.BlobParseCache``) :
+a module that didn't change between two versions is parsed once. Only the local repository is used,
+so it works offline.
+"""
+
+import os
+import re
+import json
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .auto_doc import RepositoryConfigurator, make_mkdocs_nav, get_render_cache, parse_cache_name
+from .build import build_site
+from .cache import BlobParseCache
+from .constants import CACHE_DIRNAME
+from .gitdiff import git
+
+LOGGER = logging.getLogger()
+
+VERSIONS_FILE = "versions.json"
+VERSIONS_SITE_DIRNAME = "public"
+
+_EXTRA_PATTERN = re.compile(r"^extra\s*:", re.MULTILINE)
+
+_VERSION_PROVIDER = "\nextra:\n  version:\n    provider: mike\n"
+
+_REDIRECT = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Redirecting</title>
+<noscript><meta http-equiv="refresh" content="1; url={target}"></noscript>
+<script>window.location.replace("{target}" + window.location.hash);</script>
+</head>
+<body>Redirecting to <a href="{target}">{target}</a>...</body>
+</html>
+"""
+
+
+def version_name(ref: str) -> str:
+    # the name is a folder of the site : release/1.2 becomes release-1.2
+    return ref.replace("/", "-")
+
+
+def resolve_refs(repository: str, refs: list) -> list:
+    """
+    Returns:
+        list: The commit hash of each git reference, from the local repository.
+    """
+    return [git(repository, "rev-parse", "--verify", f"{ref}^{{commit}}").strip() for ref in refs]
+
+
+def list_blobs(worktree: str, package_relpath: str) -> dict:
+    """
+    Args:
+        worktree (str): Root folder of a git worktree.
+        package_relpath (str): Path of the package, relative to ``worktree``.
+    Returns:
+        dict: The git blob hash of each python file of the package checked out in the worktree,
+            keyed by its path relative to the package folder.
+    """
+    blobs = {}
+    prefix = package_relpath.replace(os.sep, "/").rstrip("/") + "/"
+    for entry in git(worktree, "ls-tree", "-r", "-z", "HEAD", "--", prefix).split("\0"):
+        meta, _, path = entry.partition("\t")
+        if not path.endswith(".py") or not path.startswith(prefix):
+            continue
+        _, object_type, blob = meta.split()
+        if object_type == "blob":
+            blobs[os.path.normpath(path[len(prefix) :])] = blob
+    return blobs
+
+
+def add_version_provider(config_file: str) -> None:
+    """
+    Enables the version selector of the material theme in a mkdocs.yml file, unless it already has an extra section.
+    """
+    with open(config_file, "r") as f:
+        text = f.read()
+    if _EXTRA_PATTERN.search(text):
+        if "provider: mike" not in text:
+            LOGGER.warning(
+                f"{config_file} has an extra section : add 'version: {{provider: mike}}' to it for the version selector"
+            )
+        return
+    with open(config_file, "w") as f:
+        f.write(text.rstrip("\n") + "\n" + _VERSION_PROVIDER)
+
+
+def write_versions_file(site_dir: str, names: list) -> None:
+    """
+    Writes the mike ``versions.json`` file listing the versions, and the root page redirecting to the first one.
+    """
+    versions = [{"version": name, "title": name, "aliases": []} for name in names]
+    with open(os.path.join(site_dir, VERSIONS_FILE), "w", encoding="utf-8") as f:
+        json.dump(versions, f, indent=2)
+    with open(os.path.join(site_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(_REDIRECT.format(target=f"{names[0]}/index.html"))
+
+
+def build_versions(args) -> None:
+    """
+    Documents and builds every version of ``args.versions``, in ``public/<version>`` of the current path.
+    Args:
+        args (argparse.Namespace): Arguments parsed by ``cli.get_parser``.
+    """
+    cwd = os.path.abspath(args.current_path)
+    repository = git(cwd, "rev-parse", "--show-toplevel").strip()
+    relative_cwd = os.path.relpath(cwd, repository)
+    names = [version_name(ref) for ref in args.versions]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Versions must have different names, got {names}")
+    commits = resolve_refs(repository, args.versions)
+
+    site_dir = os.path.join(cwd, VERSIONS_SITE_DIRNAME)
+    jobs = args.jobs if args.jobs is not None else os.cpu_count() or 1
+    cache_dir = args.cache_dir if args.cache_dir is not None else os.path.join(cwd, CACHE_DIRNAME)
+    cache = None
+    if not args.no_cache:
+        cache = BlobParseCache(
+            cache_dir,
+            parse_cache_name(args.package_name, args.render, args.symbol_index is None and not args.public_api),
+        )
+    render_cache = get_render_cache(args, cwd) if args.render_cache else None
+
+    with tempfile.TemporaryDirectory(prefix="auto_fast_docs_versions_") as worktrees_dir:
+        worktrees = []
+        try:
+            # the pools start their workers while the feeder threads of each other run : a worker forked then would
+            # inherit the state of their locks, so the workers are spawned
+            spawn = multiprocessing.get_context("spawn")
+            # the modules of a version are parsed while the previous versions are built
+            with (
+                ProcessPoolExecutor(max_workers=jobs, mp_context=spawn) as executor,
+                ProcessPoolExecutor(max_workers=min(jobs, len(names)), mp_context=spawn) as build_executor,
+            ):
+                builds = []
+                for ref, name, commit in zip(args.versions, names, commits):
+                    LOGGER.info(f"Documenting version {name} ({ref}, commit {commit[:12]})")
+                    worktree = os.path.join(worktrees_dir, name)
+                    git(repository, "worktree", "add", "--detach", worktree, commit)
+                    worktrees.append(worktree)
+
+                    version_args = argparse.Namespace(**vars(args))
+                    version_args.current_path = os.path.join(worktree, relative_cwd)
+                    if args.docs_dir is not None:
+                        # the same folder, in the worktree
+                        docs_dir = os.path.relpath(os.path.abspath(args.docs_dir), cwd)
+                        version_args.docs_dir = os.path.join(version_args.current_path, docs_dir)
+                    # one symbol index per version, next to the requested paths
+                    for option in ("symbol_index", "symbol_index_json"):
+                        if getattr(args, option) is not None:
+                            stem, extension = os.path.splitext(getattr(args, option))
+                            setattr(version_args, option, f"{stem}_{name}{extension}")
+                    configurator = RepositoryConfigurator(version_args)
+                    configurator.set_jobs(jobs, executor)
+                    configurator.cache = cache
+                    if cache is not None:
+                        cache.blobs = list_blobs(worktree, os.path.relpath(configurator.package_path, worktree))
+                    nav_dic = configurator.run()
+
+                    config_file = os.path.join(configurator.cwd, "mkdocs.yml")
+                    add_version_provider(config_file)
+                    build_options = dict(use_subprocess=args.mkdocs_subprocess, shards=args.build_shards, jobs=jobs)
+                    if render_cache is not None:
+                        build_options.update(render_cache=render_cache, page_sources=configurator.get_page_sources())
+                    builds.append(
+                        build_executor.submit(
+                            build_site,
+                            config_file,
+                            site_dir=os.path.join(site_dir, name),
+                            nav=[{"Home": "index.md"}] + make_mkdocs_nav(nav_dic),
+                            **build_options,
+                        )
+                    )
+                for name, build in zip(names, builds):
+                    build.result()
+                    LOGGER.info(f"Version {name} built in {os.path.join(site_dir, name)}")
+        finally:
+            for worktree in worktrees:
+                git(repository, "worktree", "remove", "--force", worktree)
+
+    write_versions_file(site_dir, names)
+    LOGGER.info(f"{len(names)} versions built in {site_dir}, listed in {VERSIONS_FILE}")
@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+import logging
+import threading
+import subprocess
+
+from .auto_doc import RepositoryConfigurator, MkdocsConfigurator
+from .discover import iter_files, compile_pruner, is_pruned_folder, DEFAULT_PRUNE_DIRS
+
+LOGGER = logging.getLogger()
+
+_WRITE_EVENT_TYPES = ("created", "modified", "moved", "deleted", "closed")
+
+
+class PollingWatcher:
+    """
+    Detects changes of the python files of a folder by comparing their modification time and size between two calls.
+    """
+
+    def __init__(self, root, rules=None):
+        self.root = root
+        self.rules = rules
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self) -> dict:
+        snapshot = {}
+        for relpath in iter_files(
+            self.root, r".*\.py$", relative=True, sort=False, prune=DEFAULT_PRUNE_DIRS, rules=self.rules
+        ):
+            try:
+                stat = os.stat(os.path.join(self.root, relpath))
+            except FileNotFoundError:
+                continue
+            snapshot[relpath] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> set:
+        """
+        Returns:
+            set: Paths (relative to the watched folder) of the python files created, modified or deleted
+                since the last call.
+        """
+        snapshot = self.take_snapshot()
+        changed = {
+            relpath
+            for relpath in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(relpath) != self.snapshot.get(relpath)
+        }
+        self.snapshot = snapshot
+        return changed
+
+    def stop(self):
+        pass
+
+
+class WatchdogWatcher:
+    """
+    Detects changes of the python files of a folder from the filesystem events
+    (inotify, FSEvents, ReadDirectoryChangesW), using the ``watchdog`` package.
+    """
+
+    def __init__(self, root, rules=None):
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        self.root = root
+        self.is_pruned = compile_pruner(DEFAULT_PRUNE_DIRS)
+        self.rules = rules
+        self.changed = set()
+        self.lock = threading.Lock()
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # opened and closed_no_write events are also emitted when the files are only read (by the parser)
+                if event.is_directory or event.event_type not in _WRITE_EVENT_TYPES:
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    watcher.register(path)
+
+        logging.getLogger("watchdog").setLevel(logging.WARNING)
+        self.observer = Observer()
+        self.observer.schedule(_Handler(), root, recursive=True)
+        self.observer.start()
+
+    def register(self, path):
+        if not path or not path.endswith(".py"):
+            return
+        relpath = os.path.relpath(path, self.root)
+        folder = os.path.dirname(relpath)
+        while folder:
+            if is_pruned_folder(self.is_pruned, os.path.join(self.root, folder)):
+                return
+            folder = os.path.dirname(folder)
+        if self.rules is not None and not self.rules.allows(relpath):
+            return
+        with self.lock:
+            self.changed.add(relpath)
+
+    def poll(self) -> set:
+        with self.lock:
+            changed, self.changed = self.changed, set()
+        return changed
+
+    def stop(self):
+        self.observer.stop()
+        self.observer.join()
+
+
+def make_watcher(root, polling=False, rules=None):
+    if not polling:
+        try:
+            return WatchdogWatcher(root, rules)
+        except ImportError:
+            LOGGER.info("watchdog is not installed, falling back to polling for changes")
+    return PollingWatcher(root, rules)
+
+
+def wait_for_changes(watcher, interval: float, debounce: float) -> set:
+    """
+    Blocks until some files changed, and no other change happened during ``debounce`` seconds,
+    so that a save touching several files (or an editor writing a file in several steps) triggers a single update.
+    Returns:
+        set: Relative paths of the changed python files.
+    """
+    changed = set()
+    last_change = 0.0
+    while True:
+        new_changes = watcher.poll()
+        if new_changes:
+            changed |= new_changes
+            last_change = time.monotonic()
+        elif changed and time.monotonic() - last_change >= debounce:
+            return changed
+        time.sleep(interval)
+
+
+def watch(args):
+    """
+    Generates the whole documentation, then updates it each time a module of the package changes.
+    Args:
+        args (argparse.Namespace): Arguments parsed by ``cli.get_watch_parser``.
+    """
+    configurator = RepositoryConfigurator(args)
+    configurator.run()
+    configurator.profiler.write(args.profile, args.profile_format)
+    config_path = os.path.join(configurator.cwd, "mkdocs.yml")
+
+    server = None
+    if not args.no_serve:
+        # --dirty : mkdocs only renders again the pages whose markdown file changed
+        command = [sys.executable, "-m", "mkdocs", "serve", "--dirty", "--dev-addr", args.dev_addr]
+        server = subprocess.Popen(command, cwd=configurator.cwd)
+
+    watcher = make_watcher(configurator.package_path, args.polling, configurator.rules)
+    LOGGER.info(f"Watching {configurator.package_path} for changes. Press Ctrl+C to stop")
+    try:
+        while True:
+            changed = wait_for_changes(watcher, args.interval, args.debounce)
+            start = time.perf_counter()
+            try:
+                if configurator.update_markdown_files(sorted(changed)):
+                    MkdocsConfigurator(config_path).write_mkdocs_nav(configurator.make_nav())
+            except (SyntaxError, OSError, UnicodeDecodeError) as error:
+                # a file saved halfway (or removed while it was read) : its docs are updated by its next change
+                LOGGER.error(
+                    f"Could not update the docs of {len(changed)} changed files, keeping the previous ones : "
+                    f"{type(error).__name__}: {error}"
+                )
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            LOGGER.info(f"Updated the docs of {len(changed)} changed files in {elapsed:.0f} ms")
+    except KeyboardInterrupt:
+        LOGGER.info("Stopped watching")
+    finally:
+        watcher.stop()
+        if server is not None:
+            server.terminate()
+            server.wait()
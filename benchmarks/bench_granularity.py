@@ -0,0 +1,61 @@
+"""
+Compares the mkdocs build time of a synthetic package documented with each ``--granularity``.
+
+Example:
+    ```bash
+    python benchmarks/bench_granularity.py --modules 200 --symbols 10
+    ```
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+
+from synthetic import generate_package
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator
+from auto_fast_docs.cli import get_parser
+
+GRANULARITIES = ("symbol", "module", "package")
+
+
+def time_build(root, granularity):
+    for generated in ("docs", "mkdocs.yml", "public"):
+        path = os.path.join(root, generated)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.isfile(path):
+            os.remove(path)
+
+    configurator = RepositoryConfigurator(
+        get_parser().parse_args(["synthetic", root, "--no-cache", "--username", "bench", "--granularity", granularity])
+    )
+    configurator.run()
+    pages = len(configurator.merge_pages())
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "mkdocs", "build", "--quiet"], cwd=root, check=True)
+    return pages, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as root:
+        generate_package(root, modules=args.modules, symbols=args.symbols, depth=args.depth)
+        results = {granularity: time_build(root, granularity) for granularity in GRANULARITIES}
+
+    print(f"{args.modules} modules, {args.symbols} symbols each")
+    reference = results["symbol"][1]
+    for granularity, (pages, duration) in results.items():
+        print(f"  {granularity:<8} : {pages:>6} pages, mkdocs build {duration:7.2f} s  (x{reference / duration:.2f})")
@@ -0,0 +1,130 @@
+"""
+Measures the deploy of the site of a synthetic package to a local bare repository acting as the remote, after a
+docstring change in a single module : ``mkdocs gh-deploy --force`` against ``--incremental-deploy`` (``deploy``).
+Each deploy runs from a new repository, like a CI job. Reports the time of the deploy, the size added to the remote,
+and the number of files of the deployed commit (every file for a commit without parent), and checks that both
+deploys push the same tree.
+
+Example:
+    ```bash
+    python benchmarks/bench_incremental_deploy.py --modules 300 --granularity module
+    ```
+"""
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+import subprocess
+
+from synthetic import generate_package
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator, make_mkdocs_nav
+from auto_fast_docs.cli import get_parser
+from auto_fast_docs.build import load_site_config, run_build
+from auto_fast_docs.deploy import deploy_site
+from auto_fast_docs.gitdiff import git
+
+
+def build(root: str, granularity: str):
+    configurator = RepositoryConfigurator(
+        get_parser().parse_args(["synthetic", root, "--username", "bench", "--granularity", granularity])
+    )
+    nav = [{"Home": "index.md"}] + make_mkdocs_nav(configurator.run())
+    config = load_site_config(os.path.join(root, "mkdocs.yml"), nav=nav)
+    run_build(config)
+    return config
+
+
+def remote_size(remote: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(folder, filename))
+        for folder, _, filenames in os.walk(os.path.join(remote, "objects"))
+        for filename in filenames
+    )
+
+
+def checkout(temp_dir: str, name: str) -> str:
+    """
+    Returns:
+        str: A new repository with a single commit and the two remotes, like the checkout of a CI job,
+            that has no gh-pages branch nor its objects.
+    """
+    repository = os.path.join(temp_dir, name)
+    os.makedirs(repository)
+    git(repository, "init", "-q")
+    git(repository, "config", "user.name", "bench")
+    git(repository, "config", "user.email", "bench@bench")
+    git(repository, "commit", "-q", "--allow-empty", "-m", "bench")
+    for method in ("full", "incremental"):
+        git(repository, "remote", "add", method, os.path.join(temp_dir, f"{method}.git"))
+    return repository
+
+
+def deploy(repository: str, config, method: str) -> tuple:
+    from mkdocs.commands import gh_deploy
+
+    remote = git(repository, "remote", "get-url", method).strip()
+    size = remote_size(remote)
+    start = time.perf_counter()
+    if method == "full":
+        config.remote_name, config.remote_branch = method, "gh-pages"
+        # like the mkdocs command line, gh-deploy runs git in the current folder
+        cwd = os.getcwd()
+        os.chdir(repository)
+        try:
+            gh_deploy.gh_deploy(config, force=True)
+        finally:
+            os.chdir(cwd)
+    else:
+        deploy_site(config.site_dir, repository, method, "gh-pages")
+    duration = time.perf_counter() - start
+    changed = git(remote, "show", "--name-only", "--format=", "gh-pages").split()
+    return duration, remote_size(remote) - size, changed
+
+
+def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = os.path.join(temp_dir, "package")
+        os.makedirs(root)
+        generate_package(root, "synthetic", args.modules, symbols=args.symbols)
+        for method in ("full", "incremental"):
+            subprocess.run(["git", "init", "-q", "--bare", os.path.join(temp_dir, f"{method}.git")], check=True)
+
+        config = build(root, args.granularity)
+        repository = checkout(temp_dir, "first_job")
+        for method in ("full", "incremental"):
+            deploy(repository, config, method)
+
+        for folder, _, files in sorted(os.walk(os.path.join(root, "synthetic"))):
+            modules = sorted(name for name in files if name.endswith(".py") and name != "__init__.py")
+            if modules:
+                changed = os.path.join(folder, modules[0])
+                break
+        with open(changed, "r") as f:
+            content = f.read()
+        with open(changed, "w") as f:
+            f.write(content.replace("Function number 0.", "Function number 0, edited by the benchmark.", 1))
+
+        config = build(root, args.granularity)
+        repository = checkout(temp_dir, "second_job")
+        methods = ("full", "incremental")
+        for method in methods:
+            duration, added, files = deploy(repository, config, method)
+            print(
+                f"{method:<12} : {duration:.2f} s, {added / 1000:.0f} kB added to the remote, "
+                f"{len(files)} files committed"
+            )
+
+        trees = [git(os.path.join(temp_dir, f"{method}.git"), "rev-parse", "gh-pages^{tree}") for method in methods]
+        assert trees[0] == trees[1], "The incremental deploy must push the same site as mkdocs gh-deploy"
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--modules", type=int, default=300)
+    argument_parser.add_argument("--symbols", type=int, default=4)
+    argument_parser.add_argument("--granularity", choices=("symbol", "module", "package"), default="module")
+    main(argument_parser.parse_args())
@@ -0,0 +1,101 @@
+"""
+Memory benchmark of the generation of the docs folder, on synthetic packages of growing sizes.
+
+Each size is measured in fresh processes, for two ways of making the pages :
+
+- ``stream`` : ``RepositoryConfigurator.make_markdown_files``, where modules are parsed, made into pages and
+    written one after the other, only keeping the names of the symbols and the nav entries of the pages.
+- ``materialized`` : every module is parsed first (``load_contents``), then every page is made (``make_pages``)
+    and written, like auto_fast_docs did before (and like the mkdocs plugin still does, as mkdocs needs them all).
+
+The peak is measured with ``tracemalloc`` (python allocations only, precise but about 3 times slower),
+or as the growth of the peak RSS of the process during the run with ``--rss``.
+
+Example:
+    ```bash
+    python benchmarks/bench_memory.py --modules 1000 5000 50000 --rss
+    ```
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+
+from synthetic import generate_package
+
+MODES = ("stream", "materialized")
+
+
+def measure(mode: str, root: str, use_rss: bool) -> dict:
+    """
+    Makes the docs of the synthetic package in ``root``, in the current process.
+    Returns:
+        dict: The ``peak`` memory in bytes, the memory still ``retained`` after the run (tracemalloc only),
+            and the ``seconds`` it took.
+    """
+    import tracemalloc
+
+    from auto_fast_docs.auto_doc import RepositoryConfigurator
+    from auto_fast_docs.cli import get_parser
+    from auto_fast_docs.emit import PageWriter
+    from auto_fast_docs.profiling import peak_rss
+
+    logging.getLogger().setLevel(logging.WARNING)
+    configurator = RepositoryConfigurator(get_parser().parse_args(["synthetic", root, "--no-cache", "--jobs", "1"]))
+    if use_rss:
+        baseline = peak_rss()
+    else:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if mode == "stream":
+        configurator.make_markdown_files()
+    else:
+        configurator.load_contents()
+        writer = PageWriter(configurator.docpath)
+        for page_path, page_content in configurator.make_pages().items():
+            writer.write(page_path, page_content)
+        writer.finish()
+    seconds = time.perf_counter() - start
+    if use_rss:
+        return {"peak": peak_rss() - baseline, "retained": None, "seconds": seconds}
+    retained, peak = tracemalloc.get_traced_memory()
+    return {"peak": peak, "retained": retained, "seconds": seconds}
+
+
+def main(args):
+    print(f"{'modules':>8} {'mode':<13} {'peak':>10} {'retained':>10} {'per module':>11} {'time':>8}")
+    for modules in args.modules:
+        with tempfile.TemporaryDirectory() as root:
+            generate_package(root, "synthetic", modules, symbols=args.symbols)
+            for mode in args.modes:
+                command = [sys.executable, os.path.abspath(__file__), "--child", mode, root]
+                if args.rss:
+                    command.append("--rss")
+                result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+                retained = "-" if result["retained"] is None else f"{result['retained'] / 1e6:.1f} MB"
+                print(
+                    f"{modules:>8} {mode:<13} {result['peak'] / 1e6:>7.1f} MB {retained:>10} "
+                    f"{result['peak'] / modules / 1e3:>8.2f} kB {result['seconds']:>7.1f}s"
+                )
+                # the next mode must start from an empty docs folder too
+                shutil.rmtree(os.path.join(root, "docs"), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--modules", type=int, nargs="+", default=[1000, 5000])
+    argument_parser.add_argument("--symbols", type=int, default=4)
+    argument_parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    argument_parser.add_argument("--rss", action="store_true", help="Measures the peak RSS instead of tracemalloc")
+    argument_parser.add_argument("--child", nargs=2, metavar=("MODE", "ROOT"), help=argparse.SUPPRESS)
+    arguments = argument_parser.parse_args()
+    if arguments.child is not None:
+        print(json.dumps(measure(*arguments.child, arguments.rss)))
+    else:
+        main(arguments)
@@ -0,0 +1,65 @@
+"""
+Compares running mkdocs in the current process (``build_site``) with running the mkdocs command line
+in a subprocess (``--mkdocs-subprocess``, what auto_fast_docs did before), on a small synthetic package,
+so that the build itself is cheap and the difference is mostly the startup cost :
+a new interpreter, the imports of mkdocs, material and mkdocstrings, and reading mkdocs.yml again.
+
+The first in process build pays the imports once, the next ones don't (like a batch run building several sites).
+
+Example:
+    ```bash
+    python benchmarks/bench_mkdocs_startup.py --modules 20 --repeat 5
+    ```
+"""
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+
+from synthetic import generate_package
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator, make_mkdocs_nav
+from auto_fast_docs.cli import get_parser
+from auto_fast_docs.build import build_site, run_mkdocs_subprocess
+
+
+def time_call(function, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as root:
+        generate_package(root, "synthetic", args.modules, symbols=args.symbols)
+        configurator = RepositoryConfigurator(
+            get_parser().parse_args(["synthetic", root, "--no-cache", "--username", "bench", "--granularity", "module"])
+        )
+        nav = [{"Home": "index.md"}] + make_mkdocs_nav(configurator.run())
+        config_file = os.path.join(root, "mkdocs.yml")
+
+        subprocess_times = [time_call(run_mkdocs_subprocess, config_file) for _ in range(args.repeat)]
+        first_in_process = time_call(build_site, config_file, nav=nav)
+        in_process_times = [time_call(build_site, config_file, nav=nav) for _ in range(args.repeat)]
+
+    subprocess_median = statistics.median(subprocess_times)
+    in_process_median = statistics.median(in_process_times)
+    print(f"subprocess build       : {subprocess_median:.3f} s (median of {args.repeat})")
+    print(f"first in process build : {first_in_process:.3f} s (imports included)")
+    print(f"next in process builds : {in_process_median:.3f} s (median of {args.repeat})")
+    print(
+        f"saved per build        : {subprocess_median - first_in_process:.3f} s for the first one, "
+        f"{subprocess_median - in_process_median:.3f} s for the next ones"
+    )
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--modules", type=int, default=20)
+    argument_parser.add_argument("--symbols", type=int, default=2)
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    main(argument_parser.parse_args())
@@ -0,0 +1,49 @@
+"""
+Compares the parsing stage of ``make_markdown_files`` run serially and with a process pool.
+
+Example:
+    ```bash
+    python benchmarks/bench_parse_jobs.py --modules 5000 --jobs 8
+    ```
+"""
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+
+from synthetic import generate_package
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator
+from auto_fast_docs.cli import get_parser
+from auto_fast_docs.discover import find_python_files
+
+
+def time_parsing(root, jobs):
+    configurator = RepositoryConfigurator(
+        get_parser().parse_args(["synthetic", root, "--no-cache", "--jobs", str(jobs)])
+    )
+    files = find_python_files(configurator.package_path)
+    start = time.perf_counter()
+    contents = configurator.parse_python_files(files)
+    return time.perf_counter() - start, contents
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=5000)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as root:
+        generate_package(root, modules=args.modules, symbols=args.symbols)
+        serial_time, serial_contents = time_parsing(root, 1)
+        parallel_time, parallel_contents = time_parsing(root, args.jobs)
+
+    assert list(serial_contents.items()) == list(parallel_contents.items()), "parallel parsing changed the results"
+    print(f"{args.modules} modules, {args.symbols} symbols each")
+    print(f"  --jobs 1  : {serial_time:.3f} s")
+    print(f"  --jobs {args.jobs:<2} : {parallel_time:.3f} s  (x{serial_time / parallel_time:.2f})")
@@ -0,0 +1,170 @@
+"""
+Scaling benchmark of the auto_fast_docs pipeline, phase by phase, on a synthetic package.
+
+The ``run`` command generates a synthetic package (see ``synthetic.py``), then times separately :
+
+- ``discovery`` : ``find_python_files`` on the package.
+- ``parsing`` : ``RepositoryConfigurator.parse_python_files``, without the parse cache.
+- ``emission`` : writing the markdown pages in an empty docs folder.
+- ``nav`` : ``MkdocsConfigurator.write_mkdocs_nav`` on a freshly generated mkdocs.yml.
+
+Each phase is repeated and the results are written as json. The ``compare`` command flags the phases
+that got slower between two result files, and exits with an error if any did.
+
+Example:
+    ```bash
+    python benchmarks/bench_phases.py run --modules 50000 --output after.json
+    python benchmarks/bench_phases.py compare before.json after.json --threshold 0.1
+    ```
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import statistics
+
+from synthetic import generate_package
+
+from auto_fast_docs import __version__
+from auto_fast_docs.auto_doc import RepositoryConfigurator, MkdocsConfigurator
+from auto_fast_docs.cli import get_parser
+from auto_fast_docs.discover import find_python_files
+from auto_fast_docs.emit import PageWriter
+
+PHASES = ("discovery", "parsing", "emission", "nav")
+
+
+def time_phases(root, package_name, jobs):
+    configurator = RepositoryConfigurator(
+        get_parser().parse_args([package_name, root, "--no-cache", "--jobs", str(jobs), "--username", "bench"])
+    )
+    timings = {}
+
+    start = time.perf_counter()
+    files = find_python_files(configurator.package_path)
+    timings["discovery"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    contents = configurator.parse_python_files(files)
+    timings["parsing"] = time.perf_counter() - start
+
+    shutil.rmtree(configurator.docpath)
+    start = time.perf_counter()
+    configurator.writer = PageWriter(configurator.docpath)
+    configurator.pages = {}
+    for filepath, content in contents.items():
+        configurator.pages[filepath] = configurator.make_module_pages(filepath, content)
+        for _, page_path, page_content in configurator.pages[filepath]:
+            configurator.writer.write(page_path, page_content)
+    configurator.writer.finish()
+    timings["emission"] = time.perf_counter() - start
+
+    config_path = os.path.join(root, "mkdocs.yml")
+    if os.path.isfile(config_path):
+        os.remove(config_path)
+    mkd_conf = MkdocsConfigurator(config_path)
+    mkd_conf.auto_config(configurator)
+    nav_dic = configurator.make_nav()
+    start = time.perf_counter()
+    mkd_conf.write_mkdocs_nav(nav_dic)
+    timings["nav"] = time.perf_counter() - start
+
+    return timings, {"files": len(files), "pages": sum(len(pages) for pages in configurator.pages.values())}
+
+
+def run(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    runs = {phase: [] for phase in PHASES}
+    with tempfile.TemporaryDirectory() as root:
+        generate_package(
+            root, "synthetic", args.modules, args.depth, args.symbols, args.filler_lines, args.exclusion_density
+        )
+        for _ in range(args.repeat):
+            timings, counts = time_phases(root, "synthetic", args.jobs)
+            for phase, duration in timings.items():
+                runs[phase].append(duration)
+
+    results = {
+        "meta": {
+            "auto_fast_docs": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "parameters": {
+                key: getattr(args, key)
+                for key in ("modules", "depth", "symbols", "filler_lines", "exclusion_density", "jobs", "repeat")
+            },
+            **counts,
+        },
+        "phases": {
+            phase: {"min": min(durations), "median": statistics.median(durations), "runs": durations}
+            for phase, durations in runs.items()
+        },
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    for phase, result in results["phases"].items():
+        print(f"{phase:<10} : {result['median']:.3f} s (median of {args.repeat})")
+    print(f"results written to {args.output}")
+
+
+def compare(args):
+    with open(args.reference, "r") as f:
+        reference = json.load(f)
+    with open(args.candidate, "r") as f:
+        candidate = json.load(f)
+    if reference["meta"]["parameters"] != candidate["meta"]["parameters"]:
+        print("WARNING : the two results were not obtained with the same parameters")
+
+    regressions = []
+    for phase in PHASES:
+        if phase not in reference["phases"] or phase not in candidate["phases"]:
+            continue
+        before = reference["phases"][phase][args.statistic]
+        after = candidate["phases"][phase][args.statistic]
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + args.threshold and after - before > args.min_delta:
+            flag = "  REGRESSION"
+            regressions.append(phase)
+        print(f"{phase:<10} : {before:.3f} s -> {after:.3f} s  (x{ratio:.2f}){flag}")
+    return not regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Times each phase on a synthetic package")
+    run_parser.add_argument("--modules", type=int, default=1000)
+    run_parser.add_argument("--depth", type=int, default=2)
+    run_parser.add_argument("--symbols", type=int, default=10)
+    run_parser.add_argument("--filler-lines", type=int, default=0)
+    run_parser.add_argument("--exclusion-density", type=float, default=0.0)
+    run_parser.add_argument("--jobs", type=int, default=1)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--output", default="bench_results.json")
+
+    compare_parser = commands.add_parser("compare", help="Flags the phases that got slower between two results")
+    compare_parser.add_argument("reference")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Tolerated slowdown. Default is 0.1")
+    compare_parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.01,
+        help="Slowdowns smaller than this number of seconds are never flagged (timer noise). Default is 0.01",
+    )
+    compare_parser.add_argument("--statistic", choices=("min", "median"), default="median")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(0 if compare(args) else 1)
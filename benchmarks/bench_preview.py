@@ -0,0 +1,54 @@
+"""
+Compares the generation and the mkdocs build of a synthetic package, with the mkdocstrings stubs (the default)
+and with the preview renderer (``--render preview``), where pages are written from the sources
+and mkdocstrings has nothing left to collect nor render.
+
+Example:
+    ```bash
+    python benchmarks/bench_preview.py --modules 100 --symbols 4
+    ```
+"""
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+
+from synthetic import generate_package
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator
+from auto_fast_docs.cli import get_parser
+from auto_fast_docs.build import build_site
+
+
+def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as root:
+        generate_package(root, "synthetic", args.modules, symbols=args.symbols)
+        reference = None
+        for render in args.renders:
+            start = time.perf_counter()
+            options = ["--no-cache", "--username", "bench", "--render", render, "--granularity", args.granularity]
+            configurator = RepositoryConfigurator(get_parser().parse_args(["synthetic", root] + options))
+            configurator.run()
+            generated = time.perf_counter() - start
+
+            start = time.perf_counter()
+            build_site(os.path.join(root, "mkdocs.yml"), site_dir=os.path.join(root, f"site_{render}"))
+            built = time.perf_counter() - start
+            if reference is None:
+                reference = built
+            print(
+                f"{render:<13} : generation {generated:.2f} s, mkdocs build {built:.2f} s "
+                f"({reference / built:.1f}x), {len(configurator.merge_pages())} pages"
+            )
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--modules", type=int, default=100)
+    argument_parser.add_argument("--symbols", type=int, default=4)
+    argument_parser.add_argument("--granularity", choices=("symbol", "module", "package"), default="symbol")
+    argument_parser.add_argument("--renders", nargs="+", default=["mkdocstrings", "preview"])
+    main(argument_parser.parse_args())
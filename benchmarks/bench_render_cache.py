@@ -0,0 +1,83 @@
+"""
+Measures the mkdocs build of a synthetic package with the render cache (``--render-cache``) : a cold build that
+fills the cache, a warm build where no module changed, and a build after a change in a single module.
+Each site is checked against a build without the cache (same pages, same search index).
+
+Example:
+    ```bash
+    python benchmarks/bench_render_cache.py --modules 100 --granularity module
+    ```
+"""
+
+import os
+import time
+import filecmp
+import logging
+import argparse
+import tempfile
+
+from synthetic import generate_package
+from bench_sharded_build import site_summary
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator, make_mkdocs_nav
+from auto_fast_docs.cli import get_parser
+from auto_fast_docs.build import build_site
+from auto_fast_docs.render_cache import RenderCache
+
+
+def build(root: str, granularity: str, site_dir: str, render_cache: RenderCache | None) -> float:
+    configurator = RepositoryConfigurator(
+        get_parser().parse_args(["synthetic", root, "--username", "bench", "--granularity", granularity])
+    )
+    nav = [{"Home": "index.md"}] + make_mkdocs_nav(configurator.run())
+    page_sources = configurator.get_page_sources() if render_cache is not None else None
+    start = time.perf_counter()
+    build_site(
+        os.path.join(root, "mkdocs.yml"),
+        site_dir=site_dir,
+        nav=nav,
+        render_cache=render_cache,
+        page_sources=page_sources,
+    )
+    return time.perf_counter() - start
+
+
+def same_pages(site_dir: str, reference_dir: str) -> bool:
+    pages, docs = site_summary(site_dir)
+    reference_pages, reference_docs = site_summary(reference_dir)
+    _, mismatch, errors = filecmp.cmpfiles(site_dir, reference_dir, pages, shallow=False)
+    return pages == reference_pages and docs == reference_docs and not mismatch and not errors
+
+
+def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as root:
+        generate_package(root, "synthetic", args.modules, symbols=args.symbols)
+        render_cache = RenderCache(os.path.join(root, "render_cache"))
+        site_dir = os.path.join(root, "site")
+        reference_dir = os.path.join(root, "site_reference")
+
+        def report(label):
+            built = build(root, args.granularity, site_dir, render_cache)
+            reference = build(root, args.granularity, reference_dir, None)
+            checked = "same site" if same_pages(site_dir, reference_dir) else "DIFFERENT SITE"
+            print(f"{label:<12} : {built:.2f} s with the cache, {reference:.2f} s without ({checked})")
+
+        report("cold")
+        report("warm")
+        for folder, _, files in sorted(os.walk(os.path.join(root, "synthetic"))):
+            modules = sorted(name for name in files if name.endswith(".py") and name != "__init__.py")
+            if modules:
+                changed = os.path.join(folder, modules[0])
+                break
+        with open(changed, "a") as f:
+            f.write('\n\ndef added_function():\n    """Added by the benchmark."""\n')
+        report("one change")
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--modules", type=int, default=100)
+    argument_parser.add_argument("--symbols", type=int, default=4)
+    argument_parser.add_argument("--granularity", choices=("symbol", "module", "package"), default="module")
+    main(argument_parser.parse_args())
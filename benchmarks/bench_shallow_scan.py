@@ -0,0 +1,64 @@
+"""
+Checks that ``PyfileParser.scan`` finds exactly the same ``content`` as ``PyfileParser.visit``,
+and compares their timings.
+
+Every python file found under the given folders (the standard library and a synthetic package by default)
+is parsed with both methods. The script exits with an error if any file gives a different content.
+
+Example:
+    ```bash
+    python benchmarks/bench_shallow_scan.py
+    python benchmarks/bench_shallow_scan.py path/to/my/package
+    ```
+"""
+
+import sys
+import time
+import sysconfig
+import argparse
+import tempfile
+
+from synthetic import generate_package
+
+from auto_fast_docs.auto_doc import PyfileParser
+from auto_fast_docs.discover import find_files
+
+
+def parse_all(paths, method):
+    contents = {}
+    start = time.perf_counter()
+    for path in paths:
+        parser = PyfileParser(path)
+        try:
+            getattr(parser, method)()
+        except (SyntaxError, ValueError, UnicodeDecodeError, RecursionError) as error:
+            contents[path] = type(error).__name__
+        else:
+            contents[path] = parser.content
+    return time.perf_counter() - start, contents
+
+
+def compare(folder):
+    paths = find_files(folder, r".*\.py$")
+    visit_time, visit_contents = parse_all(paths, "visit")
+    scan_time, scan_contents = parse_all(paths, "scan")
+    mismatches = [path for path in paths if visit_contents[path] != scan_contents[path]]
+    print(f"{folder} : {len(paths)} files")
+    print(f"  visit : {visit_time:.3f} s")
+    print(f"  scan  : {scan_time:.3f} s  (x{visit_time / scan_time:.2f})")
+    for path in mismatches:
+        print(f"  MISMATCH {path} :\n    visit : {visit_contents[path]}\n    scan  : {scan_contents[path]}")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folders", nargs="*", help="Folders to compare on. Defaults to the standard library.")
+    parser.add_argument("--modules", type=int, default=1000, help="Number of modules of the synthetic package")
+    args = parser.parse_args()
+
+    folders = args.folders or [sysconfig.get_paths()["stdlib"]]
+    success = all([compare(folder) for folder in folders])
+    with tempfile.TemporaryDirectory() as root:
+        success = compare(generate_package(root, modules=args.modules, symbols=20)) and success
+    sys.exit(0 if success else 1)
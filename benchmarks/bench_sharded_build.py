@@ -0,0 +1,72 @@
+"""
+Compares a single mkdocs build with sharded builds (``--build-shards``) of the same synthetic package,
+and checks that every sharded site has the same pages and search index as the single build.
+
+The speedup depends on the number of CPUs : each shard still pays the imports, the config loading and the nav,
+but the rendering of the pages (mostly mkdocstrings collecting and rendering objects) is split between the shards.
+
+Example:
+    ```bash
+    python benchmarks/bench_sharded_build.py --modules 200 --shards 1 2 4
+    ```
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import tempfile
+
+from synthetic import generate_package
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator, make_mkdocs_nav
+from auto_fast_docs.cli import get_parser
+from auto_fast_docs.build import build_site
+
+
+def site_summary(site_dir: str) -> tuple:
+    pages = sorted(
+        os.path.relpath(os.path.join(folder, name), site_dir)
+        for folder, _, files in os.walk(site_dir)
+        for name in files
+        if name.endswith(".html")
+    )
+    with open(os.path.join(site_dir, "search", "search_index.json"), "r", encoding="utf-8") as f:
+        docs = sorted(json.dumps(doc, sort_keys=True) for doc in json.load(f)["docs"])
+    return pages, docs
+
+
+def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as root:
+        generate_package(root, "synthetic", args.modules, symbols=args.symbols)
+        configurator = RepositoryConfigurator(
+            get_parser().parse_args(["synthetic", root, "--no-cache", "--username", "bench"])
+        )
+        nav = [{"Home": "index.md"}] + make_mkdocs_nav(configurator.run())
+        config_file = os.path.join(root, "mkdocs.yml")
+
+        reference, reference_time = None, None
+        for shards in args.shards:
+            site_dir = os.path.join(root, f"site_{shards}")
+            start = time.perf_counter()
+            build_site(config_file, site_dir=site_dir, nav=nav, shards=shards)
+            elapsed = time.perf_counter() - start
+            summary = site_summary(site_dir)
+            if reference is None:
+                reference, reference_time = summary, elapsed
+            identical = "same pages and search index" if summary == reference else "DIFFERENT OUTPUT"
+            print(
+                f"{shards} shard(s) : {elapsed:.2f} s ({reference_time / elapsed:.2f}x), "
+                f"{len(summary[0])} pages, {identical}"
+            )
+    print(f"({os.cpu_count()} CPUs)")
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--modules", type=int, default=200)
+    argument_parser.add_argument("--symbols", type=int, default=2)
+    argument_parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    main(argument_parser.parse_args())
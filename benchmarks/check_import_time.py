@@ -0,0 +1,99 @@
+"""
+Startup time regression check of the auto_fast_docs command line, based on ``python -X importtime``.
+
+Imports what the ``auto_fast_docs`` entry point imports before parsing the arguments, in a fresh interpreter,
+and fails (exit code 1) if :
+
+- the import time of everything imported after the interpreter startup (``site``) exceeds the budget
+    (best of ``--repeat`` runs, to ignore the noise of shared CI machines),
+- or one of the modules that must only be imported once the arguments are parsed is imported.
+
+Example:
+    ```bash
+    python benchmarks/check_import_time.py --budget-ms 50
+    ```
+"""
+
+import re
+import sys
+import argparse
+import subprocess
+
+# what the console script does, up to parsing the arguments
+STARTUP_CODE = (
+    "from auto_fast_docs import console_mkds_make_docfiles\n"
+    "from auto_fast_docs.cli import get_parser\n"
+    "get_parser()\n"
+)
+
+# heavy modules, only needed once the work starts
+LAZY_MODULES = (
+    "ast",
+    "natsort",
+    "subprocess",
+    "datetime",
+    "concurrent.futures",
+    "multiprocessing",
+    "json",
+    "hashlib",
+    "tempfile",
+    "mkdocs",
+    "auto_fast_docs.auto_doc",
+)
+
+_LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure_startup() -> tuple:
+    """
+    Returns:
+        tuple: The ``(seconds, name)`` of the top level imports done after ``site``,
+            and the names of all the modules imported after ``site``.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_CODE], capture_output=True, text=True, check=True
+    )
+    top_level, modules, after_site = [], [], False
+    for line in result.stderr.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if match is None:
+            continue
+        _, cumulative, indent, name = match.groups()
+        if not after_site:
+            # children are printed before their parent : site is the last line of the interpreter startup
+            after_site = name == "site" and indent == " "
+            continue
+        modules.append(name)
+        if indent == " ":
+            top_level.append((int(cumulative) / 1e6, name))
+    return top_level, modules
+
+
+def main(args) -> bool:
+    runs = [measure_startup() for _ in range(args.repeat)]
+    top_level, modules = min(runs, key=lambda run: sum(seconds for seconds, _ in run[0]))
+    best = sum(seconds for seconds, _ in top_level)
+
+    lazy = sorted(
+        {
+            name
+            for name in modules
+            for lazy_name in LAZY_MODULES
+            if name == lazy_name or name.startswith(lazy_name + ".")
+        }
+    )
+    print(f"startup imports : {best * 1000:.1f} ms (best of {args.repeat}), budget is {args.budget_ms:.1f} ms")
+    if lazy:
+        print(f"FAILED : these modules must only be imported once the arguments are parsed : {', '.join(lazy)}")
+    if best * 1000 > args.budget_ms:
+        print("FAILED : startup imports are over budget. Slowest top level imports :")
+        for seconds, name in sorted(top_level, reverse=True)[:5]:
+            print(f"  {name:<40} {seconds * 1000:8.1f} ms")
+    return not lazy and best * 1000 <= args.budget_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Import time budget. Default is 50 ms")
+    parser.add_argument("--repeat", type=int, default=5)
+    sys.exit(0 if main(parser.parse_args()) else 1)
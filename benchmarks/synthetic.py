@@ -0,0 +1,112 @@
+"""
+Synthetic package generator used by the benchmarks.
+
+Example:
+    ```bash
+    python benchmarks/synthetic.py /tmp/synthetic_repo --modules 5000
+    ```
+"""
+
+import os
+import argparse
+
+_FUNCTION_TEMPLATE = '''
+
+def function_{index}(a, b=1, *args, **kwargs):
+    """
+    Function number {index}.{marker}
+    Args:
+        a (int): first value.
+        b (int): second value.
+    Returns:
+        int: the sum of both values.
+    """
+    total = 0
+    for i in range(a):
+        total += (lambda x: x * b)(i) if i % 2 else sum(j for j in range(i))
+    return total
+'''
+
+_CLASS_TEMPLATE = '''
+
+class Class{index}:
+    """
+    Class number {index}.{marker}
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def method(self, other):
+        return [self.value + item for item in other if item]
+'''
+
+_FILLER_LINE = "CONSTANT_{index} = {{'key_{index}': [{index}, {index} + 1, {index} * 2]}}\n"
+
+
+def generate_package(
+    root, package_name="synthetic", modules=1000, depth=2, symbols=10, filler_lines=0, exclusion_density=0.0
+):
+    """
+    Writes a synthetic package under ``root`` and returns its path.
+    Args:
+        root (str): Folder in wich the package folder is created.
+        package_name (str): Name of the package folder.
+        modules (int): Total number of python modules (``__init__.py`` files not included).
+        depth (int): Number of nested subpackage levels.
+        symbols (int): Number of top level functions and classes per module (half of each).
+        filler_lines (int): Number of module level constant lines appended to each module,
+            to make bigger files without adding symbols.
+        exclusion_density (float): Fraction (0 to 1) of the modules and of the symbols that carry an exclusion marker.
+    Returns:
+        str: The path of the generated package.
+    """
+    package_path = os.path.join(root, package_name)
+    # spread modules evenly over a fixed fanout of subpackages at each depth level
+    fanout = 4
+    folders = [package_path]
+    for _ in range(depth):
+        folders = [os.path.join(folder, f"sub{index}") for folder in folders for index in range(fanout)]
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+        current = folder
+        while current.startswith(package_path):
+            with open(os.path.join(current, "__init__.py"), "w"):
+                pass
+            current = os.path.dirname(current)
+
+    exclusion_period = int(1 / exclusion_density) if exclusion_density > 0 else 0
+    for module_index in range(modules):
+        folder = folders[module_index % len(folders)]
+        chunks = []
+        if exclusion_period and module_index % exclusion_period == exclusion_period - 1:
+            chunks.append('"""\nGenerated module.\n<EXCLUDE_MODULE_FROM_MKDOCSTRINGS>\n"""\n')
+        else:
+            chunks.append('"""\nGenerated module.\n"""\n')
+        for symbol_index in range(symbols):
+            marker = ""
+            if exclusion_period and symbol_index % exclusion_period == exclusion_period - 1:
+                marker = "\n    <EXCLUDE_CALLABLE_FROM_MKDOCSTRINGS>"
+            template = _CLASS_TEMPLATE if symbol_index % 2 else _FUNCTION_TEMPLATE
+            chunks.append(template.format(index=symbol_index, marker=marker))
+        chunks.extend(_FILLER_LINE.format(index=index) for index in range(filler_lines))
+        with open(os.path.join(folder, f"module_{module_index}.py"), "w") as f:
+            f.write("".join(chunks))
+    return package_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates a synthetic package to benchmark auto_fast_docs")
+    parser.add_argument("root", help="Folder in wich the package folder is created")
+    parser.add_argument("--name", default="synthetic", help="Name of the package folder")
+    parser.add_argument("--modules", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--filler-lines", type=int, default=0)
+    parser.add_argument("--exclusion-density", type=float, default=0.0)
+    args = parser.parse_args()
+    print(
+        generate_package(
+            args.root, args.name, args.modules, args.depth, args.symbols, args.filler_lines, args.exclusion_density
+        )
+    )
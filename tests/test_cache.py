@@ -0,0 +1,95 @@
+"""
+``ParseCache`` must reuse the content of unchanged modules, and hash each module at most once per run.
+"""
+
+import os
+
+import pytest
+
+from auto_fast_docs import cache as cache_module
+from auto_fast_docs.cache import ParseCache
+
+CONTENT = {"functions": ["module.function"], "classes": []}
+
+
+@pytest.fixture
+def hashed(monkeypatch) -> list:
+    """
+    Returns:
+        list: The paths hashed by the parse cache, in order.
+    """
+    paths = []
+    hash_file = cache_module.hash_file
+
+    def counting_hash_file(path, *args):
+        paths.append(os.path.basename(path))
+        return hash_file(path, *args)
+
+    monkeypatch.setattr(cache_module, "hash_file", counting_hash_file)
+    return paths
+
+
+def write_module(path, content: str, mtime_ns: int | None = None) -> None:
+    with open(path / "module.py", "w") as f:
+        f.write(content)
+    if mtime_ns is not None:
+        os.utime(path / "module.py", ns=(mtime_ns, mtime_ns))
+
+
+def run(path, cache_dir, parsed_content=CONTENT):
+    """
+    Returns:
+        tuple: ``(content, cache)``, the content found in the cache (None if it was parsed again), and the cache.
+    """
+    cache = ParseCache(str(cache_dir), "package")
+    cache.scan(str(path), ["module.py"])
+    content = cache.get("module.py")
+    if content is None:
+        cache.put("module.py", parsed_content)
+    cache.save()
+    return content, cache
+
+
+def test_new_module_hashed_once(tmp_path, hashed):
+    write_module(tmp_path, "def function():\n    pass\n")
+    content, cache = run(tmp_path, tmp_path / "cache")
+    assert content is None and cache.misses == 1
+    assert hashed == ["module.py"]
+
+
+def test_unchanged_module_not_hashed(tmp_path, hashed):
+    write_module(tmp_path, "def function():\n    pass\n")
+    run(tmp_path, tmp_path / "cache")
+    hashed.clear()
+    content, cache = run(tmp_path, tmp_path / "cache")
+    assert content == CONTENT and cache.hits == 1
+    assert hashed == []
+
+
+def test_touched_module_reused_from_its_hash(tmp_path, hashed):
+    write_module(tmp_path, "def function():\n    pass\n", mtime_ns=1_000_000_000_000_000_000)
+    run(tmp_path, tmp_path / "cache")
+    # same content, other mtime (like a fresh checkout)
+    write_module(tmp_path, "def function():\n    pass\n", mtime_ns=2_000_000_000_000_000_000)
+    hashed.clear()
+    content, cache = run(tmp_path, tmp_path / "cache")
+    assert content == CONTENT and cache.hits == 1
+    assert hashed == ["module.py"]
+
+
+def test_changed_module_hashed_once(tmp_path, hashed):
+    write_module(tmp_path, "def function():\n    pass\n", mtime_ns=1_000_000_000_000_000_000)
+    run(tmp_path, tmp_path / "cache")
+    write_module(tmp_path, "def other():\n    pass\n", mtime_ns=2_000_000_000_000_000_000)
+    hashed.clear()
+    changed = {"functions": ["module.other"], "classes": []}
+    content, cache = run(tmp_path, tmp_path / "cache", changed)
+    assert content is None and cache.misses == 1
+    assert hashed == ["module.py"]
+
+    # the digest stored by put is the one of the new content
+    hashed.clear()
+    write_module(tmp_path, "def other():\n    pass\n", mtime_ns=3_000_000_000_000_000_000)
+    content, _ = run(tmp_path, tmp_path / "cache")
+    assert content == changed
+    assert hashed == ["module.py"]
@@ -0,0 +1,125 @@
+"""
+``deploy.deploy_site`` must push a commit whose tree is exactly the site folder, on top of the remote branch.
+"""
+
+import os
+import subprocess
+
+import pytest
+
+from auto_fast_docs.deploy import deploy_site, NOJEKYLL
+
+
+def git(path, *args) -> str:
+    return subprocess.run(["git", *args], cwd=path, capture_output=True, text=True, check=True).stdout
+
+
+def git_bytes(path, *args) -> bytes:
+    return subprocess.run(["git", *args], cwd=path, capture_output=True, check=True).stdout
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """
+    Returns:
+        tuple: ``(repository, remote)``, a repository with a single commit and a bare repository as its origin.
+    """
+    for variable in ("GIT_AUTHOR", "GIT_COMMITTER"):
+        monkeypatch.setenv(f"{variable}_NAME", "tests")
+        monkeypatch.setenv(f"{variable}_EMAIL", "tests@tests")
+    remote = tmp_path / "remote.git"
+    repository = tmp_path / "repository"
+    repository.mkdir()
+    git(tmp_path, "init", "-q", "--bare", str(remote))
+    git(repository, "init", "-q")
+    git(repository, "commit", "-q", "--allow-empty", "-m", "sources")
+    git(repository, "remote", "add", "origin", str(remote))
+    return str(repository), str(remote)
+
+
+def write_site(site_dir, files: dict) -> None:
+    for relpath, content in files.items():
+        path = os.path.join(site_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+
+def read_folder(folder) -> dict:
+    files = {}
+    for root, _, filenames in os.walk(folder):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, folder).replace(os.sep, "/")] = f.read()
+    return files
+
+
+def read_tree(remote, ref="gh-pages") -> dict:
+    return {
+        relpath: git_bytes(remote, "cat-file", "blob", f"{ref}:{relpath}")
+        for relpath in git(remote, "ls-tree", "-r", "-z", "--name-only", ref).split("\0")
+        if relpath
+    }
+
+
+def test_deployed_tree_equals_site(tmp_path, repository):
+    repository, remote = repository
+    site_dir = tmp_path / "site"
+    write_site(
+        site_dir,
+        {
+            "index.html": b"<h1>Home</h1>",
+            "module/index.html": b"<h1>Module</h1>",
+            "removed/index.html": b"<h1>Removed</h1>",
+            "assets/style.css": b"body {}",
+        },
+    )
+    first = deploy_site(str(site_dir), repository)
+    assert first is not None
+    assert git(remote, "rev-parse", "gh-pages").strip() == first
+    assert read_tree(remote) == read_folder(site_dir)
+    assert NOJEKYLL in read_tree(remote)
+
+    # changed, added, removed and unchanged files
+    write_site(site_dir, {"module/index.html": b"<h1>Module, edited</h1>", "added/index.html": b"<h1>Added</h1>"})
+    os.remove(site_dir / "removed" / "index.html")
+    os.rmdir(site_dir / "removed")
+    second = deploy_site(str(site_dir), repository)
+    assert read_tree(remote) == read_folder(site_dir)
+    assert git(remote, "rev-parse", "gh-pages^").strip() == first
+    committed = git(remote, "diff-tree", "--no-commit-id", "--name-status", "-r", first, second).split("\n")
+    assert sorted(filter(None, committed)) == ["A\tadded/index.html", "D\tremoved/index.html", "M\tmodule/index.html"]
+
+    # nothing changed, nothing is pushed
+    assert deploy_site(str(site_dir), repository) is None
+    assert git(remote, "rev-parse", "gh-pages").strip() == second
+
+
+def test_local_branch_is_fast_forwarded(tmp_path, repository):
+    repository, remote = repository
+    site_dir = tmp_path / "site"
+    write_site(site_dir, {"index.html": b"first"})
+    first = deploy_site(str(site_dir), repository)
+    assert git(repository, "rev-parse", "gh-pages").strip() == first
+
+    write_site(site_dir, {"index.html": b"second"})
+    second = deploy_site(str(site_dir), repository)
+    assert git(repository, "rev-parse", "gh-pages").strip() == second
+
+
+def test_local_commits_are_kept(tmp_path, repository):
+    repository, remote = repository
+    site_dir = tmp_path / "site"
+    write_site(site_dir, {"index.html": b"first"})
+    first = deploy_site(str(site_dir), repository)
+    # a commit made on the local branch, that was never pushed
+    tree = git(repository, "rev-parse", f"{first}^{{tree}}").strip()
+    local = git(repository, "commit-tree", tree, "-p", first, "-m", "local").strip()
+    git(repository, "update-ref", "refs/heads/gh-pages", local)
+
+    write_site(site_dir, {"index.html": b"second"})
+    second = deploy_site(str(site_dir), repository)
+    assert git(remote, "rev-parse", "gh-pages").strip() == second
+    assert git(repository, "rev-parse", "gh-pages").strip() == local
+    assert read_tree(remote) == read_folder(site_dir)
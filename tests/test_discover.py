@@ -0,0 +1,113 @@
+"""
+``DiscoveryRules`` must select the same files while the package is walked (pruning the excluded folders),
+and when single paths are checked with ``allows`` (files changed in git, or in watch mode).
+"""
+
+import os
+
+import pytest
+
+from auto_fast_docs.discover import DiscoveryRules, find_python_files, read_discovery_config
+
+FILES = [
+    "__init__.py",
+    "core.py",
+    "_private.py",
+    "codegen.py",
+    "msg_pb2.py",
+    "api/__init__.py",
+    "api/tests.py",
+    "tests/test_core.py",
+    "gen/out.py",
+    "vendor/y.py",
+    "vendor/lib/x.py",
+    "io/legacy_a.py",
+    "io/new.py",
+    "deep/io/legacy_b.py",
+    "proto/msg_pb2.py",
+    "_internal/z.py",
+    "sub/__init__.py",
+    "sub/__main__.py",
+    "sub/_hidden.py",
+]
+
+CASES = {
+    # a glob without / matches the name of a file or folder, at any depth
+    "name glob file": (dict(exclude=["*_pb2.py"]), ["msg_pb2.py", "proto/msg_pb2.py"]),
+    "name glob folder": (dict(exclude=["tests"]), ["tests/test_core.py"]),
+    "name glob nested folder": (dict(exclude=["lib"]), ["vendor/lib/x.py"]),
+    # a glob with / matches the whole relative path
+    "path glob": (dict(exclude=["io/legacy_*.py"]), ["io/legacy_a.py"]),
+    "path glob star": (dict(exclude=["*/legacy_*.py"]), ["io/legacy_a.py"]),
+    "path glob double star": (dict(exclude=["**/legacy_*.py"]), ["io/legacy_a.py", "deep/io/legacy_b.py"]),
+    "path glob folder content": (dict(exclude=["vendor/**"]), ["vendor/y.py", "vendor/lib/x.py"]),
+    # a glob ending with / only matches folders
+    "folders only": (dict(exclude=["*gen*/"]), ["gen/out.py"]),
+    "files and folders": (dict(exclude=["*gen*"]), ["codegen.py", "gen/out.py"]),
+    # regular expressions are searched in the relative path, folders having a trailing /
+    "regex": (dict(exclude=[r"re:_pb2\.py$"]), ["msg_pb2.py", "proto/msg_pb2.py"]),
+    "regex folder": (dict(exclude=["re:^io/"]), ["io/legacy_a.py", "io/new.py"]),
+    "regex anywhere": (dict(exclude=["re:legacy"]), ["io/legacy_a.py", "deep/io/legacy_b.py"]),
+    # dunder names are not private
+    "exclude private": (
+        dict(exclude_private=True),
+        ["_private.py", "_internal/z.py", "sub/_hidden.py"],
+    ),
+    # only the included files are kept, then the excluded ones are removed
+    "include": (
+        dict(include=["io/**", "core.py"]),
+        sorted(set(FILES) - {"io/legacy_a.py", "io/new.py", "core.py"}),
+    ),
+    "include and exclude": (
+        dict(include=["io/**", "core.py"], exclude=["legacy_*"]),
+        sorted(set(FILES) - {"io/new.py", "core.py"}),
+    ),
+    "include regex and exclude private": (
+        dict(include=["re:^sub/"], exclude_private=True),
+        sorted(set(FILES) - {"sub/__init__.py", "sub/__main__.py"}),
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def package(tmp_path_factory):
+    path = tmp_path_factory.mktemp("package")
+    for relpath in FILES:
+        filepath = path / relpath
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_text("")
+    return str(path)
+
+
+@pytest.mark.parametrize("options, excluded", CASES.values(), ids=CASES.keys())
+def test_rules(package, options, excluded):
+    expected = sorted(set(FILES) - set(excluded))
+    rules = DiscoveryRules(**options)
+    found = [filepath.replace(os.sep, "/") for filepath in find_python_files(package, rules=rules)]
+    assert sorted(found) == expected
+    assert sorted(relpath for relpath in FILES if rules.allows(relpath)) == expected
+
+
+def test_excluded_folder_pruned(package):
+    rules = DiscoveryRules(exclude=["vendor/"], exclude_private=True)
+    find_python_files(package, rules=rules)
+    # vendor and _internal are never entered, _private.py and sub/_hidden.py are listed but excluded
+    assert (rules.pruned_folders, rules.excluded_files) == (2, 2)
+
+
+def test_no_rules(package):
+    found = [filepath.replace(os.sep, "/") for filepath in find_python_files(package)]
+    assert sorted(found) == sorted(FILES)
+
+
+def test_read_discovery_config(tmp_path):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        '[tool.auto_fast_docs]\ninclude = ["core.py"]\nexclude = ["re:^io/", "tests/"]\nexclude_private = true\n'
+    )
+    assert read_discovery_config(str(pyproject)) == {
+        "include": ["core.py"],
+        "exclude": ["re:^io/", "tests/"],
+        "exclude_private": True,
+    }
+    assert read_discovery_config(str(tmp_path / "missing.toml")) == {}
@@ -0,0 +1,93 @@
+"""
+``PageWriter`` must only ever remove the pages listed in its manifest, and leave unchanged pages untouched.
+"""
+
+import os
+import stat
+
+import pytest
+
+from auto_fast_docs.emit import PageWriter, ThreadedPageWriter, MANIFEST_NAME
+
+WRITERS = [PageWriter, ThreadedPageWriter]
+# an old modification time, that a rewrite of the file would change
+OLD_MTIME = 1_000_000_000
+
+
+def write_pages(writer_class, docpath, pages: dict) -> PageWriter:
+    writer = writer_class(str(docpath))
+    for relpath, content in pages.items():
+        writer.write(relpath, content)
+    writer.finish()
+    return writer
+
+
+def write_file(path, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+@pytest.mark.parametrize("writer_class", WRITERS)
+def test_stale_page_removed(tmp_path, writer_class):
+    write_pages(writer_class, tmp_path, {"module/Kept.md": "kept", "removed/Stale.md": "stale"})
+    assert os.path.isfile(tmp_path / MANIFEST_NAME)
+
+    writer = write_pages(writer_class, tmp_path, {"module/Kept.md": "kept"})
+    assert os.path.isfile(tmp_path / "module" / "Kept.md")
+    assert not os.path.exists(tmp_path / "removed" / "Stale.md")
+    # the folders left empty are removed too
+    assert not os.path.exists(tmp_path / "removed")
+    assert writer.previous_pages == {"module/Kept.md"}
+
+
+@pytest.mark.parametrize("writer_class", WRITERS)
+def test_hand_written_page_untouched(tmp_path, writer_class):
+    write_file(tmp_path / "module" / "Guide.md", "hand written")
+    write_file(tmp_path / "index.md", "home")
+    write_pages(writer_class, tmp_path, {"module/Generated.md": "generated"})
+    write_pages(writer_class, tmp_path, {})
+
+    assert not os.path.exists(tmp_path / "module" / "Generated.md")
+    with open(tmp_path / "module" / "Guide.md") as f:
+        assert f.read() == "hand written"
+    with open(tmp_path / "index.md") as f:
+        assert f.read() == "home"
+
+
+@pytest.mark.parametrize("writer_class", WRITERS)
+def test_nothing_removed_without_manifest(tmp_path, writer_class):
+    # pages generated by a version without manifest
+    write_file(tmp_path / "module" / "Old.md", "old")
+    write_pages(writer_class, tmp_path, {"module/New.md": "new"})
+    assert os.path.isfile(tmp_path / "module" / "Old.md")
+
+    # an unreadable manifest is the same as no manifest
+    write_file(tmp_path / MANIFEST_NAME, "{not json")
+    write_pages(writer_class, tmp_path, {})
+    assert os.path.isfile(tmp_path / "module" / "Old.md")
+    assert os.path.isfile(tmp_path / "module" / "New.md")
+
+
+@pytest.mark.parametrize("writer_class", WRITERS)
+def test_unchanged_page_not_rewritten(tmp_path, writer_class):
+    write_pages(writer_class, tmp_path, {"Unchanged.md": "same", "Changed.md": "before"})
+    for name in ("Unchanged.md", "Changed.md", MANIFEST_NAME):
+        os.utime(tmp_path / name, (OLD_MTIME, OLD_MTIME))
+    os.chmod(tmp_path / "Changed.md", 0o600)
+
+    write_pages(writer_class, tmp_path, {"Unchanged.md": "same", "Changed.md": "after"})
+    assert os.stat(tmp_path / "Unchanged.md").st_mtime == OLD_MTIME
+    assert os.stat(tmp_path / MANIFEST_NAME).st_mtime == OLD_MTIME
+    assert os.stat(tmp_path / "Changed.md").st_mtime != OLD_MTIME
+    # an updated page keeps its permissions
+    assert stat.S_IMODE(os.stat(tmp_path / "Changed.md").st_mode) == 0o600
+
+
+def test_forced_page_rewritten(tmp_path):
+    write_pages(PageWriter, tmp_path, {"Page.md": "same"})
+    os.utime(tmp_path / "Page.md", (OLD_MTIME, OLD_MTIME))
+    writer = PageWriter(str(tmp_path))
+    writer.write("Page.md", "same", force=True)
+    assert writer.counts["updated"] == 1
+    assert os.stat(tmp_path / "Page.md").st_mtime != OLD_MTIME
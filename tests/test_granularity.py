@@ -0,0 +1,54 @@
+"""
+In package granularity, each package folder must get its own page, even when a folder has the name of the package.
+"""
+
+import os
+
+import pytest
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator
+from auto_fast_docs.cli import get_parser
+
+
+def write_package(path, modules: list) -> None:
+    for relpath in modules:
+        filepath = os.path.join(path, "mypkg", relpath)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        name = os.path.splitext(os.path.basename(relpath))[0]
+        with open(filepath, "w") as f:
+            f.write(f'def {name}_function():\n    """{name}."""\n')
+
+
+def read_page(path, page_path) -> str:
+    with open(os.path.join(path, "docs", page_path)) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize(
+    "modules, nav",
+    [
+        (
+            ["top.py", "sub/leaf.py"],
+            {"sub": {"sub": "sub/index.md"}, "mypkg": "mypkg.md"},
+        ),
+        (
+            # a root folder with the name of the package
+            ["top.py", "mypkg/leaf.py", "mypkg/inner/deep.py"],
+            {
+                "mypkg": {"mypkg": "mypkg/index.md", "inner": {"inner": "mypkg/inner/index.md"}},
+                "mypkg (root)": "mypkg.md",
+            },
+        ),
+    ],
+)
+def test_package_pages(tmp_path, modules, nav):
+    write_package(tmp_path, modules)
+    args = get_parser().parse_args(["mypkg", str(tmp_path), "--granularity", "package", "--no-cache"])
+    assert RepositoryConfigurator(args).run() == nav
+
+    assert "## top" in read_page(tmp_path, "mypkg.md")
+    for module in modules[1:]:
+        folder, name = os.path.split(os.path.splitext(module)[0])
+        page = read_page(tmp_path, f"{folder}/index.md")
+        assert f"## {name}" in page
+        assert "## top" not in page
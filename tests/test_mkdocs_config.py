@@ -0,0 +1,112 @@
+"""
+``MkdocsConfigurator`` must only replace the nav of mkdocs.yml, keep everything else verbatim,
+and not write the file again when its text didn't change.
+"""
+
+import os
+import stat
+
+import pytest
+
+from auto_fast_docs.auto_doc import MkdocsConfigurator
+
+# an old modification time, that a rewrite of the file would change
+OLD_MTIME = 1_000_000_000
+
+BEFORE_NAV = """\
+# user comment at the top
+site_name: mypkg
+theme:
+  name: material  # inline comment
+  features:
+    - navigation.tabs
+
+nav:
+"""
+NAV = """\
+    - Home: index.md
+    - 'module': 'module.md'
+"""
+AFTER_NAV = """\
+
+# user section after the nav
+extra:
+  version:
+    provider: mike
+markdown_extensions:
+  - admonition
+"""
+
+TEXTS = {
+    "nav in the middle": BEFORE_NAV + NAV + AFTER_NAV,
+    "nav at the end": BEFORE_NAV + NAV,
+    "top level list nav": BEFORE_NAV + "- Home: index.md\n- 'module': 'module.md'\n" + AFTER_NAV,
+    "empty nav": BEFORE_NAV + AFTER_NAV,
+}
+
+
+def write_config(path, text: str) -> str:
+    config_path = os.path.join(path, "mkdocs.yml")
+    with open(config_path, "w") as f:
+        f.write(text)
+    os.utime(config_path, (OLD_MTIME, OLD_MTIME))
+    return config_path
+
+
+def read(path) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("text", TEXTS.values(), ids=TEXTS.keys())
+def test_round_trip(text):
+    configurator = MkdocsConfigurator("mkdocs.yml")
+    configurator.set_text(text)
+    assert configurator.before == BEFORE_NAV
+    assert configurator.render() == text
+
+
+def test_user_sections_kept(tmp_path):
+    config_path = write_config(tmp_path, BEFORE_NAV + NAV + AFTER_NAV)
+    MkdocsConfigurator(config_path).write_mkdocs_nav({"module": "module.md", "other": {"Other": "other/Other.md"}})
+    expected_nav = NAV + "    - other: \n        - 'Other': 'other/Other.md'\n"
+    assert read(config_path) == BEFORE_NAV + expected_nav + AFTER_NAV
+    assert MkdocsConfigurator(config_path).read_nav() == {"module": "module.md", "other": {"Other": "other/Other.md"}}
+
+
+def test_config_without_nav(tmp_path):
+    config_path = write_config(tmp_path, "site_name: mypkg  # no nav yet")
+    MkdocsConfigurator(config_path).write_mkdocs_nav({"module": "module.md"})
+    assert read(config_path) == "site_name: mypkg  # no nav yet\nnav:\n" + NAV
+
+
+def test_unchanged_config_not_rewritten(tmp_path):
+    config_path = write_config(tmp_path, BEFORE_NAV + NAV + AFTER_NAV)
+    configurator = MkdocsConfigurator(config_path)
+    configurator.write_mkdocs_nav({"module": "module.md"})
+    assert os.stat(config_path).st_mtime == OLD_MTIME
+    # nor when the same nav is written again by the same configurator
+    configurator.write_mkdocs_nav({"module": "module.md"})
+    assert configurator.write_file() is False
+    assert os.stat(config_path).st_mtime == OLD_MTIME
+
+    configurator.write_mkdocs_nav({"renamed": "module.md"})
+    assert os.stat(config_path).st_mtime != OLD_MTIME
+
+
+def test_permissions_kept(tmp_path):
+    config_path = write_config(tmp_path, BEFORE_NAV + NAV + AFTER_NAV)
+    os.chmod(config_path, 0o640)
+    MkdocsConfigurator(config_path).write_mkdocs_nav({"changed": "changed.md"})
+    assert stat.S_IMODE(os.stat(config_path).st_mode) == 0o640
+    assert "'changed': 'changed.md'" in read(config_path)
+
+
+def test_symbolic_link_kept(tmp_path):
+    target = write_config(tmp_path, BEFORE_NAV + NAV + AFTER_NAV)
+    os.makedirs(tmp_path / "project")
+    link = tmp_path / "project" / "mkdocs.yml"
+    os.symlink(target, link)
+    MkdocsConfigurator(str(link)).write_mkdocs_nav({"changed": "changed.md"})
+    assert os.path.islink(link)
+    assert "'changed': 'changed.md'" in read(target)
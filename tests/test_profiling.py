@@ -0,0 +1,38 @@
+"""
+``Profiler.phase`` must measure the CPU time of the thread running each phase, so that phases running at the same
+time in different threads are not counted twice.
+"""
+
+import threading
+import time
+
+from auto_fast_docs.profiling import Profiler
+
+
+def spin(seconds: float) -> None:
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+def test_concurrent_phases(tmp_path):
+    profiler = Profiler(enabled=True)
+
+    def run(name):
+        with profiler.phase(name):
+            spin(0.1)
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("parsing", "emission")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    phases = {record["name"]: record for record in profiler.phases}
+    assert set(phases) == {"parsing", "emission"}
+    for record in phases.values():
+        assert 0.1 <= record["cpu_time"] < 0.15
+        assert record["process_cpu_time"] >= record["cpu_time"]
+        assert {"rss_start", "rss_end", "lifetime_peak_rss"} <= set(record)
+
+    profiler.write(str(tmp_path / "trace.json"), trace_format="chrome")
@@ -0,0 +1,42 @@
+"""
+``--public-api`` must document the names re-exported by modules that only import them.
+"""
+
+import os
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator
+from auto_fast_docs.cli import get_parser
+
+PACKAGE = {
+    "mypkg/__init__.py": '"""Package."""\nfrom .api import Engine\n\n__all__ = ["Engine"]\n',
+    # only re-exports : skipped by the prefilter outside of the public API mode
+    "mypkg/api.py": "from ._impl import Engine\n",
+    "mypkg/_impl.py": 'class Engine:\n    """Engine."""\n\n    def run(self):\n        pass\n',
+}
+
+
+def write_package(path, files: dict) -> None:
+    for relpath, content in files.items():
+        filepath = os.path.join(path, relpath)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "w") as f:
+            f.write(content)
+
+
+def run(path, *options) -> dict:
+    args = get_parser().parse_args(["mypkg", str(path), "--public-api", *options])
+    return RepositoryConfigurator(args).run()
+
+
+def test_re_export_only_module(tmp_path):
+    write_package(tmp_path, PACKAGE)
+    assert run(tmp_path, "--no-cache") == {"Engine": "Engine.md"}
+    assert os.path.isfile(tmp_path / "docs" / "Engine.md")
+
+
+def test_re_export_only_module_cached(tmp_path):
+    write_package(tmp_path, PACKAGE)
+    # the prefiltered contents cached by a run without --public-api are not reused
+    RepositoryConfigurator(get_parser().parse_args(["mypkg", str(tmp_path)])).run()
+    assert run(tmp_path) == {"Engine": "Engine.md"}
+    assert run(tmp_path) == {"Engine": "Engine.md"}
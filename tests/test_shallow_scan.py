@@ -0,0 +1,234 @@
+"""
+``PyfileParser.scan`` (statements only) must find exactly the same ``content`` as the full ``PyfileParser.visit``.
+"""
+
+import os
+import sysconfig
+import textwrap
+
+import pytest
+
+from auto_fast_docs.auto_doc import PyfileParser
+from auto_fast_docs.discover import find_python_files
+
+CORPUS = {
+    "decorators": '''
+        import functools
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                return function(*args, **kwargs)
+            return wrapper
+
+        @decorator
+        def decorated():
+            """Decorated function."""
+
+        @decorator
+        @functools.lru_cache(maxsize=None)
+        def stacked(value=lambda: None):
+            pass
+
+        @dataclass(frozen=True)
+        class Decorated:
+            value: int = 0
+
+            @property
+            def double(self):
+                return self.value * 2
+
+            @staticmethod
+            def static():
+                pass
+
+            @classmethod
+            def build(cls):
+                return cls()
+        ''',
+    "nested_classes": '''
+        class Outer:
+            """Outer class."""
+
+            class Inner:
+                def method(self):
+                    class Local:
+                        def local_method(self):
+                            pass
+                    return Local
+
+                class Deepest:
+                    attribute = [x for x in range(3)]
+
+            def method(self):
+                def helper():
+                    def deeper():
+                        pass
+                    return deeper
+                return helper
+        ''',
+    "async": """
+        async def coroutine():
+            async def inner():
+                pass
+            async with lock:
+                await inner()
+            async for item in stream():
+                pass
+
+        class Service:
+            async def start(self):
+                pass
+
+            async def __aenter__(self):
+                return self
+        """,
+    "conditional_definitions": """
+        import sys
+
+        if sys.version_info >= (3, 11):
+            def new_api():
+                pass
+        elif sys.platform == "win32":
+            class WindowsApi:
+                pass
+        else:
+            def old_api():
+                pass
+
+        try:
+            from fast import speedup
+        except ImportError:
+            def speedup():
+                pass
+        else:
+            class Fast:
+                pass
+        finally:
+            def cleanup():
+                pass
+
+        with open(__file__) as f:
+            def in_with():
+                pass
+
+        for name in ("a", "b"):
+            def in_for():
+                pass
+        else:
+            class ForElse:
+                pass
+
+        while False:
+            def in_while():
+                pass
+
+        match sys.platform:
+            case "linux":
+                def on_linux():
+                    pass
+            case _:
+                class Elsewhere:
+                    pass
+
+        class Conditional:
+            if True:
+                def conditional_method(self):
+                    pass
+            try:
+                class ConditionalInner:
+                    pass
+            except Exception:
+                pass
+        """,
+    "exclusions": '''
+        def kept():
+            """Kept."""
+
+        def excluded():
+            """<EXCLUDE_CALLABLE_FROM_MKDOCSTRINGS>"""
+
+        class ExcludedClass:
+            """<EXCLUDE_CALLABLE_FROM_MKDOCSTRINGS>"""
+
+            def method_of_excluded(self):
+                pass
+
+            class InnerOfExcluded:
+                pass
+        ''',
+    "excluded_module": '''
+        """<EXCLUDE_MODULE_FROM_MKDOCSTRINGS>"""
+
+        def never_documented():
+            pass
+        ''',
+    "exports": """
+        from .module import name, other as alias
+        from . import sibling
+
+        __all__ = ["name", "alias"]
+        __all__ += ["sibling"]
+
+        if True:
+            from .conditional import hidden
+
+        def function():
+            from .inner import local
+            __all__ = ["local"]
+        """,
+    "annotated_all": """
+        __all__: list = ["first"]
+        __all__ += computed()
+        """,
+    "empty": "",
+}
+
+
+def parse(path: str, method: str, previews: bool) -> dict:
+    parser = PyfileParser(path, previews)
+    getattr(parser, method)()
+    return parser.content
+
+
+@pytest.mark.parametrize("previews", [False, True])
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_scan_matches_visit(tmp_path, name, previews):
+    path = tmp_path / f"{name}.py"
+    path.write_text(textwrap.dedent(CORPUS[name]))
+    scanned = parse(str(path), "scan", previews)
+    assert scanned == parse(str(path), "visit", previews)
+
+
+def test_scan_finds_conditional_definitions(tmp_path):
+    path = tmp_path / "conditional_definitions.py"
+    path.write_text(textwrap.dedent(CORPUS["conditional_definitions"]))
+    content = parse(str(path), "scan", False)
+    functions = [qualname.rpartition(".")[2] for qualname in content["functions"]]
+    classes = [qualname.rpartition(".")[2] for qualname in content["classes"]]
+    assert functions == [
+        "new_api",
+        "old_api",
+        "speedup",
+        "cleanup",
+        "in_with",
+        "in_for",
+        "in_while",
+        "on_linux",
+    ]
+    assert classes == ["WindowsApi", "Fast", "ForElse", "Elsewhere", "Conditional", "ConditionalInner"]
+
+
+@pytest.mark.parametrize(
+    "folder",
+    [
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        os.path.join(sysconfig.get_paths()["stdlib"], "json"),
+        os.path.join(sysconfig.get_paths()["stdlib"], "asyncio"),
+    ],
+    ids=["repository", "json", "asyncio"],
+)
+def test_scan_matches_visit_on_real_code(folder):
+    for relpath in find_python_files(folder):
+        path = os.path.join(folder, relpath)
+        assert parse(path, "scan", False) == parse(path, "visit", False), relpath
@@ -0,0 +1,89 @@
+"""
+``--since`` must make the same pages and nav as a full run, the nav of the unchanged modules being found back from
+the previous mkdocs.yml.
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from auto_fast_docs.auto_doc import RepositoryConfigurator, make_mkdocs_nav
+from auto_fast_docs.cli import get_parser
+
+MODULES = {
+    "edited.py": "def before():\n    pass\n",
+    "unchanged.py": "class Unchanged:\n    pass\n",
+    "deleted.py": "def deleted():\n    pass\n",
+    "sub/__init__.py": "",
+    "sub/renamed.py": "def moved():\n    pass\n",
+    "sub/neighbour.py": "def neighbour():\n    pass\n",
+}
+
+
+def git(path, *args) -> str:
+    return subprocess.run(["git", *args], cwd=path, capture_output=True, text=True, check=True).stdout
+
+
+def write_modules(path, modules: dict) -> None:
+    for relpath, content in modules.items():
+        filepath = os.path.join(path, "mypkg", relpath)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "w") as f:
+            f.write(content)
+
+
+def run(path, granularity: str, *options) -> list:
+    args = get_parser().parse_args(["mypkg", str(path), "--granularity", granularity, "--no-cache", *options])
+    return make_mkdocs_nav(RepositoryConfigurator(args).run())
+
+
+def read_folder(folder) -> dict:
+    files = {}
+    for root, _, filenames in os.walk(folder):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            with open(path) as f:
+                files[os.path.relpath(path, folder)] = f.read()
+    return files
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    for variable in ("GIT_AUTHOR", "GIT_COMMITTER"):
+        monkeypatch.setenv(f"{variable}_NAME", "tests")
+        monkeypatch.setenv(f"{variable}_EMAIL", "tests@tests")
+    repository = tmp_path / "repository"
+    write_modules(repository, MODULES)
+    git(repository, "init", "-q")
+    git(repository, "add", "mypkg")
+    git(repository, "commit", "-q", "-m", "first")
+    return repository
+
+
+@pytest.mark.parametrize("granularity", ["symbol", "module", "package"])
+def test_since_matches_full_run(tmp_path, repository, granularity, caplog):
+    run(repository, granularity)
+
+    write_modules(repository, {"edited.py": "def before():\n    pass\n\n\ndef after():\n    pass\n"})
+    git(repository, "rm", "-q", "mypkg/deleted.py")
+    git(repository, "mv", "mypkg/sub/renamed.py", "mypkg/sub/moved.py")
+    write_modules(repository, {"added.py": "def added():\n    pass\n"})
+    caplog.set_level("INFO")
+    nav = run(repository, granularity, "--since", "HEAD")
+    # edited, deleted, added, and both paths of the renamed module (every module of their folders in package
+    # granularity)
+    changed = 7 if granularity == "package" else 5
+    assert f"{changed} python files changed since HEAD" in caplog.text
+
+    full = tmp_path / "full"
+    shutil.copytree(repository / "mypkg", full / "mypkg")
+    assert nav == run(full, granularity)
+    assert read_folder(repository / "docs") == read_folder(full / "docs")
+
+
+def test_since_without_previous_nav(repository):
+    # no mkdocs.yml to start from : the whole package is documented
+    nav = run(repository, "module", "--since", "HEAD")
+    assert nav == run(repository, "module")
@@ -0,0 +1,104 @@
+"""
+``watch`` must keep the pages and the nav up to date when modules are edited, added and deleted,
+and keep watching (with the previous pages) when a module is saved with a syntax error.
+"""
+
+import os
+
+import pytest
+
+from auto_fast_docs import watch as watch_module
+from auto_fast_docs.auto_doc import MkdocsConfigurator
+from auto_fast_docs.cli import get_watch_parser
+
+
+def write_module(path, relpath: str, content: str) -> None:
+    with open(os.path.join(path, "mypkg", relpath), "w") as f:
+        f.write(content)
+
+
+def read_nav(path) -> dict:
+    return MkdocsConfigurator(os.path.join(path, "mkdocs.yml")).read_nav()
+
+
+def run_watch(path, monkeypatch, steps: list) -> None:
+    """
+    Runs ``watch`` with the polling watcher and without mkdocs serve. Before each wait for changes,
+    the check of the previous step is ran, then the module of the next step is written (or deleted).
+    Stops once every step is done.
+    Args:
+        steps (list): ``(relpath, content, check)`` tuples, ``content`` being None to delete the module.
+            The check of the first step runs after the initial run, and its module is left as is.
+    """
+    wait_for_changes = watch_module.wait_for_changes
+    remaining = iter(steps)
+    _, _, previous_check = next(remaining)
+
+    def scripted_wait_for_changes(watcher, interval, debounce):
+        nonlocal previous_check
+        previous_check()
+        step = next(remaining, None)
+        if step is None:
+            raise KeyboardInterrupt
+        relpath, content, previous_check = step
+        if content is None:
+            os.remove(os.path.join(path, "mypkg", relpath))
+        else:
+            write_module(path, relpath, content)
+        return wait_for_changes(watcher, interval, debounce)
+
+    monkeypatch.setattr(watch_module, "wait_for_changes", scripted_wait_for_changes)
+    options = ["--no-serve", "--polling", "--no-cache", "--interval", "0.01", "--debounce", "0.05"]
+    watch_module.watch(get_watch_parser().parse_args(["mypkg", str(path), *options]))
+
+
+@pytest.fixture
+def package(tmp_path):
+    os.makedirs(tmp_path / "mypkg")
+    write_module(tmp_path, "__init__.py", "")
+    write_module(tmp_path, "edited.py", "def first():\n    pass\n")
+    return tmp_path
+
+
+def test_watch(package, monkeypatch, caplog):
+    caplog.set_level("INFO")
+    docs = package / "docs"
+
+    def check_initial():
+        assert read_nav(package) == {"edited": {"first": "edited/first.md"}}
+
+    def check_edited():
+        assert read_nav(package) == {"edited": {"first": "edited/first.md", "second": "edited/second.md"}}
+        assert os.path.isfile(docs / "edited" / "second.md")
+
+    def check_added():
+        assert read_nav(package)["added"] == {"third": "added/third.md"}
+        assert os.path.isfile(docs / "added" / "third.md")
+
+    def check_syntax_error():
+        assert "Could not update the docs of 1 changed files, keeping the previous ones : SyntaxError" in caplog.text
+        assert read_nav(package)["edited"] == {"first": "edited/first.md", "second": "edited/second.md"}
+        assert os.path.isfile(docs / "edited" / "second.md")
+
+    def check_fixed():
+        assert read_nav(package)["edited"] == {"first": "edited/first.md"}
+        assert not os.path.exists(docs / "edited" / "second.md")
+
+    def check_deleted():
+        assert read_nav(package) == {"edited": {"first": "edited/first.md"}}
+        assert not os.path.exists(docs / "added")
+
+    first = "def first():\n    pass\n"
+    run_watch(
+        package,
+        monkeypatch,
+        [
+            (None, None, check_initial),
+            ("edited.py", first + "\n\ndef second():\n    pass\n", check_edited),
+            ("added.py", "def third():\n    pass\n", check_added),
+            ("edited.py", first + "\n\ndef second(:\n", check_syntax_error),
+            ("edited.py", first, check_fixed),
+            ("added.py", None, check_deleted),
+        ],
+    )
+    assert "Stopped watching" in caplog.text